@@ -0,0 +1,87 @@
+"""
+Benchmark de tarification en lot : boucle final_price() vs price_many().
+
+Usage :
+    python benchmarks/bench_batch_pricing.py --rows 10000000 --workers 1,2,4,8
+
+Pour un catalogue de `rows` produits (moitié périssables) :
+- la boucle de référence, un appel final_price() par produit ;
+- price_many() sans exécuteur (colonnes compactes, un seul cœur) ;
+- price_many() dans un ProcessPoolExecutor pour chaque nombre de workers
+  demandé (au plus le nombre de cœurs) : gain ~ linéaire sur la partie
+  parallèle, borné par l'extraction des colonnes dans le parent (Amdahl).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from typing import Callable
+
+from freshcart.domain.batch import columns, price_many
+from freshcart.domain.products import PerishableProduct, Product
+
+
+def _timed(label: str, fn: Callable[[], object], repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<44} {best:>8.3f} s")
+    return best
+
+
+def main() -> None:
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument(
+        "--workers",
+        default=",".join(str(1 << i) for i in range(cores.bit_length())),
+        help="nombres de workers séparés par des virgules",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    today = date.today()
+    products = [
+        (
+            PerishableProduct(
+                f"S{i}",
+                "n",
+                i % 5000 / 100 + 0.01,
+                expiry_date=today + timedelta(i % 30 - 5),
+            )
+            if i % 2
+            else Product(f"S{i}", "n", i % 5000 / 100 + 0.01)
+        )
+        for i in range(args.rows)
+    ]
+    print(f"{args.rows} produits, {cores} cœur(s)")
+
+    _timed(
+        "boucle final_price()",
+        lambda: sum(p.final_price() for p in products),
+        args.repeat,
+    )
+    _timed("extraction des colonnes (parent)", lambda: columns(products), args.repeat)
+    serial = _timed(
+        "price_many() séquentiel", lambda: price_many(products), args.repeat
+    )
+    for workers in (int(w) for w in args.workers.split(",")):
+        with ProcessPoolExecutor(workers) as pool:
+            chunk = max(1, -(-args.rows // (workers * 4)))  # ~4 paquets par worker
+            price_many(products[:workers], pool, chunk_size=1)  # démarrage
+            elapsed = _timed(
+                f"price_many() {workers} processus",
+                lambda: price_many(products, pool, chunk_size=chunk),
+                args.repeat,
+            )
+        print(f"{'':<44} x{serial / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark : modèle objet (final_price() par produit) vs ColumnarInventory.
+
+Usage :
+    python benchmarks/bench_columnar.py --sizes 100000,1000000,10000000
+
+Le modèle objet à 10^7 lignes demande plusieurs Go de RAM ;
+--max-object-rows permet de ne mesurer que le moteur colonnaire au-delà.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import date
+from typing import Callable, List
+
+import numpy as np
+
+from freshcart.domain.columnar import ColumnarInventory
+from freshcart.domain.products import PerishableProduct, Product
+
+
+def _best_of(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _columns(
+    n: int, seed: int = 0
+) -> tuple[list[str], list[str], np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    prices = np.round(rng.uniform(0, 50, n), 2)
+    offsets = rng.integers(-10, 30, n)
+    perishable = rng.random(n) < 0.6
+    today = np.datetime64(date.today(), "D")
+    expiry = np.where(perishable, today + offsets, np.datetime64("NaT", "D"))
+    skus = [f"SKU{i}" for i in range(n)]
+    return skus, skus, prices, expiry
+
+
+def _objects(skus: list[str], prices: np.ndarray, expiry: np.ndarray) -> List[Product]:
+    items: List[Product] = []
+    for sku, price, exp in zip(skus, prices.tolist(), expiry.tolist()):
+        if exp is None:
+            items.append(Product(sku, sku, price))
+        else:
+            items.append(PerishableProduct(sku, sku, price, expiry_date=exp))
+    return items
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="100000,1000000")
+    parser.add_argument("--max-object-rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'objet (s)':>10} {'colonnes (s)':>13} {'speedup':>8}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        skus, names, prices, expiry = _columns(n)
+        col = ColumnarInventory.from_columns(skus, names, prices, expiry)
+        t_col = _best_of(col.total_value, args.repeat)
+
+        if n <= args.max_object_rows:
+            items = _objects(skus, prices, expiry)
+            t_obj = _best_of(lambda: sum(p.final_price() for p in items), args.repeat)
+            speedup = f"{t_obj / t_col:7.1f}x"
+            print(f"{n:>10} {t_obj:>10.4f} {t_col:>13.4f} {speedup:>8}")
+        else:
+            print(f"{n:>10} {'-':>10} {t_col:>13.4f} {'-':>8}")
+
+
+if __name__ == "__main__":
+    main()
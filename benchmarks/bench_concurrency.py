@@ -0,0 +1,67 @@
+"""
+Benchmark de concurrence : débit de l'API selon le nombre de requêtes
+simultanées (endpoints synchrones, exécutés dans le threadpool).
+
+Usage :
+    python benchmarks/bench_concurrency.py --requests 4000 --concurrency 1,8,32,64
+
+Mélange : 1/4 de créations (SKU en collision volontaire), 1/4 de
+GET /inventory/value, 1/2 de pages GET /products?limit=50. À la fin, on
+vérifie qu'aucun SKU n'a été inséré deux fois.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from freshcart.api.main import create_app
+
+
+async def _run(total: int, concurrency: int) -> float:
+    app = create_app({"metrics": False})
+    transport = httpx.ASGITransport(app=app)
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+
+        async def worker() -> None:
+            while not queue.empty():
+                i = queue.get_nowait()
+                if i % 4 == 0:
+                    sku = f"SKU{i % (total // 8 or 1)}"
+                    await c.post(
+                        "/products", json={"sku": sku, "name": "x", "initial_price": 1}
+                    )
+                elif i % 4 == 1:
+                    await c.get("/inventory/value")
+                else:
+                    await c.get("/products", params={"limit": 50})
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    skus = [p.sku for p in app.state.inventory.all()]
+    assert len(skus) == len(set(skus)), "SKU dupliqué !"
+    return total / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--concurrency", default="1,8,32,64")
+    args = parser.parse_args()
+
+    print(f"{'concurrence':>11} {'req/s':>8}")
+    for level in (int(c) for c in args.concurrency.split(",")):
+        print(f"{level:>11} {asyncio.run(_run(args.requests, level)):>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark mémoire : octets alloués par produit (tracemalloc).
+
+Usage :
+    python benchmarks/bench_memory.py --rows 1000000
+
+Mesure tout ce qu'alloue la création de `rows` produits (instance, chaînes
+sku, flottants, dates...), divisé par le nombre de produits, dans quatre
+situations :
+- seul           : produits créés, jamais tarifés (mémo vide) ;
+- tarifé         : après un price_at(jour) par produit, avec un seul objet
+  date pour tous (comme une requête de l'API) : mémo rempli ;
+- inventaire     : dans un Inventory, qui les tarife à l'ajout (valeur
+  totale) : entrée du dict des SKU, index d'expiration, mémo rempli ;
+- inv. sans mémo : idem, mémo vidé : coût propre de l'Inventory.
+
+Référence (CPython 3.11, 100 000 produits, sku "S<i>") :
+    layout                         regular   perishable
+    dataclass + __dict__ (avant)   ~191 o    ~231 o
+    slots + dates partagées        ~151 o    ~159 o
+    + slot du mémo (vide)          ~159 o    ~167 o
+    + mémo rempli (tarifé)         ~239 o    ~247 o
+    dans un Inventory              ~276 o    ~380 o
+    dans un Inventory, sans mémo   ~197 o    ~301 o
+Le mémo coûte 8 octets (le slot) tant que le produit n'est pas tarifé, puis
+~80 octets de plus une fois tarifé : un tuple (jour, prix) et un float par
+produit. ~32 octets s'y ajoutent si chaque appel crée son propre objet date
+(final_price() hors de pricing_date()).
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from datetime import date, timedelta
+from typing import Callable, Dict, List
+
+from freshcart.domain.inventory import Inventory
+from freshcart.domain.products import PerishableProduct, Product
+
+
+def _measure(build: Callable[[], object], rows: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    held = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return current / rows
+
+
+def _priced(products: List[Product]) -> List[Product]:
+    day = date.today()  # un seul objet date, comme une requête de l'API
+    for p in products:
+        p.price_at(day)
+    return products
+
+
+def _in_inventory(products: List[Product], memo: bool = True) -> Inventory:
+    inv = Inventory()
+    inv.add_many(products)  # tarifés au jour courant (valeur totale)
+    if not memo:
+        for p in products:
+            p._memo = None
+    return inv
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+    n = args.rows
+    today = date.today()
+
+    def regular() -> List[Product]:
+        return [Product(f"S{i}", "n", i % 5000 / 100) for i in range(n)]
+
+    def perishable() -> List[Product]:
+        return [
+            PerishableProduct(
+                f"S{i}", "n", i % 5000 / 100, expiry_date=today + timedelta(i % 30)
+            )
+            for i in range(n)
+        ]
+
+    cases: Dict[str, Callable[[Callable[[], List[Product]]], Callable[[], object]]] = {
+        "seul": lambda build: build,
+        "tarifé": lambda build: lambda: _priced(build()),
+        "inventaire": lambda build: lambda: _in_inventory(build()),
+        "inv. sans mémo": lambda build: lambda: _in_inventory(build(), memo=False),
+    }
+    sample = Product("S0", "n", 1.0)
+    print(f"instance Product : {sys.getsizeof(sample)} o (sans __dict__)")
+    print(f"{'octets/produit':<14} {'regular':>10} {'perishable':>11}")
+    for name, case in cases.items():
+        print(
+            f"{name:<14} {_measure(case(regular), n):>10.1f}"
+            f" {_measure(case(perishable), n):>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
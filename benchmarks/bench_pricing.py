@@ -0,0 +1,76 @@
+"""
+Benchmark de tarification : boucle final_price() vs plan de remises compilé.
+
+Usage :
+    python benchmarks/bench_pricing.py --rows 1000000
+
+Compare, pour un même catalogue (moitié périssables) :
+- la boucle actuelle `[p.final_price() for p in products]` (dispatch virtuel,
+  mémo du prix froid puis chaud) ;
+- PricingPlan(DEFAULT_RULES).price_all(products) (mêmes règles) ;
+- un plan plus riche (catégories, paliers, tranche horaire).
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import date, timedelta
+from typing import Callable, List
+
+from freshcart.domain.pricing import DEFAULT_RULES, PricingPlan, compile_rules
+from freshcart.domain.products import PerishableProduct, Product
+
+
+def _timed(label: str, fn: Callable[[], object], repeat: int = 3) -> None:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<40} {best:>8.3f} s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+    today = date.today()
+    products: List[Product] = [
+        (
+            PerishableProduct(
+                f"{('DAIRY', 'FRUIT', 'MEAT')[i % 3]}-{i}",
+                "n",
+                i % 5000 / 100 + 0.01,
+                expiry_date=today + timedelta(i % 30 - 5),
+            )
+            if i % 2
+            else Product(f"DRY-{i}", "n", i % 5000 / 100 + 0.01)
+        )
+        for i in range(args.rows)
+    ]
+
+    def cold_loop() -> None:
+        for p in products:
+            p._memo = None  # force le recalcul (nouveau jour)
+        [p.final_price() for p in products]
+
+    default_plan = PricingPlan(DEFAULT_RULES)
+    rich_plan = compile_rules(
+        [
+            {"name": "périmé", "type": "perishable", "max_days": -1, "factor": 0},
+            {"name": "lait", "sku_prefix": "DAIRY-", "max_days": 2, "factor": 0.4},
+            {"name": "viande", "sku_prefix": "MEAT-", "max_days": 4, "factor": 0.6},
+            {"name": "J-3", "type": "perishable", "max_days": 3, "factor": 0.5},
+            {"name": "J-7", "type": "perishable", "max_days": 7, "factor": 0.8},
+            {"name": "soirée", "hours": [20, 23], "factor": 0.9},
+        ]
+    )
+    _timed("final_price() (mémo froid)", cold_loop)
+    _timed("final_price() (mémo chaud)", lambda: [p.final_price() for p in products])
+    _timed("plan DEFAULT_RULES", lambda: default_plan.price_all(products, today))
+    _timed("plan 6 règles (catégories, horaire)", lambda: rich_plan.price_all(products))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark multi-magasins : agrégats de la chaîne.
+
+Usage :
+    python benchmarks/bench_sharding.py --rows 1000000 --shards 8 --workers 4
+
+Pour un catalogue réparti par hachage du SKU sur `shards` magasins :
+- total_value() / expired() de la chaîne, agrégés en série : somme des
+  totaux incrémentaux des shards, fusion triée de leurs périmés ;
+- les mêmes requêtes sur un Inventory unique de même contenu ;
+- la même valeur de chaîne répartie sur un ProcessPoolExecutor de
+  `workers` processus (démarré hors chronométrage) : colonnes de chaque
+  shard (batch.columns) envoyées à price_chunk, un shard par tâche. C'est
+  ce que coûterait un agrégat parallèle ; l'écart avec la version série
+  justifie que ShardedInventory n'en ait pas.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import date, timedelta
+from typing import Callable
+
+from freshcart.domain.batch import columns, price_chunk
+from freshcart.domain.inventory import Inventory
+from freshcart.domain.products import PerishableProduct, Product
+from freshcart.domain.sharding import ShardedInventory
+
+
+def _timed(label: str, fn: Callable[[], object], repeat: int = 3) -> None:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<44} {best * 1000:>10.3f} ms")
+
+
+def _pool_total(chain: ShardedInventory, pool: Executor, today: int) -> float:
+    """Valeur de la chaîne, un shard par tâche du pool (extraction comprise)."""
+    futures = []
+    for sid in chain.store_ids:
+        _, prices, expiries = columns(chain.store(sid).iter_all())
+        futures.append(pool.submit(price_chunk, prices, expiries, today))
+    return sum(f.result()[1] for f in futures) / 100
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--shards", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    today = date.today()
+    chain = ShardedInventory.by_sku_hash(args.shards)
+    single = Inventory()
+    for i in range(args.rows):
+        price = i % 5000 / 100 + 0.01
+        product: Product
+        if i % 2:
+            expiry = today + timedelta(i % 30 - 5)
+            product = PerishableProduct(f"S{i}", "n", price, expiry_date=expiry)
+        else:
+            product = Product(f"S{i}", "n", price)
+        chain.add(product)
+        single.add(product)
+    print(f"{args.rows} produits, {args.shards} shards")
+
+    _timed("chaîne total_value()", chain.total_value)
+    _timed("chaîne expired()", chain.expired)
+    _timed("Inventory unique total_value()", single.total_value)
+    _timed("Inventory unique expired()", single.expired)
+    with ProcessPoolExecutor(args.workers) as pool:
+        ordinal = today.toordinal()
+        assert _pool_total(chain, pool, ordinal) == chain.total_value()
+        _timed(
+            f"chaîne total_value(), pool de {args.workers} processus",
+            lambda: _pool_total(chain, pool, ordinal),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark de démarrage : reconstruction d'un Inventory vs snapshot mmap.
+
+Usage :
+    python benchmarks/bench_snapshot.py --rows 1000000
+
+Compare le temps pour obtenir un inventaire interrogeable (len, get,
+expired, total_value) en reconstruisant les produits avec add_many, et en
+rouvrant un snapshot écrit par Inventory.save_snapshot().
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Callable, List
+
+from freshcart.domain.inventory import Inventory
+from freshcart.domain.products import PerishableProduct, Product
+
+
+def _timed(label: str, fn: Callable[[], object]) -> object:
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<34} {time.perf_counter() - start:>8.3f} s")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    n = args.rows
+    today = date.today()
+
+    def build() -> Inventory:
+        products: List[Product] = [
+            (
+                PerishableProduct(
+                    f"S{i}",
+                    f"Produit {i}",
+                    i % 5000 / 100 + 0.01,
+                    expiry_date=today + timedelta(i % 30 - 5),
+                )
+                if i % 2
+                else Product(f"S{i}", f"Produit {i}", i % 5000 / 100 + 0.01)
+            )
+            for i in range(n)
+        ]
+        inv = Inventory()
+        inv.add_many(products)
+        return inv
+
+    inv = _timed("construction (add_many)", build)
+    assert isinstance(inv, Inventory)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalogue.snap")
+        _timed("save_snapshot", lambda: inv.save_snapshot(path))
+        print(f"taille du fichier : {os.path.getsize(path) / 1e6:.1f} Mo")
+
+        def cold_start() -> None:
+            snap = Inventory.load_snapshot(path)
+            len(snap)
+            snap.get(f"S{n // 2}")
+            snap.total_value()
+            snap.close()
+
+        _timed("load_snapshot + get + total_value", cold_start)
+        snap = Inventory.load_snapshot(path)
+        _timed("expired() depuis le snapshot", snap.expired)
+        _timed("expired() en mémoire", inv.expired)
+        snap.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+Suite de benchmarks des chemins critiques (domaine et API), style asv.
+
+Usage :
+    python benchmarks/suite.py run --sizes 1000,10000,100000 --ratios 0,0.5 \\
+        --output base.json
+    python benchmarks/suite.py run --filter inventory. --output new.json
+    python benchmarks/suite.py compare base.json new.json --threshold 0.2
+
+`run` exécute chaque cas pour chaque (taille de catalogue, part de
+périssables) et écrit les temps (min et médiane par appel, en secondes) en
+JSON. `compare` rapproche deux fichiers et signale les cas dont la médiane
+a augmenté de plus de `threshold` (20 % par défaut) ; code de sortie 1 s'il
+y a au moins une régression (utilisable en CI).
+
+Les catalogues sont déterministes (horloge figée, voir freshcart.domain.clock)
+et les tailles jusqu'à 10^6 sont acceptées (--sizes 1000000), la construction
+du catalogue (refaite pour chaque cas) n'étant pas chronométrée.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+from fastapi.testclient import TestClient
+
+from freshcart.api.main import create_app
+from freshcart.domain.clock import set_clock
+from freshcart.domain.inventory import Inventory
+from freshcart.domain.products import PerishableProduct, Product
+
+# date de tarification de tous les catalogues (résultats reproductibles)
+TODAY = date(2030, 1, 15)
+
+# durée minimale d'une répétition : les appels rapides sont enchaînés
+MIN_REPEAT_SECONDS = 0.05
+
+Setup = Callable[[List[Product]], Callable[[], object]]
+BENCHMARKS: Dict[str, Setup] = {}
+
+
+def benchmark(name: str) -> Callable[[Setup], Setup]:
+    """Enregistre un cas : setup(catalogue) -> fonction chronométrée."""
+
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+@dataclass
+class Result:
+    name: str
+    size: int
+    ratio: float
+    number: int  # appels par répétition
+    repeat: int
+    min: float  # secondes par appel
+    median: float
+
+
+def catalogue(size: int, ratio: float) -> List[Product]:
+    """`size` produits dont une part `ratio` de périssables (expiration J-5..J+24)."""
+    every = round(1 / ratio) if ratio else 0
+    return [
+        (
+            PerishableProduct(
+                f"S{i:07d}",
+                f"Produit {i}",
+                i % 5000 / 100 + 0.01,
+                expiry_date=TODAY + timedelta(i % 30 - 5),
+            )
+            if every and i % every == 0
+            else Product(f"S{i:07d}", f"Produit {i}", i % 5000 / 100 + 0.01)
+        )
+        for i in range(size)
+    ]
+
+
+def _inventory(products: List[Product]) -> Inventory:
+    inv = Inventory()
+    inv.add_many(products)
+    return inv
+
+
+# --- domaine ---
+@benchmark("inventory.add_many")
+def _add_many(products: List[Product]) -> Callable[[], object]:
+    def run() -> None:
+        Inventory().add_many(products)
+        # l'inventaire jetable ne doit pas rester propriétaire des produits
+        # (sinon chaque appel ajoute un propriétaire partagé de plus)
+        for p in products:
+            p._owner = None
+
+    return run
+
+
+@benchmark("inventory.remove")
+def _remove(products: List[Product]) -> Callable[[], object]:
+    inv = _inventory(products)
+    target = products[len(products) // 2]
+
+    def run() -> None:  # retrait puis remise en place : catalogue stable
+        inv.remove(target.sku)
+        inv.add(target)
+
+    return run
+
+
+@benchmark("inventory.expired")
+def _expired(products: List[Product]) -> Callable[[], object]:
+    return _inventory(products).expired
+
+
+@benchmark("inventory.total_value")
+def _total_value(products: List[Product]) -> Callable[[], object]:
+    return _inventory(products).total_value
+
+
+@benchmark("inventory.sorted_by_price.cold")
+def _sorted_cold(products: List[Product]) -> Callable[[], object]:
+    inv = _inventory(products)
+    target = products[0]
+
+    def run() -> object:  # un changement de prix invalide le cache de tri
+        target.price = 1.0 if target.price != 1.0 else 2.0
+        return inv.sorted_by("price")
+
+    return run
+
+
+@benchmark("inventory.sorted_by_price.warm")
+def _sorted_warm(products: List[Product]) -> Callable[[], object]:
+    inv = _inventory(products)
+    return lambda: inv.sorted_by("price")
+
+
+@benchmark("inventory.bulk_update_prices")
+def _bulk_update_prices(products: List[Product]) -> Callable[[], object]:
+    inv = _inventory(products)
+    inv.search(max_price=0.0)  # index des prix construit : il est maintenu
+    batch = products[::20]  # 5 % du catalogue repricé à chaque appel
+    flip = [0]
+
+    def run() -> object:
+        flip[0] ^= 1
+        return inv.bulk_update_prices({p.sku: 1.0 + flip[0] for p in batch})
+
+    return run
+
+
+# --- API (TestClient, en processus) ---
+def _client(products: List[Product], cache: int = 0) -> TestClient:
+    # cache HTTP désactivé par défaut : on mesure le rendu des réponses
+    app = create_app({"metrics": False, "response_cache": cache})
+    app.state.inventory.add_many(products)
+    return TestClient(app)
+
+
+@benchmark("api.get_products.page")
+def _api_page(products: List[Product]) -> Callable[[], object]:
+    client = _client(products)
+    return lambda: client.get("/products", params={"limit": 100})
+
+
+@benchmark("api.get_products.all")
+def _api_all(products: List[Product]) -> Callable[[], object]:
+    client = _client(products)
+    return lambda: client.get("/products")
+
+
+@benchmark("api.get_products.all.cached")
+def _api_all_cached(products: List[Product]) -> Callable[[], object]:
+    client = _client(products, cache=16)
+    return lambda: client.get("/products")
+
+
+@benchmark("api.get_expired")
+def _api_expired(products: List[Product]) -> Callable[[], object]:
+    client = _client(products)
+    return lambda: client.get("/products/expired")
+
+
+@benchmark("api.get_product")
+def _api_product(products: List[Product]) -> Callable[[], object]:
+    client = _client(products)
+    sku = products[len(products) // 2].sku
+    return lambda: client.get(f"/products/{sku}")
+
+
+@benchmark("api.inventory_value")
+def _api_value(products: List[Product]) -> Callable[[], object]:
+    client = _client(products)
+    return lambda: client.get("/inventory/value")
+
+
+def measure(fn: Callable[[], object], repeat: int) -> Tuple[int, List[float]]:
+    """Temps par appel de `repeat` répétitions (nombre d'appels calibré)."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_REPEAT_SECONDS:
+            break
+        number *= 10
+    times = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+    return number, times
+
+
+def run(
+    sizes: List[int], ratios: List[float], pattern: str, repeat: int
+) -> List[Result]:
+    results: List[Result] = []
+    names = [name for name in BENCHMARKS if pattern in name]
+    set_clock(lambda: TODAY)
+    try:
+        for size in sizes:
+            for ratio in ratios:
+                for name in names:
+                    # catalogue neuf par cas : pas de callbacks hérités d'un autre
+                    products = catalogue(size, ratio)
+                    number, times = measure(BENCHMARKS[name](products), repeat)
+                    result = Result(
+                        name,
+                        size,
+                        ratio,
+                        number,
+                        repeat,
+                        min(times),
+                        statistics.median(times),
+                    )
+                    results.append(result)
+                    print(
+                        f"{name:<34} n={size:<8} ratio={ratio:<4} "
+                        f"{result.median * 1e3:>10.3f} ms",
+                        file=sys.stderr,
+                    )
+    finally:
+        set_clock(None)
+    return results
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float) -> int:
+    """Affiche les écarts de médiane ; retourne le nombre de régressions."""
+
+    def index(report: Dict[str, Any]) -> Dict[Tuple[str, int, float], float]:
+        return {
+            (r["name"], r["size"], r["ratio"]): r["median"] for r in report["results"]
+        }
+
+    before, after = index(base), index(new)
+    regressions = 0
+    for key in sorted(before.keys() & after.keys()):
+        change = after[key] / before[key] - 1 if before[key] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "REGRESSION"
+            regressions += 1
+        elif change < -threshold:
+            flag = "amélioration"
+        name, size, ratio = key
+        print(
+            f"{name:<34} n={size:<8} ratio={ratio:<4} "
+            f"{before[key] * 1e3:>10.3f} -> {after[key] * 1e3:>10.3f} ms "
+            f"{change:>+8.1%} {flag}"
+        )
+    for key in sorted(before.keys() ^ after.keys()):
+        print(f"{key[0]:<34} n={key[1]:<8} ratio={key[2]:<4} (absent d'un rapport)")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_cmd = commands.add_parser("run", help="exécute la suite, écrit du JSON")
+    run_cmd.add_argument("--sizes", default="1000,10000,100000")
+    run_cmd.add_argument("--ratios", default="0.5")
+    run_cmd.add_argument("--filter", default="", help="sous-chaîne du nom des cas")
+    run_cmd.add_argument("--repeat", type=int, default=5)
+    run_cmd.add_argument("--output", default="-", help="fichier JSON (- : stdout)")
+    cmp_cmd = commands.add_parser("compare", help="compare deux rapports JSON")
+    cmp_cmd.add_argument("base")
+    cmp_cmd.add_argument("new")
+    cmp_cmd.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        with open(args.base) as f:
+            base = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+        regressions = compare(base, new, args.threshold)
+        print(f"{regressions} régression(s) au-delà de {args.threshold:.0%}")
+        sys.exit(1 if regressions else 0)
+
+    results = run(
+        [int(s) for s in args.sizes.split(",")],
+        [float(r) for r in args.ratios.split(",")],
+        args.filter,
+        args.repeat,
+    )
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": [asdict(r) for r in results],
+    }
+    text = json.dumps(report, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,48 @@
 """
 Freshcart - package principal
 Expose les objets importants pour éviter les imports trop longs.
+
+Les imports sont paresseux (PEP 562) : `import freshcart` ne charge rien,
+`freshcart.Inventory` (ou `from freshcart import Inventory`) importe le
+module du domaine concerné au premier accès. Un job qui n'utilise que
+freshcart.domain.products ne paie pas l'import de l'inventaire.
 """
 
-# from freshcart.domain.products import Product
-# on pourra faire :
-# from freshcart import Product
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Dict, List
 
+if TYPE_CHECKING:
+    from .domain.inventory import DuplicateSkuError, Inventory, ProductNotFoundError
+    from .domain.products import PerishableProduct, Product
 
-from .domain.inventory import Inventory, ProductNotFoundError
-from .domain.products import PerishableProduct, Product
+# nom exposé -> module qui le définit
+_LAZY: Dict[str, str] = {
+    "Product": ".domain.products",
+    "PerishableProduct": ".domain.products",
+    "Inventory": ".domain.inventory",
+    "ProductNotFoundError": ".domain.inventory",
+    "DuplicateSkuError": ".domain.inventory",
+}
 
 __all__ = [
     "Product",
     "PerishableProduct",
     "Inventory",
     "ProductNotFoundError",
+    "DuplicateSkuError",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value  # accès suivants : attribut ordinaire
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted({*globals(), *__all__})
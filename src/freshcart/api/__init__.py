@@ -1,9 +1,23 @@
 """
 FreshCart API package.
 
-⚠️ FC-3 (scaffolding) :
-- On crée l’ossature du package API.
-- L’app FastAPI et les routes seront ajoutées aux étapes FC-4/FC-5.
+`from freshcart.api import create_app` : import paresseux (PEP 562), FastAPI
+n'est chargé qu'au premier accès à create_app.
 """
 
-__all__: list[str] = []
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .main import create_app
+
+__all__: List[str] = ["create_app"]
+
+
+def __getattr__(name: str) -> Any:
+    if name != "create_app":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from .main import create_app
+
+    return create_app
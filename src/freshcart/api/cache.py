@@ -0,0 +1,244 @@
+"""
+Cache HTTP des lectures (ETag / GET conditionnel).
+
+Les listes (/products, /products/expired, /products/expiring,
+/products/search) et /inventory/value ne dépendent que de l'état de
+l'inventaire et de la date de tarification. `ResponseCacheMiddleware` les
+met en cache sous la clé (chemin, query string normalisée, époque et
+version de l'inventaire, date de tarification, empreinte du plan de
+remises [, heure si le plan a des règles horaires]) :
+- les octets rendus sont gardés dans un LRU borné (entrées et octets) ;
+- l'ETag (fort) est dérivé de la clé : un `If-None-Match` qui correspond
+  reçoit un 304 sans passer par les endpoints, même après éviction du LRU ;
+  la clé ne contient que des valeurs stables entre processus (époque du
+  stockage, empreinte du plan, pas id()), donc un ETag émis par un autre
+  worker sur les mêmes données reste valable, et un ETag d'avant un
+  redémarrage de l'inventaire en mémoire ne l'est plus ;
+- compteurs hit / miss / not_modified exposés sur /metrics.
+
+Les réponses NDJSON en flux (Accept: application/x-ndjson) ne passent pas
+par le cache : les mettre en mémoire annulerait l'intérêt du flux.
+
+NB: doit tourner à l'intérieur de PricingDateMiddleware (date figée).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from freshcart.api.serializers import wants_ndjson
+from freshcart.domain import clock
+
+# chemins dont la réponse est une fonction de (inventaire, date, query)
+CACHEABLE_PATHS: FrozenSet[str] = frozenset(
+    {
+        "/products",
+        "/products/expired",
+        "/products/discounted",
+        "/products/expiring",
+        "/products/search",
+        "/inventory/value",
+    }
+)
+# les clients doivent revalider (If-None-Match) à chaque fois
+CACHE_CONTROL = b"no-cache"
+
+CacheKey = Tuple[Any, ...]
+Headers = List[Tuple[bytes, bytes]]
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResponse:
+    etag: bytes
+    status: int
+    headers: Headers
+    body: bytes
+
+
+class ResponseCache:
+    """LRU borné en nombre d'entrées et en octets de corps, thread-safe."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 << 20) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[CacheKey, CachedResponse] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key: CacheKey) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: CacheKey, entry: CachedResponse) -> None:
+        size = len(entry.body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous.body)
+            self._entries[key] = entry
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+
+    def count_not_modified(self) -> None:
+        with self._lock:
+            self.not_modified += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def render_prometheus(self) -> str:
+        stats = self.stats()
+        lines = [
+            "# HELP freshcart_response_cache_total Requêtes servies par le cache HTTP.",
+            "# TYPE freshcart_response_cache_total counter",
+        ]
+        for result in ("hits", "misses", "not_modified"):
+            lines.append(
+                f'freshcart_response_cache_total{{result="{result}"}} {stats[result]}'
+            )
+        lines += [
+            "# HELP freshcart_response_cache_bytes Octets de corps en cache.",
+            "# TYPE freshcart_response_cache_bytes gauge",
+            f"freshcart_response_cache_bytes {stats['bytes']}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def etag_for(key: CacheKey) -> bytes:
+    return b'"' + hashlib.sha1(repr(key).encode()).hexdigest()[:24].encode() + b'"'
+
+
+def _matches(if_none_match: bytes, etag: bytes) -> bool:
+    """Comparaison faible (RFC 9110) : W/"x" correspond à "x"."""
+    for candidate in if_none_match.split(b","):
+        candidate = candidate.strip()
+        if candidate == b"*" or candidate.removeprefix(b"W/") == etag:
+            return True
+    return False
+
+
+class ResponseCacheMiddleware:
+    def __init__(self, app: ASGIApp, cache: ResponseCache) -> None:
+        self.app = app
+        self.cache = cache
+
+    def _key(self, scope: Scope) -> CacheKey:
+        state = scope["app"].state
+        query = b"&".join(sorted(scope.get("query_string", b"").split(b"&")))
+        plan = getattr(state, "pricing_plan", None)
+        hour = None
+        if plan is not None and any(rule.hours for rule in plan.rules):
+            hour = datetime.now().hour
+        inventory = state.inventory
+        # version lue avant l'époque : un snapshot modifié entre les deux
+        # lectures donne (époque locale, ancienne version), jamais l'inverse
+        version = inventory.version
+        return (
+            scope["path"],
+            query,
+            inventory.epoch,
+            version,
+            clock.today().toordinal(),
+            plan.fingerprint if plan is not None else None,
+            hour,
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or scope["path"] not in CACHEABLE_PATHS
+            or wants_ndjson(dict(scope["headers"]).get(b"accept", b"").decode())
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        key = self._key(scope)  # version lue AVANT le rendu (jamais périmé)
+        etag = etag_for(key)
+        if_none_match = dict(scope["headers"]).get(b"if-none-match")
+        if if_none_match is not None and _matches(if_none_match, etag):
+            self.cache.count_not_modified()
+            await self._send_not_modified(send, etag)
+            return
+
+        entry = self.cache.get(key)
+        if entry is None:
+            entry = await self._render(scope, receive, send, etag)
+            if entry is None:  # réponse non cachable, déjà envoyée
+                return
+            self.cache.put(key, entry)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": entry.status,
+                "headers": entry.headers,
+            }
+        )
+        await send({"type": "http.response.body", "body": entry.body})
+
+    async def _render(
+        self, scope: Scope, receive: Receive, send: Send, etag: bytes
+    ) -> Optional[CachedResponse]:
+        start: Dict[str, Any] = {}
+        chunks: List[bytes] = []
+        passthrough = False
+
+        async def capture(message: Message) -> None:
+            nonlocal passthrough
+            if message["type"] == "http.response.start":
+                if message["status"] != 200:  # erreurs : transmises telles quelles
+                    passthrough = True
+                    await send(message)
+                    return
+                start.update(message)
+            elif passthrough:
+                await send(message)
+            else:
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+        if passthrough:
+            return None
+        headers: Headers = [
+            (name, value)
+            for name, value in start["headers"]
+            if name.lower() not in (b"etag", b"cache-control")
+        ]
+        headers += [(b"etag", etag), (b"cache-control", CACHE_CONTROL)]
+        return CachedResponse(etag, start["status"], headers, b"".join(chunks))
+
+    @staticmethod
+    async def _send_not_modified(send: Send, etag: bytes) -> None:
+        headers = [(b"etag", etag), (b"cache-control", CACHE_CONTROL)]
+        await send({"type": "http.response.start", "status": 304, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
@@ -0,0 +1,119 @@
+"""
+Ingestion en masse (POST /products:bulk).
+
+Rôle:
+- Lire le corps de la requête en flux (NDJSON ou CSV), ligne par ligne,
+  sans jamais charger tout le payload en mémoire.
+- Regrouper les lignes en lots et les valider d'un coup avec un
+  TypeAdapter(list[ProductCreate]) (une seule passe Pydantic par lot).
+- Produire, pour chaque ligne invalide, une erreur adressée par son numéro.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+from freshcart.api.schemas import ProductCreate
+
+PRODUCT_BATCH = TypeAdapter(List[ProductCreate])
+
+# Une ligne lue : (numéro de ligne 1-based, données brutes ou message d'erreur)
+RawRow = Tuple[int, Dict[str, Any] | str]
+
+INVALID_UTF8 = "invalid UTF-8"
+
+
+def _decode(line: bytes) -> Optional[str]:
+    try:
+        return line.decode("utf-8").rstrip("\r")
+    except UnicodeDecodeError:
+        return None
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Optional[str]]:
+    """
+    Découpe un flux d'octets en lignes texte non vides. Une ligne qui n'est
+    pas de l'UTF-8 valide donne None : elle devient une erreur de ligne, sans
+    interrompre l'ingestion (les lots précédents sont déjà enregistrés).
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _decode(line)
+    if buffer.strip():
+        yield _decode(buffer)
+
+
+async def iter_ndjson(lines: AsyncIterator[Optional[str]]) -> AsyncIterator[RawRow]:
+    row = 0
+    async for line in lines:
+        row += 1
+        if line is None:
+            yield row, INVALID_UTF8
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield row, f"invalid JSON: {exc.msg}"
+            continue
+        if isinstance(data, dict):
+            yield row, data
+        else:
+            yield row, "each line must be a JSON object"
+
+
+async def iter_csv(lines: AsyncIterator[Optional[str]]) -> AsyncIterator[RawRow]:
+    """
+    CSV avec ligne d'en-tête (sku,name,initial_price,type,expiry_date).
+    Les cellules vides sont omises (valeurs par défaut du schéma).
+    Un en-tête illisible (UTF-8 invalide) rend chaque ligne en erreur.
+    NB: les champs entre guillemets contenant un saut de ligne ne sont pas gérés.
+    """
+    header: Optional[List[str]] = None
+    unreadable_header = False
+    row = 0
+    async for line in lines:
+        if header is None and not unreadable_header:
+            if line is None:
+                unreadable_header = True
+            else:
+                header = [h.strip() for h in next(csv.reader([line]))]
+            continue
+        row += 1
+        if line is None or header is None:
+            yield row, INVALID_UTF8 if line is None else f"header: {INVALID_UTF8}"
+            continue
+        values = next(csv.reader([line]))
+        if len(values) != len(header):
+            yield row, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row, {k: v for k, v in zip(header, values) if v != ""}
+
+
+def validate_batch(
+    rows: List[Dict[str, Any]],
+) -> Tuple[List[Tuple[int, ProductCreate]], Dict[int, List[str]]]:
+    """
+    Valide un lot d'un coup. Retourne les lignes valides (avec leur position
+    dans le lot) et les messages d'erreur indexés par position.
+    """
+    try:
+        return list(enumerate(PRODUCT_BATCH.validate_python(rows))), {}
+    except ValidationError as exc:
+        errors: Dict[int, List[str]] = {}
+        for err in exc.errors():
+            index, *field = err["loc"]
+            where = ".".join(str(part) for part in field)
+            message = f"{where}: {err['msg']}" if where else err["msg"]
+            errors.setdefault(int(index), []).append(message)
+
+    good = [i for i in range(len(rows)) if i not in errors]
+    valid = PRODUCT_BATCH.validate_python([rows[i] for i in good])
+    return list(zip(good, valid)), errors
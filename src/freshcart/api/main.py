@@ -1,12 +1,81 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from pydantic_core import to_json
 
+from freshcart.domain.instrumentation import MetricsRegistry
 from freshcart.domain.inventory import Inventory
+from freshcart.domain.pricing import compile_rules
+from freshcart.domain.repository import ProductRepository
 
-from .routers import health, inventory, products
+from .cache import ResponseCache, ResponseCacheMiddleware
+from .middleware import MetricsScopeMiddleware, PricingDateMiddleware
+
+
+def build_repository(settings: Dict[str, Any]) -> ProductRepository:
+    """
+    Choix du stockage :
+    - "memory" (défaut) : Inventory en mémoire, perdu au redémarrage ;
+      check_totals=True vérifie le total incrémental à chaque lecture (debug)
+    - "sqlite" : fichier SQLite (WAL) partageable entre workers ; chemin via
+      settings["sqlite_path"] ou la variable d'environnement FRESHCART_SQLITE_PATH
+    - "snapshot" : snapshot binaire relu par mmap (Inventory.save_snapshot),
+      pages partagées entre workers, en mémoire dès la première écriture ;
+      chemin via settings["snapshot_path"] ou FRESHCART_SNAPSHOT_PATH
+    """
+    storage = settings.get("storage") or os.environ.get("FRESHCART_STORAGE", "memory")
+    if storage == "sqlite":
+        from freshcart.storage.sqlite import SqliteInventory
+
+        path = settings.get("sqlite_path") or os.environ.get(
+            "FRESHCART_SQLITE_PATH", "freshcart.db"
+        )
+        return SqliteInventory(path)
+    if storage == "snapshot":
+        path = settings.get("snapshot_path") or os.environ.get(
+            "FRESHCART_SNAPSHOT_PATH", "freshcart.snap"
+        )
+        return Inventory.load_snapshot(path)
+    if storage != "memory":
+        raise ValueError(f"unknown storage backend: {storage}")
+    return Inventory(check_totals=bool(settings.get("check_totals")))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Tâches de fond de l'application (balayeur d'expiration)."""
+    sweeper = app.state.sweeper
+    if sweeper is None:
+        yield
+        return
+    import asyncio
+
+    task = asyncio.create_task(sweeper.run(app.state.sweep_interval))
+    try:
+        yield
+    finally:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+async def validation_error(request: Request, exc: Exception) -> Response:
+    """
+    422 au format de FastAPI, mais les valeurs non finies reprises dans
+    `input` (ex: un prix Infinity refusé) sont rendues en null : le rendu
+    par défaut (json.dumps strict) échouerait en 500.
+    """
+    assert isinstance(exc, RequestValidationError)  # enregistré pour ce type
+    body = to_json({"detail": jsonable_encoder(exc.errors())}, inf_nan_mode="null")
+    return Response(body, status_code=422, media_type="application/json")
 
 
 def create_app(settings: Dict[str, Any] | None = None) -> FastAPI:
@@ -16,6 +85,7 @@ def create_app(settings: Dict[str, Any] | None = None) -> FastAPI:
     - point unique pour injecter des settings plus tard (DB, CORS, etc.)
     """
     app = FastAPI(
+        lifespan=lifespan,
         title="FreshCart API",
         version="0.1.0",
         description="API d'entraînement pour gérer des produits/inventaires.",
@@ -25,14 +95,79 @@ def create_app(settings: Dict[str, Any] | None = None) -> FastAPI:
     )
 
     settings = settings or {}
+    app.add_exception_handler(RequestValidationError, validation_error)
 
-    # État applicatif en mémoire pour ce sprint (remplacé plus tard par une DB)
-    app.state.inventory = Inventory()
+    app.state.inventory = build_repository(settings)
+
+    # Multi-magasins (voir domain/sharding.py) : settings={"stores": [ids]}
+    # expose /stores/... ; sans magasins, ces routes ne sont pas montées
+    store_ids = settings.get("stores")
+    app.state.stores = None
+    if store_ids:
+        from freshcart.domain.sharding import ShardedInventory
+
+        app.state.stores = ShardedInventory(store_ids)
+
+    # Balayeur d'expiration (voir domain/sweeper.py) : settings=
+    # {"expiry_sweeper": secondes} range les périssables en paquets
+    # fresh/discounted/expired, tenus à jour par une tâche de fond
+    # (lifespan) ; /products/expired et /products/discounted les servent
+    interval = settings.get("expiry_sweeper")
+    app.state.sweeper = None
+    app.state.sweep_interval = float(interval or 0)
+    if interval:
+        from freshcart.domain.sweeper import ExpirySweeper
+
+        app.state.sweeper = ExpirySweeper(app.state.inventory)
+
+    # Instrumentation du domaine exposée sur /metrics, sur demande :
+    # settings={"metrics": True}. Le registre est propre à l'application
+    # (posé par requête, voir plus bas) : le collecteur global (set_sink)
+    # et les autres applications du processus ne sont pas touchés
+    app.state.metrics = MetricsRegistry() if settings.get("metrics") else None
+
+    # Remises configurables (voir domain/pricing.py) : liste de règles
+    # compilée une fois ; sans règles, price_factor() des produits s'applique.
+    # Le plan est propre à l'application (lu par get_pricing_plan)
+    rules = settings.get("pricing_rules")
+    app.state.pricing_plan = compile_rules(rules) if rules else None
+
+    # Cache HTTP des lectures + ETag (voir api/cache.py) ;
+    # settings={"response_cache": 0} le désactive
+    cache_size = int(settings.get("response_cache", 256))
+    app.state.response_cache = ResponseCache(cache_size) if cache_size else None
+    if app.state.response_cache is not None:
+        app.add_middleware(ResponseCacheMiddleware, cache=app.state.response_cache)
+
+    if app.state.metrics is not None:
+        app.add_middleware(MetricsScopeMiddleware, sink=app.state.metrics)
+
+    # une seule date de tarification par requête (voir api/middleware.py) ;
+    # ajouté en dernier, donc exécuté en premier (englobe le cache)
+    app.add_middleware(PricingDateMiddleware)
+
+    # Brancher les routers : importés ici, et seulement ceux qui servent
+    # (démarrage plus court, voir tests/test_import_time.py)
+    from .routers import health, inventory, products
 
-    # Brancher les routers
     app.include_router(health.router)
-    app.include_router(products.router)
-    app.include_router(inventory.router)
+    if app.state.metrics is not None:
+        from .routers import metrics
+
+        app.include_router(metrics.router)
+    business = [products.router, inventory.router]
+    if app.state.stores is not None:
+        from .routers import stores
+
+        business.append(stores.router)
+    # Les endpoints métier restent des `def` : FastAPI les exécute déjà dans
+    # son threadpool, donc l'attente du RWLock ou d'une requête SQLite ne
+    # bloque jamais la boucle. Une coroutine qui déléguerait elle-même au
+    # threadpool n'ajouterait qu'un saut. Seuls les endpoints qui attendent
+    # des I/O asynchrones (corps en flux, SSE) sont `async def`, et passent
+    # leurs appels au domaine par run_in_threadpool.
+    for router in business:
+        app.include_router(router)
 
     return app
 
@@ -0,0 +1,39 @@
+"""
+Middlewares ASGI de l'API.
+
+`PricingDateMiddleware` fige la date de tarification pour toute la durée
+d'une requête (voir freshcart.domain.clock) : l'horloge n'est lue qu'une
+fois, et une réponse (y compris en streaming) ne mélange jamais deux jours.
+"""
+
+from __future__ import annotations
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from freshcart.domain.clock import pricing_date
+from freshcart.domain.instrumentation import MetricsSink, sink_scope
+
+
+class PricingDateMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with pricing_date():
+            await self.app(scope, receive, send)
+
+
+class MetricsScopeMiddleware:
+    def __init__(self, app: ASGIApp, sink: MetricsSink) -> None:
+        self.app = app
+        self.sink = sink
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with sink_scope(self.sink):
+            await self.app(scope, receive, send)
@@ -7,16 +7,18 @@ Expose :
 
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, Optional
 
 from fastapi import APIRouter, Depends, Request
 
-from freshcart.domain.inventory import Inventory
+from freshcart.api.serializers import get_pricing_plan
+from freshcart.domain.pricing import PricingPlan
+from freshcart.domain.repository import ProductRepository
 
 router = APIRouter(prefix="/inventory", tags=["inventory"])
 
 
-def get_inventory(request: Request) -> Inventory:
+def get_inventory(request: Request) -> ProductRepository:
     inv = getattr(request.app.state, "inventory", None)
     if inv is None:
         raise RuntimeError("Inventory is not initialized on app.state")
@@ -24,6 +26,15 @@ def get_inventory(request: Request) -> Inventory:
 
 
 @router.get("/value", response_model=Dict[str, float])
-def get_total_value(inv: Inventory = Depends(get_inventory)) -> dict[str, float]:
-    """Retourne la somme des final_price() (arrondie côté domaine)."""
+def get_total_value(
+    inv: ProductRepository = Depends(get_inventory),
+    plan: Optional[PricingPlan] = Depends(get_pricing_plan),
+) -> dict[str, float]:
+    """
+    Retourne la somme des final_price() (arrondie côté domaine).
+    Avec un plan de remises (settings["pricing_rules"]), le total est
+    recalculé par le plan : O(n) au lieu du total incrémental.
+    """
+    if plan is not None:
+        return {"total_value": plan.total_value(inv.all())}
     return {"total_value": inv.total_value()}
@@ -0,0 +1,36 @@
+"""
+Router /metrics
+
+Expose les compteurs d'appels et histogrammes de latence des méthodes du
+domaine (Inventory.add, remove, expired, total_value...) au format texte
+Prometheus, pour être "scrapé" à côté de /health ; ainsi que les compteurs
+du cache HTTP (hit / miss / not_modified) s'il est activé.
+"""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from freshcart.domain.instrumentation import MetricsRegistry
+
+router = APIRouter(tags=["health"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def get_metrics(request: Request) -> MetricsRegistry:
+    registry = getattr(request.app.state, "metrics", None)
+    if registry is None:
+        raise RuntimeError("Metrics registry is not initialized on app.state")
+    return registry
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics(request: Request) -> PlainTextResponse:
+    """Renvoie les métriques au format d'exposition Prometheus."""
+    body = get_metrics(request).render_prometheus()
+    cache = getattr(request.app.state, "response_cache", None)
+    if cache is not None:
+        body += cache.render_prometheus()
+    return PlainTextResponse(body, media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,41 +1,87 @@
 from __future__ import annotations
 
-from typing import List, Literal
+import asyncio
+import base64
+import binascii
+import json
+from datetime import date
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
 
-from freshcart.api.schemas import ProductCreate, ProductOut
-from freshcart.domain.inventory import Inventory
-from freshcart.domain.products import PerishableProduct, Product
+from freshcart.api.ingest import iter_csv, iter_lines, iter_ndjson, validate_batch
+from freshcart.api.schemas import (
+    BulkReport,
+    BulkRowError,
+    ChangesOut,
+    PriceUpdate,
+    PriceUpdateReport,
+    ProductCreate,
+    ProductOut,
+)
+from freshcart.api.serializers import (
+    NDJSON_TYPES,
+    get_pricing_plan,
+    listing_response,
+    product_dict,
+)
+from freshcart.domain.clock import get_clock, pricing_date
+from freshcart.domain.inventory import (
+    DuplicateSkuError,
+    ProductNotFoundError,
+    SortKey,
+)
+from freshcart.domain.pricing import PricingPlan
+from freshcart.domain.products import DISCOUNT_WINDOW_DAYS, PerishableProduct, Product
+from freshcart.domain.repository import ProductRepository
+from freshcart.domain.sweeper import ExpirySweeper
 
 router = APIRouter(prefix="/products", tags=["products"])
 
+# nombre maximal d'erreurs détaillées dans le rapport d'ingestion
+BULK_MAX_ERRORS = 1000
+# en-tête portant le curseur de la page suivante (absent sur la dernière page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
 
 # Dépendance: récupérer l'inventaire stocké dans app.state
-def get_inventory(request: Request) -> Inventory:
+def get_inventory(request: Request) -> ProductRepository:
     inv = getattr(request.app.state, "inventory", None)
     if inv is None:
         raise RuntimeError("Inventory is not initialized on app.state")
     return inv
 
 
-# Mapping domaine -> schéma de sortie API
-def to_product_out(p: Product) -> ProductOut:
-    type_value: Literal["regular", "perishable"]
-    if hasattr(p, "expiry_date"):
-        type_value = "perishable"
-        expiry = getattr(p, "expiry_date")
-    else:
-        type_value = "regular"
-        expiry = None
-
-    return ProductOut(
-        sku=p.sku,
-        name=p.name,
-        type=type_value,
-        price=p.price,
-        final_price=p.final_price(),
-        expiry_date=expiry,
+# Mapping domaine -> schéma de sortie API (un produit ; les listes passent
+# par serializers.listing_response, sans modèle Pydantic intermédiaire)
+def to_product_out(p: Product, plan: Optional[PricingPlan] = None) -> ProductOut:
+    return ProductOut.model_validate(product_dict(p, plan=plan))
+
+
+# Mapping schéma d'entrée API -> domaine
+def to_product(payload: ProductCreate) -> Product:
+    if payload.type == "regular":
+        return Product(payload.sku, payload.name, payload.initial_price)
+    # Pydantic v2 garantit que expiry_date est renseigné pour les périssables,
+    # mais mypy ne l'infère pas → assertion pour le typage statique.
+    assert payload.expiry_date is not None, "expiry_date validated by Pydantic"
+    return PerishableProduct(
+        payload.sku,
+        payload.name,
+        payload.initial_price,
+        expiry_date=payload.expiry_date,
     )
 
 
@@ -46,37 +92,327 @@ def to_product_out(p: Product) -> ProductOut:
 )
 def create_product(
     payload: ProductCreate,
-    inv: Inventory = Depends(get_inventory),
+    inv: ProductRepository = Depends(get_inventory),
+    plan: Optional[PricingPlan] = Depends(get_pricing_plan),
 ) -> ProductOut:
-    # Unicité basique du SKU
-    if any(it.sku == payload.sku for it in inv.all()):
-        raise HTTPException(status_code=400, detail="SKU already exists")
+    # Unicité du SKU : test + insertion atomiques côté domaine (pas de
+    # course entre deux requêtes concurrentes sur le même SKU)
+    p = to_product(payload)
+    try:
+        inv.add(p)
+    except DuplicateSkuError:
+        raise HTTPException(status_code=400, detail="SKU already exists") from None
+    return to_product_out(p, plan)
 
-    if payload.type == "regular":
-        p = Product(payload.sku, payload.name, payload.initial_price)
+
+def _record_error(report: BulkReport, row: int, sku: Any, errors: List[str]) -> None:
+    report.failed += 1
+    if len(report.errors) < BULK_MAX_ERRORS:
+        sku_str = None if sku is None else str(sku)
+        report.errors.append(BulkRowError(row=row, sku=sku_str, errors=errors))
+
+
+def _ingest_batch(
+    batch: List[Tuple[int, Dict[str, Any]]], inv: ProductRepository, report: BulkReport
+) -> None:
+    """Valide un lot en une passe, puis l'insère en une seule mise à jour."""
+    valid, errors = validate_batch([data for _, data in batch])
+    for i, messages in errors.items():
+        row, data = batch[i]
+        _record_error(report, row, data.get("sku"), messages)
+
+    products: Dict[str, Product] = {}
+    rows: Dict[str, int] = {}
+    for i, payload in valid:
+        if payload.sku in products:
+            _record_error(report, batch[i][0], payload.sku, ["SKU already exists"])
+            continue
+        products[payload.sku] = to_product(payload)
+        rows[payload.sku] = batch[i][0]
+    skipped = inv.add_many(products.values(), skip_duplicates=True)
+    for p in skipped:
+        _record_error(report, rows[p.sku], p.sku, ["SKU already exists"])
+    report.created += len(products) - len(skipped)
+
+
+@router.post(":bulk", response_model=BulkReport)
+async def bulk_create_products(
+    request: Request,
+    batch_size: int = Query(1000, ge=1, le=10_000),
+    inv: ProductRepository = Depends(get_inventory),
+) -> BulkReport:
+    """
+    Crée des produits en masse depuis un corps NDJSON (une ligne = un objet
+    ProductCreate) ou CSV (avec en-tête). Le corps est lu en flux et traité
+    par lots de `batch_size` lignes : la mémoire ne dépend pas de sa taille.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    lines = iter_lines(request.stream())
+    if content_type == "text/csv":
+        rows = iter_csv(lines)
+    elif content_type in NDJSON_TYPES:
+        rows = iter_ndjson(lines)
     else:
-        # Pydantic v2 garantit que expiry_date est renseigné pour les périssables,
-        # mais mypy ne l'infère pas → assertion pour le typage statique.
-        assert payload.expiry_date is not None, "expiry_date validated by Pydantic"
-        p = PerishableProduct(
-            payload.sku,
-            payload.name,
-            payload.initial_price,
-            expiry_date=payload.expiry_date,
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Expected application/x-ndjson or text/csv",
         )
 
-    inv.add(p)
-    return to_product_out(p)
+    report = BulkReport()
+    batch: List[Tuple[int, Dict[str, Any]]] = []
+    async for row, data in rows:
+        report.received += 1
+        if isinstance(data, str):  # ligne illisible (JSON/CSV invalide)
+            _record_error(report, row, None, [data])
+            continue
+        batch.append((row, data))
+        if len(batch) >= batch_size:
+            # validation et écriture bloquantes : hors de la boucle d'événements
+            await run_in_threadpool(_ingest_batch, batch, inv, report)
+            batch = []
+    if batch:
+        await run_in_threadpool(_ingest_batch, batch, inv, report)
+    return report
+
+
+@router.patch("/prices", response_model=PriceUpdateReport)
+def update_prices(
+    payload: PriceUpdate, inv: ProductRepository = Depends(get_inventory)
+) -> PriceUpdateReport:
+    """
+    Change les prix d'un lot de produits en une mise à jour atomique (index
+    et tris reconstruits une fois par lot). Un SKU inconnu -> 404 avec la
+    liste des SKU inconnus, un prix invalide -> 422, et aucun prix n'est
+    modifié.
+    """
+    try:
+        updated = inv.bulk_update_prices(payload.prices)
+    except ProductNotFoundError:
+        missing = [sku for sku in payload.prices if sku not in inv]
+        raise HTTPException(
+            status_code=404,
+            detail={"message": "Product not found", "skus": missing[:BULK_MAX_ERRORS]},
+        ) from None
+    except ValueError as exc:  # prix refusé par le domaine (non fini, < 0)
+        raise HTTPException(status_code=422, detail=str(exc)) from None
+    return PriceUpdateReport(updated=updated, version=inv.version)
+
+
+# Curseur opaque : clé de tri du dernier élément servi, en JSON base64
+def encode_cursor(sort: str, key: SortKey) -> str:
+    raw = json.dumps([sort, *key], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(sort: str, cursor: str) -> SortKey:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+    if not isinstance(data, list) or len(data) < 2 or data[0] != sort:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return tuple(data[1:])
 
 
 @router.get("", response_model=List[ProductOut])
-def list_products(inv: Inventory = Depends(get_inventory)) -> List[ProductOut]:
-    items = sorted(inv.all())  # tri naturel via dataclass(order=True)
-    return [to_product_out(p) for p in items]
+def list_products(
+    sort: Literal["price", "sku", "expiry"] = "price",
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    accept: str = Header("application/json"),
+    inv: ProductRepository = Depends(get_inventory),
+    plan: Optional[PricingPlan] = Depends(get_pricing_plan),
+) -> Response:
+    """
+    Liste les produits triés (ordre mis en cache côté domaine jusqu'à la
+    prochaine mutation). Avec `limit`, renvoie une page et, s'il reste des
+    produits, le curseur de la page suivante dans l'en-tête X-Next-Cursor.
+    `Accept: application/x-ndjson` : flux NDJSON, un produit par ligne.
+    """
+    if limit is None and cursor is None:
+        return listing_response(accept, inv.iter_sorted(sort), plan=plan)
+
+    after = None if cursor is None else decode_cursor(sort, cursor)
+    try:
+        items, next_key = inv.page(sort, limit or 100, after)
+    except TypeError:  # clé du curseur incomparable avec l'ordre de tri
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+    headers = {}
+    if next_key is not None:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(sort, next_key)
+    return listing_response(accept, items, headers, plan)
+
+
+def get_sweeper(request: Request) -> Optional[ExpirySweeper]:
+    """Balayeur d'expiration, si activé (settings["expiry_sweeper"])."""
+    return getattr(request.app.state, "sweeper", None)
 
 
 @router.get("/expired", response_model=List[ProductOut])
-def list_expired(inv: Inventory = Depends(get_inventory)) -> List[ProductOut]:
+def list_expired(
+    accept: str = Header("application/json"),
+    inv: ProductRepository = Depends(get_inventory),
+    sweeper: Optional[ExpirySweeper] = Depends(get_sweeper),
+    plan: Optional[PricingPlan] = Depends(get_pricing_plan),
+) -> Response:
     """Liste uniquement les périssables périmés."""
-    expired_items = inv.expired()
-    return [to_product_out(p) for p in expired_items]
+    if sweeper is not None:
+        return listing_response(accept, sweeper.expired(), plan=plan)
+    return listing_response(accept, inv.iter_expired(), plan=plan)
+
+
+@router.get("/discounted", response_model=List[ProductOut])
+def list_discounted(
+    accept: str = Header("application/json"),
+    inv: ProductRepository = Depends(get_inventory),
+    sweeper: Optional[ExpirySweeper] = Depends(get_sweeper),
+    plan: Optional[PricingPlan] = Depends(get_pricing_plan),
+) -> Response:
+    """Liste les périssables dans la fenêtre de remise (-50%)."""
+    if sweeper is not None:
+        return listing_response(accept, sweeper.discounted(), plan=plan)
+    expiring = inv.iter_expiring_within(DISCOUNT_WINDOW_DAYS)
+    return listing_response(accept, expiring, plan=plan)
+
+
+@router.get("/expiring", response_model=List[ProductOut])
+def list_expiring(
+    days: int = Query(3, ge=0),
+    accept: str = Header("application/json"),
+    inv: ProductRepository = Depends(get_inventory),
+    plan: Optional[PricingPlan] = Depends(get_pricing_plan),
+) -> Response:
+    """Liste les périssables non périmés qui expirent dans `days` jours ou moins."""
+    return listing_response(accept, inv.iter_expiring_within(days), plan=plan)
+
+
+@router.get("/search", response_model=List[ProductOut])
+def search_products(
+    name_prefix: Optional[str] = Query(None, min_length=1),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    type: Optional[Literal["regular", "perishable"]] = None,
+    expires_before: Optional[date] = None,
+    accept: str = Header("application/json"),
+    inv: ProductRepository = Depends(get_inventory),
+    plan: Optional[PricingPlan] = Depends(get_pricing_plan),
+) -> Response:
+    """
+    Recherche côté serveur, triée par prix : préfixe du nom, fourchette de
+    prix [min_price, max_price], type, et périssables qui expirent avant
+    `expires_before`. Les critères se combinent (ET).
+    """
+    items = inv.search(name_prefix, min_price, max_price, type, expires_before)
+    return listing_response(accept, items, plan=plan)
+
+
+def changes_payload(
+    inv: ProductRepository, since: int, plan: Optional[PricingPlan] = None
+) -> Dict[str, Any]:
+    """
+    Modifications depuis `since`, réduites à la dernière par SKU (dans
+    l'ordre de ces dernières) ; les produits sont servis dans leur état
+    courant, au moins aussi récent que `version`.
+    """
+    version, changes = inv.changes_since(since)
+    if changes is None:
+        return {"version": version, "resync": True, "changes": []}
+    last: Dict[str, str] = {}
+    for change in changes:
+        last.pop(change.sku, None)
+        last[change.sku] = change.op
+    out: List[Dict[str, Any]] = []
+    for sku, op in last.items():
+        product = None
+        if op != "remove":
+            try:
+                product = product_dict(inv.get(sku), plan=plan)
+            except ProductNotFoundError:  # retiré depuis la lecture du journal
+                pass
+        out.append(
+            {
+                "sku": sku,
+                "op": "remove" if product is None else "upsert",
+                "product": product,
+            }
+        )
+    return {"version": version, "resync": False, "changes": out}
+
+
+@router.get("/changes", response_model=ChangesOut)
+def list_changes(
+    since: int = Query(0, ge=0),
+    inv: ProductRepository = Depends(get_inventory),
+    plan: Optional[PricingPlan] = Depends(get_pricing_plan),
+) -> Response:
+    """
+    Synchronisation incrémentale : modifications depuis la version `since`
+    (0 = depuis le début, tant que le journal le permet). Le trafic suit
+    le volume de modifications, pas la taille du catalogue.
+    """
+    payload = changes_payload(inv, since, plan)
+    return Response(to_json(payload), media_type="application/json")
+
+
+@router.get("/changes/stream")
+async def stream_changes(
+    request: Request,
+    since: int = Query(0, ge=0),
+    poll: float = Query(0.5, gt=0, le=30),
+    max_events: Optional[int] = Query(None, ge=1),
+    inv: ProductRepository = Depends(get_inventory),
+    plan: Optional[PricingPlan] = Depends(get_pricing_plan),
+) -> StreamingResponse:
+    """
+    Variante Server-Sent Events : un évènement "changes" (ou "resync") à
+    chaque nouvelle version, détectée en sondant la version toutes les
+    `poll` secondes. `max_events` ferme le flux après n évènements. Les
+    lectures de l'inventaire (verrou, requête SQLite) se font dans le
+    threadpool, jamais sur la boucle d'événements.
+    """
+
+    def next_payload(cursor: int) -> Dict[str, Any]:
+        # flux longue durée : date de tarification relue à chaque envoi
+        with pricing_date(get_clock()()):
+            return changes_payload(inv, cursor, plan)
+
+    async def events() -> AsyncIterator[bytes]:
+        cursor, sent = since, 0
+        while max_events is None or sent < max_events:
+            version = await run_in_threadpool(getattr, inv, "version")
+            if version != cursor:
+                payload = await run_in_threadpool(next_payload, cursor)
+                event = "resync" if payload["resync"] else "changes"
+                yield (
+                    f"id: {payload['version']}\nevent: {event}\ndata: ".encode()
+                    + to_json(payload)
+                    + b"\n\n"
+                )
+                cursor, sent = payload["version"], sent + 1
+            elif await request.is_disconnected():
+                break
+            else:
+                await asyncio.sleep(poll)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+# NB: déclarées après /expired, /discounted..., sinon "/{sku}" les capturerait.
+@router.get("/{sku}", response_model=ProductOut)
+def get_product(
+    sku: str,
+    inv: ProductRepository = Depends(get_inventory),
+    plan: Optional[PricingPlan] = Depends(get_pricing_plan),
+) -> ProductOut:
+    try:
+        return to_product_out(inv.get(sku), plan)
+    except ProductNotFoundError:
+        raise HTTPException(status_code=404, detail="Product not found") from None
+
+
+@router.delete("/{sku}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_product(sku: str, inv: ProductRepository = Depends(get_inventory)) -> None:
+    try:
+        inv.remove(sku)
+    except ProductNotFoundError:
+        raise HTTPException(status_code=404, detail="Product not found") from None
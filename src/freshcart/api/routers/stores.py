@@ -0,0 +1,176 @@
+"""
+Router /stores (inventaire multi-magasins, voir domain/sharding.py)
+
+Expose :
+- GET    /stores                              : magasins, nombre de produits, valeur
+- GET    /stores/value                        : valeur de la chaîne (somme des magasins)
+- GET    /stores/expired                      : périmés de toute la chaîne
+- POST   /stores/{store_id}/products          : ajoute un produit au magasin
+- GET    /stores/{store_id}/products          : produits du magasin, triés
+- GET    /stores/{store_id}/products/expired  : périmés du magasin
+- GET    /stores/{store_id}/products/{sku}    : un produit du magasin
+- DELETE /stores/{store_id}/products/{sku}    : retire un produit du magasin
+- GET    /stores/{store_id}/inventory/value   : valeur du magasin
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Literal, Optional
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Request,
+    Response,
+    status,
+)
+from pydantic_core import to_json
+
+from freshcart.api.routers.products import to_product, to_product_out
+from freshcart.api.schemas import (
+    ChainValueOut,
+    ProductCreate,
+    ProductOut,
+    StoreOut,
+    StoreProductOut,
+)
+from freshcart.api.serializers import get_pricing_plan, listing_response, product_dict
+from freshcart.domain.inventory import (
+    DuplicateSkuError,
+    Inventory,
+    ProductNotFoundError,
+)
+from freshcart.domain.pricing import PricingPlan
+from freshcart.domain.sharding import ShardedInventory, UnknownStoreError
+
+router = APIRouter(prefix="/stores", tags=["stores"])
+
+
+def get_stores(request: Request) -> ShardedInventory:
+    stores = getattr(request.app.state, "stores", None)
+    if stores is None:
+        raise RuntimeError("Stores are not initialized on app.state")
+    return stores
+
+
+def get_store(
+    store_id: str, stores: ShardedInventory = Depends(get_stores)
+) -> Inventory:
+    try:
+        return stores.store(store_id)
+    except UnknownStoreError:
+        raise HTTPException(status_code=404, detail="Store not found") from None
+
+
+def store_totals(
+    stores: ShardedInventory, plan: Optional[PricingPlan] = None
+) -> Dict[str, float]:
+    """Valeur par magasin ; avec un plan de remises, recalculée par le plan."""
+    if plan is None:
+        return stores.store_totals()
+    return {sid: plan.total_value(stores.store(sid).all()) for sid in stores.store_ids}
+
+
+@router.get("", response_model=List[StoreOut])
+def list_stores(
+    stores: ShardedInventory = Depends(get_stores),
+    plan: Optional[PricingPlan] = Depends(get_pricing_plan),
+) -> List[StoreOut]:
+    return [
+        StoreOut(store_id=sid, products=len(stores.store(sid)), total_value=value)
+        for sid, value in store_totals(stores, plan).items()
+    ]
+
+
+@router.get("/value", response_model=ChainValueOut)
+def get_chain_value(
+    stores: ShardedInventory = Depends(get_stores),
+    plan: Optional[PricingPlan] = Depends(get_pricing_plan),
+) -> ChainValueOut:
+    totals = store_totals(stores, plan)
+    total = sum(round(v * 100) for v in totals.values()) / 100
+    return ChainValueOut(total_value=total, stores=totals)
+
+
+@router.get("/expired", response_model=List[StoreProductOut])
+def list_chain_expired(
+    stores: ShardedInventory = Depends(get_stores),
+    plan: Optional[PricingPlan] = Depends(get_pricing_plan),
+) -> Response:
+    """Périmés de tous les magasins, triés par date d'expiration puis SKU."""
+    items: List[Dict[str, Any]] = []
+    for store_id, product in stores.expired():
+        item = product_dict(product, plan=plan)
+        item["store_id"] = store_id
+        items.append(item)
+    return Response(to_json(items), media_type="application/json")
+
+
+@router.post(
+    "/{store_id}/products",
+    response_model=ProductOut,
+    status_code=status.HTTP_201_CREATED,
+)
+def create_store_product(
+    payload: ProductCreate,
+    inv: Inventory = Depends(get_store),
+    plan: Optional[PricingPlan] = Depends(get_pricing_plan),
+) -> ProductOut:
+    p = to_product(payload)
+    try:
+        inv.add(p)
+    except DuplicateSkuError:
+        raise HTTPException(status_code=400, detail="SKU already exists") from None
+    return to_product_out(p, plan)
+
+
+@router.get("/{store_id}/products", response_model=List[ProductOut])
+def list_store_products(
+    sort: Literal["price", "sku", "expiry"] = "price",
+    accept: str = Header("application/json"),
+    inv: Inventory = Depends(get_store),
+    plan: Optional[PricingPlan] = Depends(get_pricing_plan),
+) -> Response:
+    return listing_response(accept, inv.iter_sorted(sort), plan=plan)
+
+
+@router.get("/{store_id}/products/expired", response_model=List[ProductOut])
+def list_store_expired(
+    accept: str = Header("application/json"),
+    inv: Inventory = Depends(get_store),
+    plan: Optional[PricingPlan] = Depends(get_pricing_plan),
+) -> Response:
+    return listing_response(accept, inv.iter_expired(), plan=plan)
+
+
+# NB: déclarées après /expired, sinon "/{sku}" capturerait "/expired".
+@router.get("/{store_id}/products/{sku}", response_model=ProductOut)
+def get_store_product(
+    sku: str,
+    inv: Inventory = Depends(get_store),
+    plan: Optional[PricingPlan] = Depends(get_pricing_plan),
+) -> ProductOut:
+    try:
+        return to_product_out(inv.get(sku), plan)
+    except ProductNotFoundError:
+        raise HTTPException(status_code=404, detail="Product not found") from None
+
+
+@router.delete("/{store_id}/products/{sku}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_store_product(sku: str, inv: Inventory = Depends(get_store)) -> None:
+    try:
+        inv.remove(sku)
+    except ProductNotFoundError:
+        raise HTTPException(status_code=404, detail="Product not found") from None
+
+
+@router.get("/{store_id}/inventory/value", response_model=Dict[str, float])
+def get_store_value(
+    inv: Inventory = Depends(get_store),
+    plan: Optional[PricingPlan] = Depends(get_pricing_plan),
+) -> dict[str, float]:
+    if plan is not None:
+        return {"total_value": plan.total_value(inv.all())}
+    return {"total_value": inv.total_value()}
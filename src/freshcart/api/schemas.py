@@ -9,7 +9,7 @@ Rôle:
 from __future__ import annotations
 
 from datetime import date
-from typing import Literal, Optional
+from typing import Annotated, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator, model_validator
 
@@ -20,14 +20,14 @@ class ProductCreate(BaseModel):
     """
     Requête de création de produit.
 
-    - initial_price >= 0 (validation)
+    - initial_price >= 0 et fini (validation)
     - type = "regular" | "perishable"
     - si "perishable" -> expiry_date est requis (validation "after")
     """
 
     sku: str = Field(..., min_length=1, max_length=50)
     name: str = Field(..., min_length=1, max_length=200)
-    initial_price: float = Field(..., ge=0.0)
+    initial_price: float = Field(..., ge=0.0, allow_inf_nan=False)
     type: Literal["regular", "perishable"] = "regular"
     expiry_date: Optional[date] = None
 
@@ -48,6 +48,17 @@ class ProductCreate(BaseModel):
         return self
 
 
+class PriceUpdate(BaseModel):
+    """
+    Changement de prix en lot : {"prices": {"SKU1": 1.99, "SKU2": 0.5}}.
+    Tous les SKU doivent exister ; le lot est appliqué en entier ou pas du tout.
+    """
+
+    prices: Dict[str, Annotated[float, Field(ge=0.0, allow_inf_nan=False)]] = Field(
+        ..., min_length=1, max_length=100_000
+    )
+
+
 # ---------- Sorties ----------
 
 
@@ -63,3 +74,74 @@ class ProductOut(BaseModel):
     price: float
     final_price: float
     expiry_date: Optional[date] = None
+
+
+class StoreProductOut(ProductOut):
+    """Produit d'un magasin (listes à l'échelle de la chaîne)."""
+
+    store_id: str
+
+
+class StoreOut(BaseModel):
+    """Résumé d'un magasin (shard) de la chaîne."""
+
+    store_id: str
+    products: int
+    total_value: float
+
+
+class ChainValueOut(BaseModel):
+    """Valeur de la chaîne et détail par magasin."""
+
+    total_value: float
+    stores: Dict[str, float]
+
+
+class ChangeOut(BaseModel):
+    """
+    Modification d'un produit depuis la version demandée (une par SKU) :
+    "upsert" avec l'état courant du produit, ou "remove".
+    """
+
+    sku: str
+    op: Literal["upsert", "remove"]
+    product: Optional[ProductOut] = None
+
+
+class ChangesOut(BaseModel):
+    """
+    Réponse de synchronisation incrémentale. `resync=True` : le journal ne
+    remonte plus jusqu'à la version demandée, le client doit tout recharger
+    (GET /products) puis reprendre depuis `version`.
+    """
+
+    version: int
+    resync: bool = False
+    changes: List[ChangeOut] = Field(default_factory=list)
+
+
+class PriceUpdateReport(BaseModel):
+    """Résultat d'un changement de prix en lot."""
+
+    updated: int
+    version: int
+
+
+class BulkRowError(BaseModel):
+    """Erreur d'une ligne du payload d'ingestion (numérotée à partir de 1)."""
+
+    row: int
+    sku: Optional[str] = None
+    errors: List[str]
+
+
+class BulkReport(BaseModel):
+    """
+    Rapport d'ingestion en masse.
+    `errors` est tronqué (voir `failed` pour le nombre total de lignes rejetées).
+    """
+
+    received: int = 0
+    created: int = 0
+    failed: int = 0
+    errors: List[BulkRowError] = Field(default_factory=list)
@@ -0,0 +1,163 @@
+"""
+Sérialisation rapide des listes de produits.
+
+Les endpoints de liste n'instancient plus un ProductOut par produit : chaque
+type du domaine a un encodeur précalculé qui produit directement le dict de
+sortie (mêmes champs que ProductOut), et les lots de dicts sont encodés en
+octets JSON par pydantic_core. La date du jour n'est lue qu'une fois par liste.
+Avec un plan de remises (freshcart.domain.pricing), passé par l'appelant
+(`plan=`, celui de l'application : get_pricing_plan), le plan fournit les
+prix finaux de chaque lot en une passe.
+
+Le schéma OpenAPI reste celui de ProductOut (response_model des routes).
+
+Mode flux : avec `Accept: application/x-ndjson`, les listes sont servies en
+NDJSON (un produit par ligne) par une StreamingResponse qui encode et envoie
+un lot à la fois : la mémoire ne dépend plus de la taille de l'inventaire.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
+
+from freshcart.domain import clock
+from freshcart.domain.pricing import PricingPlan
+from freshcart.domain.products import PerishableProduct, Product
+
+ProductDict = Dict[str, Any]
+Encoder = Callable[[Product, date], ProductDict]
+
+# nombre de produits encodés par appel à pydantic_core.to_json
+BATCH_SIZE = 1000
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_TYPES = {NDJSON_MEDIA_TYPE, "application/jsonl", "application/ndjson"}
+
+
+def _encode_regular(p: Product, today: date) -> ProductDict:
+    return {
+        "sku": p.sku,
+        "name": p.name,
+        "type": "regular",
+        "price": p.price,
+        "final_price": p.price_at(today),
+        "expiry_date": None,
+    }
+
+
+def _encode_perishable(p: Product, today: date) -> ProductDict:
+    assert isinstance(p, PerishableProduct)
+    return {
+        "sku": p.sku,
+        "name": p.name,
+        "type": "perishable",
+        "price": p.price,
+        "final_price": p.price_at(today),
+        "expiry_date": p.expiry_date,
+    }
+
+
+_ENCODERS: Dict[type, Encoder] = {
+    Product: _encode_regular,
+    PerishableProduct: _encode_perishable,
+}
+
+
+def _encoder_for(cls: type) -> Encoder:
+    """Encodeur du type, ou de son plus proche parent connu (mis en cache)."""
+    encoder = _ENCODERS.get(cls)
+    if encoder is None:
+        parent = next(c for c in cls.__mro__ if c in _ENCODERS)
+        encoder = _ENCODERS[cls] = _ENCODERS[parent]
+    return encoder
+
+
+def get_pricing_plan(request: Request) -> Optional[PricingPlan]:
+    """Dépendance : plan de remises de l'application (settings["pricing_rules"])."""
+    return getattr(request.app.state, "pricing_plan", None)
+
+
+def _encode_batch(
+    products: List[Product], day: date, plan: Optional[PricingPlan]
+) -> List[ProductDict]:
+    batch = [_encoder_for(type(p))(p, day) for p in products]
+    if plan is not None:
+        for item, price in zip(batch, plan.price_all(products, day)):
+            item["final_price"] = price
+    return batch
+
+
+def product_dict(
+    p: Product, today: Optional[date] = None, plan: Optional[PricingPlan] = None
+) -> ProductDict:
+    """Dict de sortie d'un produit (champs de ProductOut)."""
+    return _encode_batch([p], today or clock.today(), plan)[0]
+
+
+def encode_products(
+    products: Iterable[Product],
+    today: Optional[date] = None,
+    plan: Optional[PricingPlan] = None,
+) -> bytes:
+    """Encode une liste de produits en un tableau JSON, par lots."""
+    day = today or clock.today()
+    parts: List[bytes] = []
+    items = iter(products)
+    while batch := list(islice(items, BATCH_SIZE)):
+        encoded = to_json(_encode_batch(batch, day, plan))
+        parts.append(encoded[1:-1])  # sans les crochets
+    return b"[" + b",".join(parts) + b"]"
+
+
+def products_response(
+    products: Iterable[Product],
+    headers: Optional[Mapping[str, str]] = None,
+    plan: Optional[PricingPlan] = None,
+) -> Response:
+    """Réponse JSON brute (pas de revalidation par response_model)."""
+    return Response(
+        content=encode_products(products, plan=plan),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+def wants_ndjson(accept: str) -> bool:
+    """Le client demande-t-il du NDJSON (valeur de l'en-tête Accept) ?"""
+    return any(part.split(";")[0].strip() in NDJSON_TYPES for part in accept.split(","))
+
+
+def iter_ndjson(
+    products: Iterable[Product], today: date, plan: Optional[PricingPlan] = None
+) -> Iterator[bytes]:
+    """Lignes NDJSON des produits, un bloc d'octets par lot de BATCH_SIZE."""
+    items = iter(products)
+    while batch := list(islice(items, BATCH_SIZE)):
+        encoded = _encode_batch(batch, today, plan)
+        yield b"".join(to_json(item) + b"\n" for item in encoded)
+
+
+def listing_response(
+    accept: str,
+    products: Iterable[Product],
+    headers: Optional[Mapping[str, str]] = None,
+    plan: Optional[PricingPlan] = None,
+) -> Response:
+    """
+    Réponse d'une liste de produits : tableau JSON, ou flux NDJSON si le
+    client l'accepte. La date de tarification est lue ici, pendant la
+    requête (le flux est encodé après le retour de l'endpoint).
+    """
+    if wants_ndjson(accept):
+        return StreamingResponse(
+            iter_ndjson(products, clock.today(), plan),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers=headers,
+        )
+    return products_response(products, headers, plan)
@@ -0,0 +1,152 @@
+"""
+Tarification en lot, parallélisable sur plusieurs processus.
+
+`price_many(products, executor=...)` calcule les prix finaux (mêmes règles
+que final_price()) de tout un catalogue :
+- le processus parent extrait deux colonnes compactes, prix et ordinal
+  d'expiration (0 = régulier), en tableaux `array` : c'est tout ce qui est
+  sérialisé vers les workers, pas les dataclasses ;
+- les colonnes sont découpées en paquets de `chunk_size` produits, tarifés
+  par `price_chunk` (fonction de module, donc picklable) dans l'exécuteur,
+  typiquement un ProcessPoolExecutor (un cœur par worker) ;
+- le résultat (PriceBatch) regroupe le tableau des prix, dans l'ordre des
+  produits, et les agrégats (valeur totale en cents exacts, nombre de
+  produits remisés et périmés).
+
+Sans exécuteur, les paquets sont tarifés dans le processus courant.
+Inventory.price_all() tarife ainsi tout l'inventaire.
+
+Les paquets appliquent les règles intégrées (seuils et coefficients de
+freshcart.domain.products). Avec `plan=` (PricingPlan autre que
+DEFAULT_RULES), les prix viennent du plan, dans le processus courant.
+"""
+
+from __future__ import annotations
+
+from array import array
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from datetime import date
+from itertools import repeat
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from freshcart.domain import clock
+from freshcart.domain.products import (
+    DISCOUNT_FACTOR,
+    DISCOUNT_WINDOW_DAYS,
+    EXPIRED_FACTOR,
+    PerishableProduct,
+    Product,
+)
+
+if TYPE_CHECKING:
+    from freshcart.domain.pricing import PricingPlan
+
+# produits par tâche : assez pour amortir l'aller-retour vers un worker
+PRICE_CHUNK = 250_000
+
+
+@dataclass(frozen=True, slots=True)
+class PriceBatch:
+    skus: List[str]
+    prices: array  # prix finaux ("d"), dans l'ordre de skus
+    total_value: float  # somme des prix finaux (en cents entiers, comme Inventory)
+    discounted: int  # périssables remisés (non périmés, sous leur prix)
+    expired: int  # périssables périmés
+
+    def as_dict(self) -> Dict[str, float]:
+        return dict(zip(self.skus, self.prices))
+
+
+ChunkResult = Tuple[array, int, int, int]
+
+
+def price_chunk(prices: array, expiries: array, today: int) -> ChunkResult:
+    """Tarifie un paquet : (prix finaux, total en cents, remisés, périmés)."""
+    out = array("d")
+    append = out.append
+    total = discounted = expired = 0
+    window = today + DISCOUNT_WINDOW_DAYS
+    for price, expiry in zip(prices, expiries):
+        if expiry and expiry <= window:
+            if expiry < today:
+                price = round(price * EXPIRED_FACTOR, 2)
+                expired += 1
+            else:  # fenêtre de remise (comme discounted_price, sans appel)
+                price = round(price * DISCOUNT_FACTOR, 2)
+                discounted += 1
+        append(price)
+        total += round(price * 100)
+    return out, total, discounted, expired
+
+
+def columns(products: Iterable[Product]) -> Tuple[List[str], array, array]:
+    """(skus, prix "d", ordinaux d'expiration "l") des produits."""
+    skus: List[str] = []
+    prices = array("d")
+    expiries = array("l")
+    ordinals: Dict[date, int] = {}  # peu de dates distinctes (voir _DATE_POOL)
+    for p in products:
+        skus.append(p.sku)
+        prices.append(p._price)
+        if isinstance(p, PerishableProduct):
+            ordinal = ordinals.get(p.expiry_date)
+            if ordinal is None:
+                ordinal = ordinals[p.expiry_date] = p.expiry_date.toordinal()
+            expiries.append(ordinal)
+        else:
+            expiries.append(0)
+    return skus, prices, expiries
+
+
+def price_many(
+    products: Iterable[Product],
+    executor: Optional[Executor] = None,
+    day: Optional[date] = None,
+    chunk_size: int = PRICE_CHUNK,
+    plan: Optional[PricingPlan] = None,
+) -> PriceBatch:
+    """
+    Prix finaux et agrégats de `products` à la date `day` (défaut : clock),
+    selon les règles intégrées ou le plan `plan`.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+    if plan is not None and not plan.is_default:
+        return _plan_batch(products, plan, day or clock.today())
+    today = (day or clock.today()).toordinal()
+    skus, prices, expiries = columns(products)
+    bounds = range(0, len(skus), chunk_size)
+    price_chunks = [prices[i : i + chunk_size] for i in bounds]
+    expiry_chunks = [expiries[i : i + chunk_size] for i in bounds]
+    results: Iterator[ChunkResult]
+    if executor is None:
+        results = map(price_chunk, price_chunks, expiry_chunks, repeat(today))
+    else:
+        results = executor.map(price_chunk, price_chunks, expiry_chunks, repeat(today))
+
+    finals = array("d")
+    total = discounted = expired = 0
+    for chunk, cents, n_discounted, n_expired in results:
+        finals.extend(chunk)
+        total += cents
+        discounted += n_discounted
+        expired += n_expired
+    return PriceBatch(skus, finals, total / 100, discounted, expired)
+
+
+def _plan_batch(
+    products: Iterable[Product], plan: PricingPlan, day: date
+) -> PriceBatch:
+    """price_many() selon un plan : prix du plan, mêmes agrégats."""
+    items = list(products)
+    finals = array("d", plan.price_all(items, day))
+    total = discounted = expired = 0
+    for p, price in zip(items, finals):
+        total += round(price * 100)
+        if isinstance(p, PerishableProduct):
+            if p.expiry_date < day:
+                expired += 1
+            elif price < p._price:
+                discounted += 1
+    return PriceBatch([p.sku for p in items], finals, total / 100, discounted, expired)
@@ -0,0 +1,51 @@
+"""
+Horloge injectable et date de tarification.
+
+Tout le domaine (Product, PerishableProduct, Inventory, stockages) lit la
+date du jour via `today()` plutôt que `date.today()` :
+- `set_clock(fn)` remplace l'horloge globale (tests, benchmarks
+  déterministes) ; `set_clock(None)` revient à `date.today` ;
+- `with pricing_date() as day:` fige la date pour le bloc courant
+  (contextvar, donc propre à chaque requête / tâche / thread) : une longue
+  liste est tarifée avec une seule lecture d'horloge, et tous les calculs
+  du bloc voient le même jour même s'il se termine après minuit.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date
+from typing import Callable, Iterator, Optional
+
+Clock = Callable[[], date]
+
+_clock: Clock = date.today
+_pinned: ContextVar[Optional[date]] = ContextVar("pricing_date", default=None)
+
+
+def set_clock(clock: Optional[Clock]) -> None:
+    """Installe (ou retire avec None) l'horloge globale."""
+    global _clock
+    _clock = clock or date.today
+
+
+def get_clock() -> Clock:
+    return _clock
+
+
+def today() -> date:
+    """Date de tarification : celle figée par pricing_date(), sinon l'horloge."""
+    pinned = _pinned.get()
+    return pinned if pinned is not None else _clock()
+
+
+@contextmanager
+def pricing_date(day: Optional[date] = None) -> Iterator[date]:
+    """Fige la date de tarification (par défaut : une lecture de l'horloge)."""
+    pinned = day or today()
+    token = _pinned.set(pinned)
+    try:
+        yield pinned
+    finally:
+        _pinned.reset(token)
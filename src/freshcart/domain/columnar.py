@@ -0,0 +1,211 @@
+"""
+Inventaire "colonnaire" adossé à NumPy (dépendance optionnelle).
+
+Même surface publique qu'`Inventory` (add, remove, all, expired, total_value),
+mais les produits sont stockés colonne par colonne dans des tableaux contigus :
+- sku / name  : tableaux d'objets (str)
+- prix        : int64 en cents (pas de dérive flottante dans les sommes)
+- expiration  : datetime64[D], NaT pour les produits non périssables
+
+Les règles de `PerishableProduct.final_price` (0 si périmé, -50% dans la
+fenêtre de remise) sont évaluées en une seule passe vectorisée.
+
+Les objets Product renvoyés par all()/expired()/get() sont reconstruits à la
+demande : ce sont des copies, modifier leur prix n'affecte pas l'inventaire.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from freshcart.domain import clock
+from freshcart.domain.inventory import DuplicateSkuError, ProductNotFoundError
+from freshcart.domain.products import (
+    DISCOUNT_FACTOR,
+    DISCOUNT_WINDOW_DAYS,
+    EXPIRED_FACTOR,
+    PerishableProduct,
+    Product,
+    discounted_price,
+)
+
+_NAT = np.datetime64("NaT", "D")
+
+
+def _half_cents(price: float) -> int:
+    """Prix remisé en cents, arrondi exactement comme PerishableProduct."""
+    return round(discounted_price(price) * 100)
+
+
+class ColumnarInventory:
+    def __init__(self, capacity: int = 1024) -> None:
+        capacity = max(capacity, 1)
+        self._sku = np.empty(capacity, dtype=object)
+        self._name = np.empty(capacity, dtype=object)
+        self._price = np.zeros(capacity, dtype=np.int64)
+        # prix remisé précalculé à l'ajout (cents) : la passe vectorisée
+        # n'a plus qu'à choisir entre plein tarif, remise et zéro.
+        self._half = np.zeros(capacity, dtype=np.int64)
+        self._expiry = np.full(capacity, _NAT, dtype="datetime64[D]")
+        # les suppressions posent une "pierre tombale" ; compactage paresseux
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._size = 0  # lignes utilisées (vivantes + supprimées)
+        self._rows: Dict[str, int] = {}
+
+    # --- construction en masse ---
+    @classmethod
+    def from_columns(
+        cls,
+        skus: Sequence[str],
+        names: Sequence[str],
+        prices: Sequence[float] | np.ndarray,
+        expiry_dates: Optional[Sequence[Optional[date]] | np.ndarray] = None,
+    ) -> ColumnarInventory:
+        """
+        Construit un inventaire à partir de colonnes déjà prêtes
+        (expiry_dates: None / NaT pour les produits non périssables).
+        """
+        n = len(skus)
+        price_arr = np.asarray(prices, dtype=np.float64)
+        if len(names) != n or len(price_arr) != n:
+            raise ValueError("columns must have the same length")
+        if (price_arr < 0).any():
+            raise ValueError("price cannot be negative")
+
+        inv = cls(capacity=n)
+        for row, sku in enumerate(skus):
+            if sku in inv._rows:
+                raise DuplicateSkuError(f"Produit {sku} déjà présent")
+            inv._rows[sku] = row
+
+        inv._sku[:n] = skus
+        inv._name[:n] = names
+        cents = np.rint(price_arr * 100).astype(np.int64)
+        inv._price[:n] = cents
+        # remise exacte en cents entiers (ex: cents pairs à -50%) ; sinon
+        # arrondi Python, comme PerishableProduct (cas limite)
+        scaled = cents * DISCOUNT_FACTOR
+        half = scaled.astype(np.int64)
+        inexact = np.flatnonzero(scaled != half)
+        half[inexact] = [_half_cents(c / 100) for c in cents[inexact].tolist()]
+        inv._half[:n] = half
+        if expiry_dates is not None:
+            inv._expiry[:n] = np.asarray(expiry_dates, dtype="datetime64[D]")
+        inv._alive[:n] = True
+        inv._size = n
+        return inv
+
+    # --- API commune avec Inventory ---
+    def add(self, product: Product) -> None:
+        if product.sku in self._rows:
+            raise DuplicateSkuError(f"Produit {product.sku} déjà présent")
+        if self._size == len(self._alive):
+            self._grow()
+        row = self._size
+        self._sku[row] = product.sku
+        self._name[row] = product.name
+        self._price[row] = round(product.price * 100)
+        self._half[row] = _half_cents(product.price)
+        if isinstance(product, PerishableProduct):
+            self._expiry[row] = np.datetime64(product.expiry_date, "D")
+        else:
+            self._expiry[row] = _NAT
+        self._alive[row] = True
+        self._rows[product.sku] = row
+        self._size += 1
+
+    def remove(self, sku: str) -> None:
+        row = self._rows.pop(sku, None)
+        if row is None:
+            raise ProductNotFoundError(f"Produit {sku} introuvable")
+        self._alive[row] = False
+        self._sku[row] = self._name[row] = None  # libère les chaînes
+        if len(self._rows) * 2 < self._size:
+            self._compact()
+
+    def get(self, sku: str) -> Product:
+        try:
+            return self._product(self._rows[sku])
+        except KeyError:
+            raise ProductNotFoundError(f"Produit {sku} introuvable") from None
+
+    def __contains__(self, sku: object) -> bool:
+        return sku in self._rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def all(self) -> List[Product]:
+        rows = np.flatnonzero(self._alive[: self._size])
+        return self._products(rows.tolist())
+
+    def expired(self) -> List[Product]:
+        """Périssables périmés, triés par (date d'expiration, sku)."""
+        n = self._size
+        today = np.datetime64(clock.today(), "D")
+        expiry = self._expiry[:n]
+        mask = self._alive[:n] & ~np.isnat(expiry) & (expiry < today)
+        rows = np.flatnonzero(mask).tolist()
+        rows.sort(key=lambda r: (self._expiry[r], self._sku[r]))
+        return self._products(rows)
+
+    def final_prices(self, day: Optional[date] = None) -> np.ndarray:
+        """Prix finaux en cents (int64) des lignes vivantes, à la date `day`."""
+        n = self._size
+        today = np.datetime64(day or clock.today(), "D")
+        expiry = self._expiry[:n]
+        days = (expiry - today).astype(np.int64)  # NaT -> valeur sentinelle
+        perishable = ~np.isnat(expiry)
+        # prix périmé recalculé en cents (exact tant que EXPIRED_FACTOR = 0)
+        cents = np.where(
+            perishable & (days < 0),
+            np.rint(self._price[:n] * EXPIRED_FACTOR).astype(np.int64),
+            np.where(
+                perishable & (days <= DISCOUNT_WINDOW_DAYS),
+                self._half[:n],
+                self._price[:n],
+            ),
+        )
+        return cents[self._alive[:n]]
+
+    def total_value(self) -> float:
+        return int(self.final_prices().sum()) / 100
+
+    # --- interne ---
+    def _product(self, row: int) -> Product:
+        sku, name = self._sku[row], self._name[row]
+        price = int(self._price[row]) / 100
+        expiry = self._expiry[row]
+        if np.isnat(expiry):
+            return Product(sku, name, price)
+        return PerishableProduct(sku, name, price, expiry_date=expiry.item())
+
+    def _products(self, rows: Iterable[int]) -> List[Product]:
+        return [self._product(r) for r in rows]
+
+    def _grow(self) -> None:
+        capacity = len(self._alive) * 2
+        for attr in ("_sku", "_name", "_price", "_half", "_expiry", "_alive"):
+            old = getattr(self, attr)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[: len(old)] = old
+            if attr == "_expiry":
+                new[len(old) :] = _NAT
+            elif attr == "_alive":
+                new[len(old) :] = False
+            setattr(self, attr, new)
+
+    def _compact(self) -> None:
+        """Supprime les lignes mortes en conservant l'ordre d'insertion."""
+        keep = np.flatnonzero(self._alive[: self._size])
+        for attr in ("_sku", "_name", "_price", "_half", "_expiry", "_alive"):
+            col = getattr(self, attr)
+            col[: len(keep)] = col[keep]
+        self._alive[len(keep) : self._size] = False
+        self._sku[len(keep) : self._size] = None
+        self._name[len(keep) : self._size] = None
+        self._size = len(keep)
+        self._rows = {sku: row for row, sku in enumerate(self._sku[: self._size])}
@@ -0,0 +1,165 @@
+"""
+Instrumentation des méthodes du domaine (add, remove, expired, total_value...).
+
+- `instrumented("add")` décore une méthode ; tant qu'aucun collecteur n'est
+  installé, l'enveloppe se réduit à une lecture de variable globale.
+- `set_sink(sink)` installe un collecteur : `MetricsRegistry` (compteurs et
+  histogrammes de latence, exportables au format Prometheus) ou `LoggingSink`.
+- `set_sink(None)` désactive l'instrumentation.
+- `sink_scope(sink)` remplace le collecteur global pour le contexte courant
+  (une requête d'une application donnée, voir api/middleware.py) : plusieurs
+  applications d'un même processus ont chacune leurs mesures.
+"""
+
+from __future__ import annotations
+
+import functools
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    TypeVar,
+)
+
+if TYPE_CHECKING:  # logging n'est importé qu'à la création d'un LoggingSink
+    import logging
+
+# Type générique pour le décorateur
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Bornes (en secondes) des histogrammes de latence
+DEFAULT_BUCKETS = (
+    0.00001,
+    0.00005,
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+)
+
+
+class MetricsSink(Protocol):
+    def record(self, name: str, seconds: float) -> None: ...
+
+
+_sink: Optional[MetricsSink] = None
+# collecteur du contexte courant ; absent -> collecteur global
+_scoped: ContextVar[Optional[MetricsSink]] = ContextVar("metrics_sink")
+
+
+def set_sink(sink: Optional[MetricsSink]) -> None:
+    """Installe (ou retire avec None) le collecteur global."""
+    global _sink
+    _sink = sink
+
+
+def get_sink() -> Optional[MetricsSink]:
+    return _sink
+
+
+@contextmanager
+def sink_scope(sink: Optional[MetricsSink]) -> Iterator[None]:
+    """Installe `sink` (None : aucune mesure) pour le contexte courant."""
+    token = _scoped.set(sink)
+    try:
+        yield
+    finally:
+        _scoped.reset(token)
+
+
+def instrumented(name: str) -> Callable[[F], F]:
+    """Décorateur : mesure la durée de chaque appel sous le nom `name`."""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            sink = _scoped.get(_sink)
+            if sink is None:  # désactivé : aucun coût au-delà de ce test
+                return func(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                sink.record(name, perf_counter() - start)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+class LoggingSink:
+    """Envoie chaque mesure au module logging (niveau DEBUG)."""
+
+    def __init__(self, logger: Optional[logging.Logger] = None) -> None:
+        import logging
+
+        self._logger = logger or logging.getLogger("freshcart.domain")
+
+    def record(self, name: str, seconds: float) -> None:
+        self._logger.debug("%s took %.6fs", name, seconds)
+
+
+class _Histogram:
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.counts: List[int] = [0] * (len(buckets) + 1)  # dernier = +Inf
+        self.total = 0.0
+
+
+class MetricsRegistry:
+    """Compteurs d'appels et histogrammes de latence par méthode."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self._histograms: Dict[str, _Histogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float) -> None:
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            hist = self._histograms.get(name)
+            if hist is None:
+                hist = self._histograms[name] = _Histogram(self.buckets)
+            hist.counts[index] += 1
+            hist.total += seconds
+
+    def count(self, name: str) -> int:
+        with self._lock:
+            hist = self._histograms.get(name)
+            return sum(hist.counts) if hist else 0
+
+    def render_prometheus(self) -> str:
+        """Exporte les mesures au format texte Prometheus (v0.0.4)."""
+        metric = "freshcart_domain_call_seconds"
+        lines = [
+            f"# HELP {metric} Latency of freshcart domain methods.",
+            f"# TYPE {metric} histogram",
+        ]
+        with self._lock:
+            for name in sorted(self._histograms):
+                hist = self._histograms[name]
+                cumulative = 0
+                bounds = [repr(b) for b in self.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, hist.counts):
+                    cumulative += count
+                    lines.append(
+                        f'{metric}_bucket{{method="{name}",le="{bound}"}} {cumulative}'
+                    )
+                lines.append(f'{metric}_sum{{method="{name}"}} {hist.total!r}')
+                lines.append(f'{metric}_count{{method="{name}"}} {cumulative}')
+        return "\n".join(lines) + "\n"
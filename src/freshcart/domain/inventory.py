@@ -1,9 +1,43 @@
-from typing import Any, Callable, List, TypeVar
+import math
+import os
+import sys
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from dataclasses import dataclass
+from datetime import date
+from operator import itemgetter
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ContextManager,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
 
-from freshcart.domain.products import Product
+from freshcart.domain import clock
+from freshcart.domain.instrumentation import instrumented
+from freshcart.domain.locks import RWLock
+from freshcart.domain.products import (
+    DISCOUNT_WINDOW_DAYS,
+    PerishableProduct,
+    Product,
+    is_valid_price,
+)
 
-# Type générique pour le décorateur
-F = TypeVar("F", bound=Callable[..., Any])
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from freshcart.domain.batch import PriceBatch
+    from freshcart.domain.pricing import PricingPlan
+    from freshcart.domain.snapshot import SnapshotInventory
 
 
 class ProductNotFoundError(Exception):
@@ -12,41 +46,604 @@ class ProductNotFoundError(Exception):
     pass
 
 
-def log_call(func: F) -> F:
-    """Décorateur qui logge le nom de la fonction lors de l'appel."""
+class DuplicateSkuError(Exception):
+    """Levée quand on ajoute un SKU déjà présent dans l'inventaire."""
+
+    pass
+
+
+def _cents(value: float) -> int:
+    """Montant en cents (entier) : la somme incrémentale ne dérive pas."""
+    return round(value * 100)
+
+
+# Produits lus par prise du verrou dans les itérateurs (iter_all, iter_expired...)
+ITER_CHUNK = 1000
+
+# Taille par défaut du journal des modifications (voir Inventory.changes_since)
+CHANGE_LOG_SIZE = 10_000
+
+
+@dataclass(frozen=True, slots=True)
+class Change:
+    """Entrée du journal des modifications."""
+
+    version: int  # version de l'inventaire après la modification
+    op: str  # "add", "remove" ou "price"
+    sku: str
+
+
+# Clé de tri d'une page : tuple comparable (ex: (prix, sku)), dont le dernier
+# élément est toujours le SKU pour garantir un ordre total.
+SortKey = Tuple[Any, ...]
+
+
+def _expiry_sort_key(p: Product) -> SortKey:
+    # les produits non périssables passent après tous les périssables
+    if isinstance(p, PerishableProduct):
+        return (p.expiry_date.toordinal(), p.sku)
+    return (date.max.toordinal() + 1, p.sku)
+
 
-    def wrapper(*args: Any, **kwargs: Any) -> Any:
-        # NOTE: args[0] est souvent 'self' si on décore une méthode.
-        print(f"[LOG] Calling {func.__name__}")
-        return func(*args, **kwargs)
+# Ordres de tri disponibles ; "price" = ordre naturel de Product (order=True)
+SORT_KEYS: Dict[str, Callable[[Product], SortKey]] = {
+    "price": lambda p: (p.price, p.sku),
+    "sku": lambda p: (p.sku,),
+    "expiry": _expiry_sort_key,
+}
 
-    return wrapper  # type: ignore[return-value]
+
+def _prefix_end(prefix: str) -> Optional[str]:
+    """Plus petite chaîne supérieure à toutes celles qui commencent par prefix."""
+    while prefix and prefix[-1] == chr(sys.maxunicode):
+        prefix = prefix[:-1]
+    if not prefix:
+        return None
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
 
 
 class Inventory:
-    def __init__(self) -> None:
-        self._items: List[Product] = []
+    """
+    Inventaire en mémoire, partageable entre threads : les lectures se font
+    en parallèle, les mutations sont exclusives (RWLock). Les méthodes
+    publiques prennent le verrou une seule fois ; les méthodes privées
+    (_xxx) supposent qu'il est déjà détenu.
+    """
+
+    def __init__(
+        self, check_totals: bool = False, change_log_size: int = CHANGE_LOG_SIZE
+    ) -> None:
+        self._lock = RWLock()
+        # protège la correction paresseuse du total (faite sous verrou lecture)
+        self._value_lock = threading.Lock()
+        # Index SKU -> produit. Un dict conserve l'ordre d'insertion,
+        # donc all() reste dans l'ordre d'ajout, et les accès par SKU
+        # (get, remove, "in") sont en O(1).
+        self._items: Dict[str, Product] = {}
+        # Index des périssables trié par date d'expiration : (ordinal, sku).
+        # expired()/expiring_within() deviennent des recherches par bisection
+        # qui ne touchent ni les produits non périssables ni le stock frais.
+        # NB: expiry_date ne doit pas être modifiée une fois le produit ajouté.
+        self._by_expiry: List[Tuple[int, str]] = []
+        # Index secondaires de search(), triés : (nom, sku) pour les préfixes
+        # de nom, (prix, sku) pour les fourchettes de prix (l'ordre naturel de
+        # Product, dont le premier champ comparé est le prix). Construits à la
+        # première recherche (None avant : les écritures ne paient rien tant
+        # qu'on ne cherche pas), puis tenus à jour à chaque mutation ; l'index
+        # des prix suit le setter Product.price (voir price_changed).
+        # NB: comme expiry_date, le nom ne doit pas changer après l'ajout.
+        self._by_name: Optional[List[Tuple[str, str]]] = None
+        self._by_price: Optional[List[Tuple[float, str]]] = None
+        # Valeur totale maintenue incrémentalement (en cents) pour _value_day.
+        # Mise à jour sur add/remove/changement de prix, et corrigée au
+        # changement de date pour les seuls périssables qui franchissent
+        # une frontière (entrée dans la fenêtre de remise, expiration).
+        self._value_day: date = clock.today()
+        self._value_cents: int = 0
+        # mode debug : compare le total courant à un recalcul complet
+        self._check_totals = check_totals
+        # Version incrémentée à chaque mutation (ajout, retrait, prix).
+        # Les listes triées sont mises en cache par ordre de tri et ne sont
+        # reconstruites que si la version a changé depuis leur calcul.
+        self._version = 0
+        # Époque : les versions d'un autre Inventory (autre processus, ou
+        # redémarrage) repartent de 0 et ne sont pas comparables à celles-ci
+        self._epoch = os.urandom(8).hex()
+        # NB: les listes du cache ne sont jamais modifiées en place (une
+        # nouvelle liste par version) : iter_sorted() les parcourt sans copie.
+        self._sort_cache: Dict[str, Tuple[int, List[SortKey], List[Product]]] = {}
+        # Journal borné des dernières modifications, pour la synchro
+        # incrémentale des clients (GET /products/changes). Les versions
+        # <= _changes_floor ont été évincées : un client plus ancien doit
+        # tout recharger.
+        if change_log_size < 1:
+            raise ValueError("change_log_size must be >= 1")
+        self._changes: Deque[Change] = deque(maxlen=change_log_size)
+        self._changes_floor = 0
 
-    @log_call
+    @instrumented("add")
     def add(self, product: Product) -> None:
-        self._items.append(product)
+        """Ajoute le produit ; le test d'unicité et l'ajout sont atomiques."""
+        with self._lock.write():
+            if product.sku in self._items:
+                raise DuplicateSkuError(f"Produit {product.sku} déjà présent")
+            self._items[product.sku] = product
+            self._track(product)
+
+    @instrumented("add_many")
+    def add_many(
+        self, products: Iterable[Product], skip_duplicates: bool = False
+    ) -> List[Product]:
+        """
+        Ajout en lot. L'index d'expiration est fusionné une seule fois pour
+        tout le lot.
+        - skip_duplicates=False : atomique, si un SKU est déjà présent (ou
+          répété dans le lot), DuplicateSkuError et rien n'est ajouté ;
+        - skip_duplicates=True : les doublons sont ignorés et retournés.
+        """
+        batch: Dict[str, Product] = {}
+        skipped: List[Product] = []
+        with self._lock.write():
+            for product in products:
+                if product.sku in self._items or product.sku in batch:
+                    if not skip_duplicates:
+                        raise DuplicateSkuError(f"Produit {product.sku} déjà présent")
+                    skipped.append(product)
+                    continue
+                batch[product.sku] = product
+
+            self._items.update(batch)
+            self._version += 1
+            expiry_keys: List[Tuple[int, str]] = []
+            for product in batch.values():
+                self._log("add", product.sku)
+                if isinstance(product, PerishableProduct):
+                    expiry_keys.append((product.expiry_date.toordinal(), product.sku))
+                self._value_cents += _cents(product.price_at(self._value_day))
+                product.add_owner(self)
+            if expiry_keys:
+                # Timsort fusionne les deux séquences triées en temps linéaire
+                expiry_keys.sort()
+                self._by_expiry.extend(expiry_keys)
+                self._by_expiry.sort()
+            if batch and self._by_name is not None and self._by_price is not None:
+                self._by_name.extend((p.name, p.sku) for p in batch.values())
+                self._by_name.sort()
+                self._by_price.extend((p._price, p.sku) for p in batch.values())
+                self._by_price.sort()
+        return skipped
 
+    def _restore(self, products: Iterable[Product]) -> None:
+        """
+        Remplit un inventaire vide comme add_many(), mais en état initial :
+        version 0 et journal vide (ex: dégel d'un snapshot, qui ne change
+        pas le catalogue).
+        """
+        with self._lock.write():
+            if self._items:
+                raise ValueError("_restore() needs an empty inventory")
+            self.add_many(products)
+            self._version = 0
+            self._changes.clear()
+            self._changes_floor = 0
+
+    def upsert(self, product: Product) -> Optional[Product]:
+        """
+        Ajoute le produit, ou remplace celui qui a le même SKU.
+        Retourne le produit remplacé (None si c'est un ajout).
+        """
+        with self._lock.write():
+            previous = self._items.get(product.sku)
+            if previous is not None:
+                self._untrack(previous)
+            self._items[product.sku] = product
+            self._track(product)
+            return previous
+
+    def get(self, sku: str) -> Product:
+        with self._lock.read():
+            try:
+                return self._items[sku]
+            except KeyError:
+                raise ProductNotFoundError(f"Produit {sku} introuvable") from None
+
+    @instrumented("remove")
     def remove(self, sku: str) -> None:
-        for p in self._items:
-            if p.sku == sku:
-                self._items.remove(p)
-                return
-        raise ProductNotFoundError(f"Produit {sku} introuvable")
+        with self._lock.write():
+            product = self._items.pop(sku, None)
+            if product is None:
+                raise ProductNotFoundError(f"Produit {sku} introuvable")
+            self._untrack(product)
+
+    @instrumented("bulk_update_prices")
+    def bulk_update_prices(self, prices: Mapping[str, float]) -> int:
+        """
+        Change les prix de plusieurs produits (sku -> nouveau prix), de façon
+        atomique : tout le lot est validé d'abord (SKU présents, prix finis
+        et >= 0), sinon ProductNotFoundError / ValueError et rien n'est
+        modifié. Chaque prix passe par le setter (arrondi, price_changed) ;
+        l'index des prix de search() est reconstruit une fois pour le lot,
+        pas un insort par produit. Retourne le nombre de produits mis à jour.
+        """
+        with self._lock.write():
+            products: List[Tuple[Product, float]] = []
+            for sku, price in prices.items():
+                product = self._items.get(sku)
+                if product is None:
+                    raise ProductNotFoundError(f"Produit {sku} introuvable")
+                if not is_valid_price(price):
+                    raise ValueError(f"invalid price for {sku}: {price}")
+                products.append((product, price))
+            # sans index pendant le lot, price_changed ne le touche pas
+            by_price, self._by_price = self._by_price, None
+            try:
+                for product, price in products:
+                    product.price = price
+            finally:
+                if by_price is not None:
+                    changed = {p.sku for p, _ in products}
+                    by_price = [e for e in by_price if e[1] not in changed]
+                    by_price.extend((p._price, p.sku) for p, _ in products)
+                    by_price.sort()  # Timsort : fusion de deux séquences triées
+                self._by_price = by_price
+            return len(products)
+
+    def __contains__(self, sku: object) -> bool:
+        return sku in self._items  # lecture atomique d'un dict
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def version(self) -> int:
+        """Numéro de version, incrémenté à chaque mutation de l'inventaire."""
+        return self._version
+
+    @property
+    def epoch(self) -> str:
+        """Époque de cet inventaire (aléatoire : ses données meurent avec lui)."""
+        return self._epoch
+
+    def changes_since(self, since: int) -> Tuple[int, Optional[List[Change]]]:
+        """
+        (version courante, modifications de version > since, dans l'ordre).
+        La liste vaut None si le journal ne remonte plus jusqu'à `since`
+        (ou si `since` est inconnu) : le client doit alors tout recharger.
+        """
+        with self._lock.read():
+            if since < self._changes_floor or since > self._version:
+                return self._version, None
+            changes: List[Change] = []
+            for change in reversed(self._changes):
+                if change.version <= since:
+                    break
+                changes.append(change)
+            changes.reverse()
+            return self._version, changes
 
     def all(self) -> List[Product]:
-        return list(self._items)
+        """Copie (instantané) de la liste des produits, dans l'ordre d'ajout."""
+        with self._lock.read():
+            return list(self._items.values())
+
+    def sorted_by(self, sort: str = "price") -> List[Product]:
+        """Produits triés selon `sort` (voir SORT_KEYS), depuis le cache."""
+        with self._lock.read():
+            return list(self._sorted(sort)[1])
 
+    def page(
+        self, sort: str = "price", limit: int = 100, after: Optional[SortKey] = None
+    ) -> Tuple[List[Product], Optional[SortKey]]:
+        """
+        Page de `limit` produits triés, qui suivent la clé `after` (curseur).
+        Retourne (produits, clé du dernier produit s'il reste une suite).
+        Coût O(log n + limit) tant que l'inventaire n'a pas changé.
+        """
+        with self._lock.read():
+            keys, items = self._sorted(sort)
+        start = 0 if after is None else bisect_right(keys, tuple(after))
+        end = start + limit
+        next_key = keys[end - 1] if end < len(items) else None
+        return items[start:end], next_key
+
+    @instrumented("expired")
     def expired(self) -> List[Product]:
-        return [
-            p
-            for p in self._items
-            if hasattr(p, "is_expired") and getattr(p, "is_expired")
-        ]
+        """Périssables dont la date est passée, du plus ancien au plus récent."""
+        today = clock.today().toordinal()
+        with self._lock.read():
+            return self._expiring_between(None, today - 1)
+
+    def expiring_within(self, days: int) -> List[Product]:
+        """Périssables non périmés qui expirent dans `days` jours ou moins."""
+        today = clock.today().toordinal()
+        with self._lock.read():
+            return self._expiring_between(today, today + days)
+
+    def discounted(self) -> List[Product]:
+        """Périssables dans la fenêtre de remise (-50%)."""
+        return self.expiring_within(DISCOUNT_WINDOW_DAYS)
+
+    @instrumented("search")
+    def search(
+        self,
+        name_prefix: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        product_type: Optional[str] = None,
+        expires_before: Optional[date] = None,
+    ) -> List[Product]:
+        """
+        Produits qui remplissent tous les critères, triés par (prix, sku) :
+        - name_prefix : le nom commence par ce préfixe (sensible à la casse) ;
+        - min_price / max_price : prix (hors remise) dans [min, max] ;
+        - product_type : "regular" ou "perishable" ;
+        - expires_before : périssables qui expirent avant cette date (exclue).
+        Les candidats viennent de l'index le plus sélectif (nom, prix ou
+        expiration, bornés par bisection) ; les autres critères ne sont
+        vérifiés que sur ces candidats.
+        """
+        if product_type not in (None, "regular", "perishable"):
+            raise ValueError(f"unknown product type: {product_type}")
+        if expires_before is not None and product_type == "regular":
+            return []
+
+        def matches(p: Product) -> bool:
+            if name_prefix and not p.name.startswith(name_prefix):
+                return False
+            if min_price is not None and p._price < min_price:
+                return False
+            if max_price is not None and p._price > max_price:
+                return False
+            perishable = isinstance(p, PerishableProduct)
+            if product_type is not None and perishable != (
+                product_type == "perishable"
+            ):
+                return False
+            if expires_before is None:
+                return True
+            return isinstance(p, PerishableProduct) and p.expiry_date < expires_before
+
+        with self._lock.read():
+            by_name, by_price = self._search_indexes()
+            # (nombre de candidats, index, début, fin) de chaque index utilisable
+            ranges: List[Tuple[int, List[Tuple[Any, str]], int, int]] = []
+            price_lo = 0
+            price_hi = len(by_price)
+            if min_price is not None:
+                price_lo = bisect_left(by_price, (min_price,))
+            if max_price is not None:
+                above = math.nextafter(max_price, math.inf)
+                price_hi = bisect_left(by_price, (above,))
+            ranges.append((price_hi - price_lo, by_price, price_lo, price_hi))
+            if name_prefix:
+                lo = bisect_left(by_name, (name_prefix,))
+                end = _prefix_end(name_prefix)
+                hi = len(by_name)
+                if end is not None:
+                    hi = bisect_left(by_name, (end,))
+                ranges.append((hi - lo, by_name, lo, hi))
+            if expires_before is not None or product_type == "perishable":
+                hi = len(self._by_expiry)
+                if expires_before is not None:
+                    hi = bisect_left(self._by_expiry, (expires_before.toordinal(),))
+                ranges.append((hi, self._by_expiry, 0, hi))
+            _, index, lo, hi = min(ranges, key=itemgetter(0))
+            found = [
+                p for p in (self._items[sku] for _, sku in index[lo:hi]) if matches(p)
+            ]
+        if index is not by_price:
+            found.sort(key=SORT_KEYS["price"])
+        return found
+
+    def _search_indexes(
+        self,
+    ) -> Tuple[List[Tuple[str, str]], List[Tuple[float, str]]]:
+        """Index de nom et de prix, construits au premier appel."""
+        by_name, by_price = self._by_name, self._by_price
+        if by_name is None or by_price is None:
+            # sous verrou lecture : aucun écrivain en cours ; deux lecteurs
+            # concurrents construiraient des index identiques
+            by_name = sorted((p.name, p.sku) for p in self._items.values())
+            by_price = sorted((p._price, p.sku) for p in self._items.values())
+            self._by_name, self._by_price = by_name, by_price
+        return by_name, by_price
+
+    # --- itérateurs (sans copie du catalogue) ---
+    # Le verrou n'est jamais détenu pendant un yield : le consommateur peut
+    # être lent (réponse HTTP en flux) sans bloquer les écritures.
+    def iter_all(self) -> Iterator[Product]:
+        """
+        Produits dans l'ordre d'ajout, lus par paquets de ITER_CHUNK. Les
+        SKU présents au début du parcours sont copiés (une liste de clés, pas
+        de produits) : un produit retiré entre-temps est sauté, un produit
+        ajouté n'est pas servi (utiliser iter_sorted pour un instantané).
+        """
+        with self._lock.read():
+            skus = list(self._items)
+        for start in range(0, len(skus), ITER_CHUNK):
+            with self._lock.read():
+                items = self._items
+                chunk = [
+                    items[sku]
+                    for sku in skus[start : start + ITER_CHUNK]
+                    if sku in items
+                ]
+            yield from chunk
 
+    def iter_sorted(self, sort: str = "price") -> Iterator[Product]:
+        """
+        Produits triés, parcourus directement dans la liste du cache de tri :
+        instantané cohérent de l'inventaire au début de l'itération.
+        """
+        with self._lock.read():
+            items = self._sorted(sort)[1]
+        yield from items
+
+    def iter_expired(self) -> Iterator[Product]:
+        """Variante itérateur de expired()."""
+        today = clock.today().toordinal()
+        return self._iter_expiring_between(None, today - 1)
+
+    def iter_expiring_within(self, days: int) -> Iterator[Product]:
+        """Variante itérateur de expiring_within()."""
+        today = clock.today().toordinal()
+        return self._iter_expiring_between(today, today + days)
+
+    @instrumented("total_value")
     def total_value(self) -> float:
-        return round(sum(p.final_price() for p in self._items), 2)
+        """Somme des final_price() en O(1) (hors corrections de date)."""
+        today = clock.today()
+        with self._lock.read():
+            if today != self._value_day:
+                with self._value_lock:
+                    if today != self._value_day:
+                        self._roll_value_to(today)
+            if self._check_totals:
+                self._verify_total()
+            return self._value_cents / 100
+
+    def price_all(
+        self,
+        executor: Optional["Executor"] = None,
+        day: Optional[date] = None,
+        plan: Optional["PricingPlan"] = None,
+    ) -> "PriceBatch":
+        """
+        Prix finaux de tout l'inventaire (ordre d'ajout) et agrégats, calculés
+        par paquets, dans `executor` s'il est fourni (ProcessPoolExecutor :
+        voir freshcart.domain.batch), selon `plan` s'il est fourni.
+        """
+        from freshcart.domain.batch import price_many
+
+        return price_many(self.all(), executor, day, plan=plan)
+
+    # --- snapshots binaires (voir freshcart.domain.snapshot) ---
+    def save_snapshot(self, path: str) -> None:
+        """Écrit l'inventaire dans un snapshot relisible par load_snapshot()."""
+        from freshcart.domain.snapshot import write_snapshot
+
+        with self._lock.read():
+            write_snapshot(list(self._items.values()), path)
+
+    @staticmethod
+    def load_snapshot(path: str) -> "SnapshotInventory":
+        """Ouvre un snapshot par mmap ; les produits sont construits à la demande."""
+        from freshcart.domain.snapshot import SnapshotInventory
+
+        return SnapshotInventory(path)
+
+    # --- suivi des index et de la valeur totale ---
+    def _sorted(self, sort: str) -> Tuple[List[SortKey], List[Product]]:
+        if sort not in SORT_KEYS:
+            raise ValueError(f"unknown sort order: {sort}")
+        cached = self._sort_cache.get(sort)
+        if cached is None or cached[0] != self._version:
+            key = SORT_KEYS[sort]
+            pairs = sorted(
+                ((key(p), p) for p in self._items.values()), key=itemgetter(0)
+            )
+            cached = (self._version, [k for k, _ in pairs], [p for _, p in pairs])
+            self._sort_cache[sort] = cached
+        return cached[1], cached[2]
+
+    def _log(self, op: str, sku: str) -> None:
+        if len(self._changes) == self._changes.maxlen:  # éviction de la plus ancienne
+            self._changes_floor = self._changes[0].version
+        self._changes.append(Change(self._version, op, sku))
+
+    def _track(self, product: Product) -> None:
+        self._version += 1
+        self._log("add", product.sku)
+        self._index(product)
+        self._value_cents += _cents(product.price_at(self._value_day))
+        product.add_owner(self)
+
+    def _untrack(self, product: Product) -> None:
+        self._version += 1
+        self._log("remove", product.sku)
+        self._unindex(product)
+        self._value_cents -= _cents(product.price_at(self._value_day))
+        product.remove_owner(self)
+
+    # --- PriceOwner : appelés par le setter Product.price ---
+    def price_lock(self) -> ContextManager[object]:
+        return self._lock.write()
+
+    def price_changed(self, product: Product, old_price: float) -> None:
+        # sous price_lock() : le prix vient d'être écrit, rien d'autre n'a
+        # pu lire l'inventaire entre-temps
+        if self._items.get(product.sku) is not product:  # retiré entre-temps
+            return
+        self._version += 1
+        self._log("price", product.sku)
+        if self._by_price is not None:
+            by_price = self._by_price
+            del by_price[bisect_left(by_price, (old_price, product.sku))]
+            insort(by_price, (product._price, product.sku))
+        factor = product.price_factor(self._value_day)
+        self._value_cents -= _cents(round(old_price * factor, 2))
+        self._value_cents += _cents(product.price_at(self._value_day))
+
+    def _roll_value_to(self, today: date) -> None:
+        """
+        Corrige le total quand la date change : seuls les périssables qui
+        expirent dans [min(d0, d1), max(d0, d1) + fenêtre] changent de prix.
+        """
+        d0, d1 = self._value_day, today
+        first = min(d0, d1).toordinal()
+        last = max(d0, d1).toordinal() + DISCOUNT_WINDOW_DAYS
+        for p in self._expiring_between(first, last):
+            self._value_cents += _cents(p.price_at(d1)) - _cents(p.price_at(d0))
+        self._value_day = today
+
+    def _verify_total(self) -> None:
+        expected = sum(
+            _cents(p.price_at(self._value_day)) for p in self._items.values()
+        )
+        if expected != self._value_cents:
+            raise AssertionError(
+                f"total incrémental {self._value_cents} != recalcul {expected} (cents)"
+            )
+
+    # --- index par date d'expiration ---
+    def _index(self, product: Product) -> None:
+        if self._by_name is not None and self._by_price is not None:
+            insort(self._by_name, (product.name, product.sku))
+            insort(self._by_price, (product._price, product.sku))
+        if isinstance(product, PerishableProduct):
+            insort(self._by_expiry, (product.expiry_date.toordinal(), product.sku))
+
+    def _unindex(self, product: Product) -> None:
+        if self._by_name is not None and self._by_price is not None:
+            by_name, by_price = self._by_name, self._by_price
+            del by_name[bisect_left(by_name, (product.name, product.sku))]
+            del by_price[bisect_left(by_price, (product._price, product.sku))]
+        if isinstance(product, PerishableProduct):
+            key = (product.expiry_date.toordinal(), product.sku)
+            i = bisect_left(self._by_expiry, key)
+            del self._by_expiry[i]
+
+    def _iter_expiring_between(
+        self, first: Optional[int], last: int
+    ) -> Iterator[Product]:
+        """
+        Parcours de l'index d'expiration par paquets, repris après la dernière
+        clé (ordinal, sku) servie : les modifications concurrentes ne font ni
+        sauter ni répéter les produits présents tout au long du parcours.
+        """
+        after: Tuple[Any, ...] = (-1,) if first is None else (first,)
+        while True:
+            with self._lock.read():
+                lo = bisect_right(self._by_expiry, after)
+                keys = self._by_expiry[lo : lo + ITER_CHUNK]
+                chunk = [self._items[sku] for o, sku in keys if o <= last]
+            yield from chunk
+            if len(chunk) < ITER_CHUNK:
+                return
+            after = keys[-1]
+
+    def _expiring_between(self, first: Optional[int], last: int) -> List[Product]:
+        """Produits dont l'ordinal d'expiration est dans [first, last]."""
+        lo = 0 if first is None else bisect_left(self._by_expiry, (first,))
+        hi = bisect_left(self._by_expiry, (last + 1,))
+        return [self._items[sku] for _, sku in self._by_expiry[lo:hi]]
@@ -0,0 +1,65 @@
+"""
+Verrou lecteurs/rédacteur pour partager un Inventory entre threads
+(endpoints FastAPI synchrones exécutés dans le threadpool).
+
+- plusieurs lecteurs simultanés ;
+- un rédacteur exclusif, prioritaire sur les nouveaux lecteurs (pas de famine) ;
+- réentrant pour le rédacteur : un thread qui détient l'écriture peut
+  reprendre le verrou en lecture ou en écriture (ex: callback de prix
+  déclenché pendant une mise à jour en lot).
+"""
+
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+class RWLock:
+    def __init__(self) -> None:
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writers_waiting = 0
+        self._writer: Optional[int] = None  # ident du thread rédacteur
+        self._writer_depth = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        me = threading.get_ident()
+        if self._writer == me:  # déjà propriétaire de l'écriture
+            yield
+            return
+        with self._cond:
+            while self._writer is not None or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+            else:
+                self._writers_waiting += 1
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+                self._writers_waiting -= 1
+                self._writer = me
+                self._writer_depth = 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer_depth -= 1
+                if not self._writer_depth:
+                    self._writer = None
+                    self._cond.notify_all()
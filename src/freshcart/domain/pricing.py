@@ -0,0 +1,291 @@
+"""
+Moteur de remises déclaratif, compilé en plan de tarification.
+
+Les règles sont décrites en configuration (dicts JSON) puis compilées une
+fois par `PricingPlan` :
+
+    plan = compile_rules([
+        {"name": "périmé", "type": "perishable", "max_days": -1, "factor": 0},
+        {"name": "frais", "sku_prefix": "DAIRY-", "max_days": 5, "factor": 0.7},
+        {"name": "fin de journée", "hours": [20, 23], "factor": 0.9},
+    ])
+    prices = plan.price_all(inventory.all())
+
+Une règle s'applique si tous ses critères sont remplis :
+- type        : "regular" ou "perishable" ;
+- sku_prefix  : catégorie, repérée par le préfixe du SKU ;
+- min_days / max_days : jours avant expiration (périssables seulement) ;
+- hours       : tranche horaire [début, fin) ; fin < début passe minuit.
+La première règle applicable (dans l'ordre) donne le coefficient du prix ;
+aucune règle -> plein tarif.
+
+Compilation : pour chaque catégorie et chaque heure, le plan précalcule le
+coefficient des produits réguliers et une table coefficient[jours restants]
+des périssables (bornée par les seuils des règles). Tarifer un produit
+revient ensuite à une recherche de table, sans réinterpréter les règles.
+Le plan remplace price_factor() : il ne connaît que les types du domaine.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from freshcart.domain import clock
+from freshcart.domain.products import (
+    DISCOUNT_FACTOR,
+    DISCOUNT_WINDOW_DAYS,
+    EXPIRED_FACTOR,
+    PerishableProduct,
+    Product,
+)
+
+PRODUCT_TYPES = ("regular", "perishable")
+
+
+@dataclass(frozen=True, slots=True)
+class DiscountRule:
+    name: str
+    factor: float  # coefficient appliqué au prix (0.5 = -50%)
+    product_type: Optional[str] = None
+    sku_prefix: Optional[str] = None
+    min_days: Optional[int] = None
+    max_days: Optional[int] = None
+    hours: Optional[Tuple[int, int]] = None
+
+    def __post_init__(self) -> None:
+        if self.factor < 0:
+            raise ValueError(f"règle {self.name!r} : factor négatif")
+        if self.product_type not in (None, *PRODUCT_TYPES):
+            raise ValueError(
+                f"règle {self.name!r} : type inconnu {self.product_type!r}"
+            )
+        if self.sku_prefix == "":
+            raise ValueError(f"règle {self.name!r} : sku_prefix vide")
+        if self.hours is not None and not all(0 <= h <= 24 for h in self.hours):
+            raise ValueError(f"règle {self.name!r} : heures hors de [0, 24]")
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> DiscountRule:
+        unknown = set(config) - {
+            "name",
+            "factor",
+            "type",
+            "sku_prefix",
+            "min_days",
+            "max_days",
+            "hours",
+        }
+        if unknown:
+            raise ValueError(f"clés de règle inconnues : {sorted(unknown)}")
+        hours = config.get("hours")
+        return cls(
+            name=str(config.get("name", "")),
+            factor=float(config["factor"]),
+            product_type=config.get("type"),
+            sku_prefix=config.get("sku_prefix"),
+            min_days=config.get("min_days"),
+            max_days=config.get("max_days"),
+            hours=(int(hours[0]), int(hours[1])) if hours is not None else None,
+        )
+
+    def active_at(self, hour: Optional[int]) -> bool:
+        """Règle active à cette heure ? (sans heure : règles horaires ignorées)"""
+        if self.hours is None:
+            return True
+        if hour is None:
+            return False
+        start, end = self.hours
+        if start <= end:
+            return start <= hour < end
+        return hour >= start or hour < end
+
+    def matches(self, product_type: str, category: str, days: Optional[int]) -> bool:
+        if self.product_type is not None and self.product_type != product_type:
+            return False
+        if self.sku_prefix is not None and not category.startswith(self.sku_prefix):
+            return False
+        if self.min_days is None and self.max_days is None:
+            return True
+        if days is None:  # critère d'expiration sur un produit régulier
+            return False
+        if self.min_days is not None and days < self.min_days:
+            return False
+        return self.max_days is None or days <= self.max_days
+
+
+# Règles équivalentes à PerishableProduct.price_factor()
+DEFAULT_RULES: Tuple[DiscountRule, ...] = (
+    DiscountRule("expired", EXPIRED_FACTOR, "perishable", max_days=-1),
+    DiscountRule(
+        "clearance", DISCOUNT_FACTOR, "perishable", max_days=DISCOUNT_WINDOW_DAYS
+    ),
+)
+
+# Tables d'une heure : catégorie -> coefficient (réguliers),
+# catégorie -> coefficients indexés par jours restants (périssables)
+_Tables = Tuple[Dict[str, float], Dict[str, Tuple[float, ...]]]
+
+
+class PricingPlan:
+    def __init__(self, rules: Sequence[DiscountRule]) -> None:
+        self.rules = tuple(rules)
+        bounds = [
+            b for r in self.rules for b in (r.min_days, r.max_days) if b is not None
+        ]
+        # au-delà des seuils, toutes les durées se comportent comme la borne
+        self._lo = min(bounds, default=0) - 1
+        self._hi = max(bounds, default=0) + 1
+        prefixes = {r.sku_prefix for r in self.rules if r.sku_prefix is not None}
+        self._categories = [""] + sorted(prefixes)
+        # préfixes groupés par longueur, du plus long au plus court
+        by_length: Dict[int, set[str]] = {}
+        for prefix in prefixes:
+            by_length.setdefault(len(prefix), set()).add(prefix)
+        self._prefix_groups = [
+            (length, frozenset(by_length[length]))
+            for length in sorted(by_length, reverse=True)
+        ]
+        self._tables: Dict[Optional[int], _Tables] = {}
+        self._fingerprint: Optional[str] = None
+
+    @property
+    def is_default(self) -> bool:
+        """Plan équivalent aux règles intégrées (price_factor) ?"""
+        return self.rules == DEFAULT_RULES
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Empreinte des règles, identique d'un processus à l'autre pour la même
+        configuration (contrairement à id(plan)) : sert aux clés du cache HTTP.
+        """
+        if self._fingerprint is None:
+            import hashlib  # différé : seul le cache HTTP s'en sert
+
+            digest = hashlib.sha1(repr(self.rules).encode()).hexdigest()
+            self._fingerprint = digest[:16]
+        return self._fingerprint
+
+    def _category(self, sku: str) -> str:
+        """Plus long préfixe de règle qui couvre le SKU ("" : aucun)."""
+        for length, prefixes in self._prefix_groups:
+            if sku[:length] in prefixes:
+                return sku[:length]
+        return ""
+
+    def _first_factor(
+        self,
+        rules: Sequence[DiscountRule],
+        product_type: str,
+        category: str,
+        days: Optional[int],
+    ) -> float:
+        for rule in rules:
+            if rule.matches(product_type, category, days):
+                return rule.factor
+        return 1.0
+
+    def _tables_for(self, hour: Optional[int]) -> _Tables:
+        tables = self._tables.get(hour)
+        if tables is None:
+            active = [r for r in self.rules if r.active_at(hour)]
+            regular = {
+                c: self._first_factor(active, "regular", c, None)
+                for c in self._categories
+            }
+            perishable = {
+                c: tuple(
+                    self._first_factor(active, "perishable", c, days)
+                    for days in range(self._lo, self._hi + 1)
+                )
+                for c in self._categories
+            }
+            tables = self._tables[hour] = (regular, perishable)
+        return tables
+
+    def price_all(
+        self,
+        products: Iterable[Product],
+        day: Optional[date] = None,
+        hour: Optional[int] = None,
+    ) -> List[float]:
+        """
+        Prix finaux des produits, dans l'ordre. `day` : date de tarification
+        (défaut clock.today()) ; `hour` : heure pour les règles horaires
+        (défaut : heure courante).
+        """
+        today = (day or clock.today()).toordinal()
+        regular, perishable = self._tables_for(
+            datetime.now().hour if hour is None else hour
+        )
+        lo, hi = self._lo, self._hi
+        # coefficient par date d'expiration, pour chaque catégorie : les dates
+        # sont partagées entre produits, ces caches restent petits
+        caches: Dict[str, Dict[date, float]] = {c: {} for c in self._categories}
+
+        def perishable_factor(category: str, expiry: date) -> float:
+            days = expiry.toordinal() - today
+            factor = perishable[category][min(max(days, lo), hi) - lo]
+            caches[category][expiry] = factor
+            return factor
+
+        # p._price plutôt que la propriété price (coût dominant de la boucle) ;
+        # un prix déjà arrondi n'a pas à l'être de nouveau si factor == 1
+        prices: List[float] = []
+        append = prices.append
+        if not self._prefix_groups:  # cas courant : pas de catégories
+            reg, cache = regular[""], caches[""]
+            for p in products:
+                if isinstance(p, PerishableProduct):
+                    factor = cache.get(p.expiry_date)
+                    if factor is None:
+                        factor = perishable_factor("", p.expiry_date)
+                else:
+                    factor = reg
+                append(p._price if factor == 1.0 else round(p._price * factor, 2))
+            return prices
+        for p in products:
+            category = self._category(p.sku)
+            if isinstance(p, PerishableProduct):
+                factor = caches[category].get(p.expiry_date)
+                if factor is None:
+                    factor = perishable_factor(category, p.expiry_date)
+            else:
+                factor = regular[category]
+            append(p._price if factor == 1.0 else round(p._price * factor, 2))
+        return prices
+
+    def total_value(
+        self,
+        products: Iterable[Product],
+        day: Optional[date] = None,
+        hour: Optional[int] = None,
+    ) -> float:
+        """Somme des prix finaux (en cents entiers, comme Inventory)."""
+        return sum(round(x * 100) for x in self.price_all(products, day, hour)) / 100
+
+    def price_inventory(
+        self,
+        inventory: Any,
+        day: Optional[date] = None,
+        hour: Optional[int] = None,
+    ) -> Dict[str, float]:
+        """Tarifie tout un inventaire (ProductRepository) : sku -> prix final."""
+        products = inventory.all()
+        return dict(zip((p.sku for p in products), self.price_all(products, day, hour)))
+
+
+def compile_rules(config: Iterable[Mapping[str, Any]]) -> PricingPlan:
+    """Compile une configuration de règles (liste de dicts) en plan."""
+    return PricingPlan([DiscountRule.from_config(item) for item in config])
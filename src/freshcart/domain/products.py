@@ -3,9 +3,40 @@
 # sans guillemets. Améliore la compatibilité avec les versions futures.
 from __future__ import annotations
 
+import math
+from contextlib import ExitStack, contextmanager
 from dataclasses import InitVar, dataclass, field
 from datetime import date
-from typing import Protocol
+from typing import ContextManager, Dict, Iterator, Optional, Protocol, Tuple, Union
+
+from freshcart.domain import clock
+
+# Règles de prix intégrées des périssables. Seule source des seuils et
+# coefficients : price_factor() et les calculs précalculés ailleurs (paquets,
+# colonnes, agrégats SQL...) en dérivent tous.
+# Nombre de jours avant expiration pendant lesquels un périssable est remisé.
+DISCOUNT_WINDOW_DAYS = 3
+DISCOUNT_FACTOR = 0.5  # coefficient dans la fenêtre de remise (-50%)
+EXPIRED_FACTOR = 0.0  # coefficient d'un périmé (ne vaut plus rien)
+
+
+def perishable_factor(days_left: int) -> float:
+    """Coefficient d'un périssable qui expire dans `days_left` jours."""
+    if days_left < 0:  # périmé
+        return EXPIRED_FACTOR
+    if days_left <= DISCOUNT_WINDOW_DAYS:  # bientôt périmé
+        return DISCOUNT_FACTOR
+    return 1.0
+
+
+def is_valid_price(value: float) -> bool:
+    """Prix acceptable : nombre fini et >= 0 (rejette NaN et les infinis)."""
+    return math.isfinite(value) and value >= 0
+
+
+def discounted_price(price: float) -> float:
+    """Prix dans la fenêtre de remise, arrondi comme Product.price_at()."""
+    return round(price * DISCOUNT_FACTOR, 2)
 
 
 # -------------------------------------------------------------------
@@ -14,18 +45,67 @@ from typing import Protocol
 # Toute classe qui implémente final_price() -> float sera considérée
 # comme un Pricable, même sans hériter explicitement d'une base.
 class Pricable(Protocol):
+    # pas d'attribut d'instance : les classes "slots" qui en héritent
+    # n'ont ainsi pas de __dict__
+    __slots__ = ()
+
     def final_price(self) -> float: ...
 
 
+# Pool de dates d'expiration : des millions de périssables n'ont que quelques
+# centaines de dates distinctes, on partage donc les objets date entre produits.
+_DATE_POOL: Dict[date, date] = {}
+
+
+class PriceOwner(Protocol):
+    """
+    Conteneur qui indexe ses produits par prix (ex: Inventory). Le setter
+    Product.price prend price_lock() AVANT d'écrire le prix, puis appelle
+    price_changed(produit, ancien prix) sous ce même verrou : aucune
+    opération du conteneur ne voit un prix que ses index ignorent.
+    """
+
+    def price_lock(self) -> ContextManager[object]: ...
+
+    def price_changed(self, product: "Product", old_price: float) -> None: ...
+
+
+class _SharedOwners:
+    """
+    Propriétaires d'un produit présent dans plusieurs conteneurs (rare) :
+    leurs verrous sont pris dans un ordre fixe (id), sans interblocage.
+    """
+
+    __slots__ = ("owners",)
+
+    def __init__(self, owners: Tuple[PriceOwner, ...]) -> None:
+        self.owners = owners
+
+    @contextmanager
+    def price_lock(self) -> Iterator[None]:
+        with ExitStack() as stack:
+            for owner in sorted(self.owners, key=id):
+                stack.enter_context(owner.price_lock())
+            yield
+
+    def price_changed(self, product: "Product", old_price: float) -> None:
+        for owner in self.owners:
+            owner.price_changed(product, old_price)
+
+
 # -------------------------------------------------------------------
 # 2) Classe Product
 # -------------------------------------------------------------------
 # order=True génère automatiquement les méthodes de comparaison
 # (__lt__, __gt__, etc.) afin de trier les produits par prix.
-@dataclass(order=True)
+# slots=True : pas de __dict__ par instance (mémoire réduite à grande échelle).
+# NB: dans une dataclass "slots", super() sans argument ne fonctionne pas ;
+# on appelle explicitement la méthode parente (Product.__post_init__).
+@dataclass(order=True, slots=True)
 class Product(Pricable):
-    # utilisé pour le tri naturel (par prix), pas affiché
-    sort_index: float = field(init=False, repr=False, compare=True)
+    # stockage interne réel du prix ; premier champ comparé, donc il sert
+    # aussi au tri naturel (par prix, puis sku, puis nom)
+    _price: float = field(init=False, repr=False, compare=True)
 
     # champs "publics" obligatoires
     sku: str  # identifiant unique
@@ -36,8 +116,18 @@ class Product(Pricable):
     # On le reçoit dans __post_init__, puis on passe par le setter.
     initial_price: InitVar[float]
 
-    # stockage interne réel du prix
-    _price: float = field(init=False, repr=False, compare=False)
+    # conteneur qui suit le prix (ex: l'Inventory et sa valeur totale
+    # incrémentale) : une simple référence, pas un callback par produit
+    _owner: Union[PriceOwner, _SharedOwners, None] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    # dernier prix final calculé : (jour, prix). Un seul tuple, remplacé en
+    # une affectation (lecture cohérente entre threads) ; remis à None à
+    # chaque changement de prix, et ignoré dès que le jour demandé change.
+    _memo: Optional[Tuple[date, float]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def __post_init__(self, initial_price: float) -> None:
         """
@@ -46,7 +136,6 @@ class Product(Pricable):
         """
         self._price = 0.0  # valeur temporaire
         self.price = initial_price  # passe par le setter (validation, arrondi)
-        self.sort_index = self._price  # synchroniser l'ordre de tri
 
     # --- propriété "price" exposée proprement ---
     @property
@@ -57,12 +146,38 @@ class Product(Pricable):
     @price.setter
     def price(self, value: float) -> None:
         """Accès en écriture avec validation métier."""
-        if value < 0:
-            raise ValueError("price cannot be negative")
+        if not is_valid_price(value):
+            raise ValueError(f"price must be a finite number >= 0: {value}")
         # arrondi à 2 décimales (ex: 3.456 -> 3.46)
-        self._price = round(float(value), 2)
-        # garder le champ 'sort_index' synchronisé pour le tri
-        self.sort_index = self._price
+        price = round(float(value), 2)
+        owner = self._owner
+        if owner is None:
+            self._price = price
+            self._memo = None
+            return
+        with owner.price_lock():
+            old = self._price
+            self._price = price
+            self._memo = None
+            owner.price_changed(self, old)
+
+    def add_owner(self, owner: PriceOwner) -> None:
+        """Appelé par un conteneur qui commence à suivre ce produit."""
+        current = self._owner
+        if current is None:
+            self._owner = owner
+        elif isinstance(current, _SharedOwners):
+            self._owner = _SharedOwners(current.owners + (owner,))
+        else:
+            self._owner = _SharedOwners((current, owner))
+
+    def remove_owner(self, owner: PriceOwner) -> None:
+        current = self._owner
+        if current is owner:
+            self._owner = None
+        elif isinstance(current, _SharedOwners):
+            rest = tuple(o for o in current.owners if o is not owner)
+            self._owner = rest[0] if len(rest) == 1 else _SharedOwners(rest)
 
     # --- logique métier (polymorphisme) ---
     def final_price(self) -> float:
@@ -73,6 +188,19 @@ class Product(Pricable):
         """
         return self.price
 
+    def price_factor(self, day: date) -> float:
+        """Coefficient appliqué au prix à la date `day` (1.0 = plein tarif)."""
+        return 1.0
+
+    def price_at(self, day: date) -> float:
+        """Prix final à une date donnée (base des calculs d'inventaire)."""
+        memo = self._memo
+        if memo is not None and memo[0] == day:
+            return memo[1]
+        price = round(self._price * self.price_factor(day), 2)
+        self._memo = (day, price)
+        return price
+
     def __str__(self) -> str:
         """Représentation lisible du produit."""
         return f"{self.name} ({self.sku}) - {self.price:.2f}$"
@@ -81,21 +209,26 @@ class Product(Pricable):
 # -------------------------------------------------------------------
 # 3) Classe PerishableProduct (hérite de Product)
 # -------------------------------------------------------------------
-@dataclass(order=True)
+@dataclass(order=True, slots=True)
 class PerishableProduct(Product):
     # On ne compare pas expiry_date pour l'ordre.
     expiry_date: date = field(compare=False, kw_only=True)
 
+    def __post_init__(self, initial_price: float) -> None:
+        Product.__post_init__(self, initial_price)
+        # dates partagées : un seul objet date par jour d'expiration
+        self.expiry_date = _DATE_POOL.setdefault(self.expiry_date, self.expiry_date)
+
     @property
     def is_expired(self) -> bool:
-        return date.today() > self.expiry_date
+        return clock.today() > self.expiry_date
 
     def days_left(self) -> int:
-        return (self.expiry_date - date.today()).days
+        return (self.expiry_date - clock.today()).days
+
+    def price_factor(self, day: date) -> float:
+        return perishable_factor((self.expiry_date - day).days)
 
     def final_price(self) -> float:
-        if self.is_expired:
-            return 0.0
-        if self.days_left() <= 3:
-            return round(self.price * 0.5, 2)
-        return self.price
+        # une seule lecture de l'horloge (voir freshcart.domain.clock)
+        return self.price_at(clock.today())
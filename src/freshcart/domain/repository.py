@@ -0,0 +1,88 @@
+"""
+Contrat de stockage des produits (pattern Repository).
+
+Les routers et le code applicatif dépendent de ce Protocol, pas d'une
+implémentation : `Inventory` (mémoire) et `SqliteInventory`
+(freshcart.storage.sqlite) le satisfont tous deux par duck typing.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Iterable, Iterator, List, Mapping, Optional, Protocol, Tuple
+
+from freshcart.domain.inventory import Change, SortKey
+from freshcart.domain.products import Product
+
+
+class ProductRepository(Protocol):
+    @property
+    def version(self) -> int:
+        """Numéro de version, incrémenté à chaque mutation."""
+        ...
+
+    @property
+    def epoch(self) -> str:
+        """
+        Identifiant du jeu de données : deux versions égales ne désignent le
+        même état que dans la même époque (un Inventory neuf repart de 0).
+        """
+        ...
+
+    def add(self, product: Product) -> None: ...
+
+    def add_many(
+        self, products: Iterable[Product], skip_duplicates: bool = False
+    ) -> List[Product]: ...
+
+    def upsert(self, product: Product) -> Optional[Product]: ...
+
+    def get(self, sku: str) -> Product: ...
+
+    def remove(self, sku: str) -> None: ...
+
+    def bulk_update_prices(self, prices: Mapping[str, float]) -> int:
+        """Prix de plusieurs SKU, validés d'abord puis appliqués atomiquement."""
+        ...
+
+    def __contains__(self, sku: object) -> bool: ...
+
+    def __len__(self) -> int: ...
+
+    def changes_since(self, since: int) -> Tuple[int, Optional[List[Change]]]:
+        """(version, modifications après `since`) ; None = resynchronisation."""
+        ...
+
+    def all(self) -> List[Product]: ...
+
+    def sorted_by(self, sort: str = "price") -> List[Product]: ...
+
+    def page(
+        self, sort: str = "price", limit: int = 100, after: Optional[SortKey] = None
+    ) -> Tuple[List[Product], Optional[SortKey]]: ...
+
+    def expired(self) -> List[Product]: ...
+
+    def expiring_within(self, days: int) -> List[Product]: ...
+
+    def search(
+        self,
+        name_prefix: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        product_type: Optional[str] = None,
+        expires_before: Optional[date] = None,
+    ) -> List[Product]:
+        """Produits qui remplissent tous les critères, triés par (prix, sku)."""
+        ...
+
+    # variantes itérateurs : lecture par paquets, sans copie du catalogue
+    def iter_all(self) -> Iterator[Product]: ...
+
+    def iter_sorted(self, sort: str = "price") -> Iterator[Product]: ...
+
+    def iter_expired(self) -> Iterator[Product]: ...
+
+    def iter_expiring_within(self, days: int) -> Iterator[Product]: ...
+
+    def total_value(self) -> float: ...
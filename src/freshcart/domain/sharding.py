@@ -0,0 +1,132 @@
+"""
+Inventaire multi-magasins, partitionné en shards.
+
+`ShardedInventory` garde un Inventory par magasin (shard) :
+- partition par identifiant de magasin (`ShardedInventory(["paris", "lyon"])`)
+  ou par hachage du SKU (`ShardedInventory.by_sku_hash(8)`) ;
+- les opérations sur un SKU (add / get / remove) sont routées vers le shard
+  propriétaire : magasin explicite (`store_id=...`) sinon hachage du SKU ;
+- total_value() / expired() à l'échelle de la chaîne s'agrègent en série :
+  somme des totaux des shards, fusion triée (heapq.merge) de leurs périmés.
+
+Chaque shard répond depuis ses index incrémentaux (O(1) / O(log n) par
+magasin), dans le processus courant. Il n'y a pas d'agrégat sur un pool de
+processus : extraire un shard pour un worker coûte déjà O(n), et
+benchmarks/bench_sharding.py mesure cette répartition des milliers de fois
+plus lente que la somme série.
+"""
+
+from __future__ import annotations
+
+import heapq
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from freshcart.domain.inventory import Inventory, ProductNotFoundError
+from freshcart.domain.products import Product
+
+
+class UnknownStoreError(Exception):
+    """Levée quand on adresse un magasin (shard) inexistant."""
+
+    pass
+
+
+def shard_index(sku: str, shards: int) -> int:
+    """Shard d'un SKU : crc32, stable d'un processus à l'autre (pas hash())."""
+    return zlib.crc32(sku.encode()) % shards
+
+
+class ShardedInventory:
+    def __init__(
+        self,
+        store_ids: Iterable[str] = (),
+        factory: Callable[[], Inventory] = Inventory,
+    ) -> None:
+        self._factory = factory
+        self._stores: Dict[str, Inventory] = {}
+        # ids des shards routés par hachage du SKU (vide : routage par magasin)
+        self._hashed: List[str] = []
+        for store_id in store_ids:
+            self.add_store(store_id)
+
+    @classmethod
+    def by_sku_hash(
+        cls, shards: int, factory: Callable[[], Inventory] = Inventory
+    ) -> ShardedInventory:
+        """`shards` partitions "shard-0".."shard-<n-1>", choisies par hachage du SKU."""
+        sharded = cls([f"shard-{i}" for i in range(shards)], factory)
+        sharded._hashed = list(sharded._stores)
+        return sharded
+
+    # --- magasins ---
+    def add_store(self, store_id: str) -> Inventory:
+        if store_id not in self._stores:
+            if self._hashed:
+                raise ValueError("les shards par hachage de SKU sont fixes")
+            self._stores[store_id] = self._factory()
+        return self._stores[store_id]
+
+    def store(self, store_id: str) -> Inventory:
+        try:
+            return self._stores[store_id]
+        except KeyError:
+            raise UnknownStoreError(f"Magasin {store_id} inconnu") from None
+
+    @property
+    def store_ids(self) -> List[str]:
+        return list(self._stores)
+
+    def _route(self, sku: str, store_id: Optional[str]) -> Inventory:
+        if store_id is not None:
+            return self.store(store_id)
+        if not self._hashed:
+            raise UnknownStoreError("store_id requis (partition par magasin)")
+        return self._stores[self._hashed[shard_index(sku, len(self._hashed))]]
+
+    # --- opérations routées vers un shard ---
+    def add(self, product: Product, store_id: Optional[str] = None) -> None:
+        self._route(product.sku, store_id).add(product)
+
+    def get(self, sku: str, store_id: Optional[str] = None) -> Product:
+        return self._route(sku, store_id).get(sku)
+
+    def remove(self, sku: str, store_id: Optional[str] = None) -> None:
+        self._route(sku, store_id).remove(sku)
+
+    def locate(self, sku: str) -> List[str]:
+        """Magasins qui référencent ce SKU."""
+        found = [sid for sid, inv in self._stores.items() if sku in inv]
+        if not found:
+            raise ProductNotFoundError(f"Produit {sku} introuvable")
+        return found
+
+    def __len__(self) -> int:
+        return sum(len(inv) for inv in self._stores.values())
+
+    @property
+    def version(self) -> int:
+        """Somme des versions des shards (croît à chaque mutation)."""
+        return sum(inv.version for inv in self._stores.values())
+
+    # --- agrégats chaîne (série, depuis les index des shards) ---
+    def store_totals(self) -> Dict[str, float]:
+        """Valeur de chaque magasin."""
+        return {sid: inv.total_value() for sid, inv in list(self._stores.items())}
+
+    def total_value(self) -> float:
+        """Valeur de toute la chaîne (somme exacte, en cents)."""
+        return sum(round(t * 100) for t in self.store_totals().values()) / 100
+
+    def expired(self) -> List[Tuple[str, Product]]:
+        """(magasin, produit) périmés de toute la chaîne, triés par (date, sku)."""
+        # le produit voyage avec sa clé : pas de relecture du shard après le
+        # map (un retrait concurrent ne fait pas échouer la fusion)
+        per_store = [
+            [
+                (p.expiry_date.toordinal(), p.sku, sid, p)  # type: ignore[attr-defined]
+                for p in inv.expired()
+            ]
+            for sid, inv in list(self._stores.items())
+        ]
+        return [(sid, p) for _, _, sid, p in heapq.merge(*per_store)]
@@ -0,0 +1,456 @@
+"""
+Snapshot binaire de l'inventaire, relu par mmap.
+
+Format (little-endian, sections alignées sur 8 octets) :
+- en-tête            : HEADER (magic, version, compteurs, offsets des sections)
+- enregistrements    : RECORD par produit, dans l'ordre d'insertion
+  (offset/longueur du sku et du nom dans la table de chaînes, prix en cents,
+  ordinal d'expiration ou 0 pour un produit régulier)
+- index SKU          : numéros d'enregistrement (u32) triés par sku
+- index prix         : numéros triés par (prix, sku)
+- index expiration   : périssables triés par (expiration, sku), puis
+  réguliers triés par sku (l'ordre de tri "expiry" de l'Inventory)
+- agrégats par date  : DATE_TOTAL (ordinal, somme prix, somme prix remisés)
+- table de chaînes   : sku et noms en UTF-8, bout à bout
+
+`SnapshotInventory` ouvre le fichier en lecture seule avec mmap : le
+chargement ne lit que l'en-tête, les produits sont construits à la demande,
+et les workers d'une même machine partagent les pages en cache de l'OS.
+Toutes les lectures (get / in / len / all / tris et pagination par sku,
+prix ou expiration / expired / expiring_within / total_value) sont servies
+directement depuis le fichier et ses index. Seules search() et les
+mutations construisent un Inventory complet (une seule fois, sous le verrou
+d'écriture), auquel tout est ensuite délégué : il part de la version 0,
+sans journal, car le catalogue n'a pas changé. Un changement de prix sur un
+produit lu avant cette bascule la déclenche, et figure dans le journal
+(changes_since) et la version.
+
+L'API le sert avec create_app({"storage": "snapshot", "snapshot_path": ...}).
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import (
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from freshcart.domain import clock
+from freshcart.domain.inventory import (
+    SORT_KEYS,
+    Change,
+    Inventory,
+    ProductNotFoundError,
+    SortKey,
+)
+from freshcart.domain.locks import RWLock
+from freshcart.domain.products import (
+    DISCOUNT_WINDOW_DAYS,
+    EXPIRED_FACTOR,
+    PerishableProduct,
+    Product,
+    discounted_price,
+)
+
+MAGIC = b"FCSNAP01"
+FORMAT_VERSION = 2
+# magic, version, nb produits, nb périssables, nb dates, total réguliers (cents),
+# offsets : enregistrements, index sku, index prix, index expiration,
+# agrégats, chaînes
+HEADER = struct.Struct("<8sIQQQqQQQQQQ")
+# sku (offset, longueur), nom (offset, longueur), prix (cents), expiration
+RECORD = struct.Struct("<QIQIqi")
+# ordinal, somme des prix (cents), somme des prix remisés (cents)
+DATE_TOTAL = struct.Struct("<iqq")
+# ordinal d'expiration des réguliers dans les clés de tri "expiry"
+_NO_EXPIRY = date.max.toordinal() + 1
+
+
+class SnapshotFormatError(Exception):
+    """Levée quand un fichier n'est pas un snapshot FreshCart valide."""
+
+    pass
+
+
+def _cents(value: float) -> int:
+    return round(value * 100)
+
+
+def _align(buffer: bytearray) -> int:
+    buffer.extend(b"\0" * (-len(buffer) % 8))
+    return len(buffer)
+
+
+def write_snapshot(products: Sequence[Product], path: str) -> None:
+    """Écrit le snapshot (fichier temporaire puis renommage atomique)."""
+    strings = bytearray()
+    records = bytearray()
+    expiry_keys: List[Tuple[int, str, int]] = []
+    price_keys: List[Tuple[int, str, int]] = []
+    by_date: Dict[int, List[int]] = {}
+    regular_cents = 0
+    for i, p in enumerate(products):
+        sku, name = p.sku.encode(), p.name.encode()
+        sku_offset = len(strings)
+        strings += sku + name
+        price = _cents(p.price)
+        price_keys.append((price, p.sku, i))
+        expiry = 0
+        if isinstance(p, PerishableProduct):
+            expiry = p.expiry_date.toordinal()
+            expiry_keys.append((expiry, p.sku, i))
+            totals = by_date.setdefault(expiry, [0, 0])
+            totals[0] += price
+            totals[1] += _cents(discounted_price(p.price))
+        else:
+            regular_cents += price
+        records += RECORD.pack(
+            sku_offset, len(sku), sku_offset + len(sku), len(name), price, expiry
+        )
+
+    sku_index = array("I", sorted(range(len(products)), key=lambda i: products[i].sku))
+    price_index = array("I", (i for _, _, i in sorted(price_keys)))
+    expiry_index = array("I", (i for _, _, i in sorted(expiry_keys)))
+    n_perishable = len(expiry_index)
+    expiry_index.extend(
+        i for i in sku_index if not isinstance(products[i], PerishableProduct)
+    )
+
+    body = bytearray(b"\0" * HEADER.size)
+    off_records = _align(body)
+    body += records
+    off_sku = _align(body)
+    body += sku_index.tobytes()
+    off_price = _align(body)
+    body += price_index.tobytes()
+    off_expiry = _align(body)
+    body += expiry_index.tobytes()
+    off_dates = _align(body)
+    for ordinal in sorted(by_date):
+        body += DATE_TOTAL.pack(ordinal, *by_date[ordinal])
+    off_strings = _align(body)
+    body += strings
+    body[: HEADER.size] = HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        len(products),
+        n_perishable,
+        len(by_date),
+        regular_cents,
+        off_records,
+        off_sku,
+        off_price,
+        off_expiry,
+        off_dates,
+        off_strings,
+    )
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(body)
+    os.replace(tmp, path)
+
+
+class SnapshotInventory:
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            stat = os.fstat(f.fileno())
+        # même fichier -> même époque, dans tous les workers et après un
+        # redémarrage ; un nouveau snapshot (save_snapshot) en change
+        self._file_epoch = f"snap-{stat.st_mtime_ns:x}-{stat.st_size:x}"
+        if self._mm.size() < HEADER.size or self._mm[:8] != MAGIC:
+            self._mm.close()
+            raise SnapshotFormatError(f"{path} n'est pas un snapshot FreshCart")
+        (
+            _,
+            version,
+            self._count,
+            n_perishable,
+            self._n_dates,
+            self._regular_cents,
+            self._off_records,
+            off_sku,
+            off_price,
+            off_expiry,
+            self._off_dates,
+            self._off_strings,
+        ) = HEADER.unpack_from(self._mm, 0)
+        if version != FORMAT_VERSION:
+            self._mm.close()
+            raise SnapshotFormatError(f"version de snapshot non gérée : {version}")
+
+        view = memoryview(self._mm)
+        self._sku_index = view[off_sku : off_sku + 4 * self._count].cast("I")
+        self._price_index = view[off_price : off_price + 4 * self._count].cast("I")
+        # ordre "expiry" complet ; ses n_perishable premiers : les périssables
+        self._order_index = view[off_expiry : off_expiry + 4 * self._count].cast("I")
+        self._expiry_index = self._order_index[:n_perishable]
+        self._cache: Dict[int, Product] = {}  # produits déjà construits
+        self._inv: Optional[Inventory] = None  # catalogue complet (après "dégel")
+        self._lock = RWLock()
+
+    # --- lecture du fichier ---
+    def _string(self, offset: int, length: int) -> str:
+        start = self._off_strings + offset
+        return self._mm[start : start + length].decode()
+
+    def _record(self, row: int) -> Tuple[int, int, int, int, int, int]:
+        return RECORD.unpack_from(self._mm, self._off_records + row * RECORD.size)
+
+    def _sku_of(self, row: int) -> str:
+        sku_offset, sku_len, *_ = self._record(row)
+        return self._string(sku_offset, sku_len)
+
+    def _expiry_of(self, row: int) -> int:
+        return self._record(row)[5]
+
+    def _product(self, row: int) -> Product:
+        product = self._cache.get(row)
+        if product is None:
+            sku_off, sku_len, name_off, name_len, price, expiry = self._record(row)
+            sku = self._string(sku_off, sku_len)
+            name = self._string(name_off, name_len)
+            if expiry:
+                product = PerishableProduct(
+                    sku, name, price / 100, expiry_date=date.fromordinal(expiry)
+                )
+            else:
+                product = Product(sku, name, price / 100)
+            # une modification de prix fait basculer vers un Inventory complet
+            product.add_owner(self)
+            # deux lecteurs concurrents : un seul objet par enregistrement
+            product = self._cache.setdefault(row, product)
+        return product
+
+    def _sort_index(self, sort: str) -> memoryview:
+        if sort not in SORT_KEYS:
+            raise ValueError(f"unknown sort order: {sort}")
+        if sort == "price":
+            return self._price_index
+        return self._order_index if sort == "expiry" else self._sku_index
+
+    def _sort_key(self, sort: str, row: int) -> SortKey:
+        """Clé de tri d'un enregistrement, égale à SORT_KEYS[sort](produit)."""
+        sku_off, sku_len, _, _, price, expiry = self._record(row)
+        sku = self._string(sku_off, sku_len)
+        if sort == "price":
+            return (price / 100, sku)
+        if sort == "expiry":
+            return (expiry or _NO_EXPIRY, sku)
+        return (sku,)
+
+    def _find(self, sku: str) -> Optional[int]:
+        i = bisect_left(self._sku_index, sku, key=self._sku_of)
+        if i < len(self._sku_index) and self._sku_of(self._sku_index[i]) == sku:
+            return int(self._sku_index[i])
+        return None
+
+    def _expiry_rows(self, first: Optional[int], last: int) -> memoryview:
+        """Tranche de l'index d'expiration (vue, sans copie) pour [first, last]."""
+        index = self._expiry_index
+        lo = 0 if first is None else bisect_left(index, first, key=self._expiry_of)
+        hi = bisect_left(index, last + 1, key=self._expiry_of)
+        return index[lo:hi]
+
+    def _expiring_between(self, first: Optional[int], last: int) -> List[Product]:
+        return [self._product(row) for row in self._expiry_rows(first, last)]
+
+    def _iter_expiring_between(
+        self, first: Optional[int], last: int
+    ) -> Iterator[Product]:
+        return (self._product(row) for row in self._expiry_rows(first, last))
+
+    # --- bascule vers un Inventory complet ---
+    def _thaw(self) -> Inventory:
+        inv = self._inv
+        if inv is not None:
+            return inv
+        with self._lock.write():
+            if self._inv is None:  # un autre thread a pu dégeler entre-temps
+                inv = Inventory()
+                # état initial (version 0, sans journal) : rien n'a changé
+                inv._restore(self._product(row) for row in range(self._count))
+                for product in list(self._cache.values()):
+                    product.remove_owner(self)
+                self._inv = inv
+            return self._inv
+
+    # --- PriceOwner : appelés par le setter Product.price ---
+    def price_lock(self) -> ContextManager[object]:
+        return self._lock.write()
+
+    def price_changed(self, product: Product, old_price: float) -> None:
+        # sous price_lock() ; dégelé par un autre thread avant la prise du
+        # verrou : l'Inventory a indexé l'ancien prix
+        thawed = self._inv is not None
+        inv = self._thaw()
+        with inv.price_lock():
+            # sinon l'Inventory reprend les objets avec leur nouveau prix
+            # (valeur totale déjà juste) : il reste à journaliser le changement
+            inv.price_changed(product, old_price if thawed else product.price)
+
+    def close(self) -> None:
+        for index in (
+            self._expiry_index,
+            self._order_index,
+            self._price_index,
+            self._sku_index,
+        ):
+            index.release()
+        self._mm.close()
+
+    # --- API ProductRepository ---
+    @property
+    def version(self) -> int:
+        return 0 if self._inv is None else self._inv.version
+
+    @property
+    def epoch(self) -> str:
+        # dégelé et modifié : ces versions sont propres à ce processus
+        inv = self._inv
+        if inv is None or inv.version == 0:
+            return self._file_epoch
+        return inv.epoch
+
+    def add(self, product: Product) -> None:
+        self._thaw().add(product)
+
+    def add_many(
+        self, products: Iterable[Product], skip_duplicates: bool = False
+    ) -> List[Product]:
+        return self._thaw().add_many(products, skip_duplicates)
+
+    def upsert(self, product: Product) -> Optional[Product]:
+        return self._thaw().upsert(product)
+
+    def remove(self, sku: str) -> None:
+        self._thaw().remove(sku)
+
+    def bulk_update_prices(self, prices: Mapping[str, float]) -> int:
+        return self._thaw().bulk_update_prices(prices)
+
+    def get(self, sku: str) -> Product:
+        if self._inv is not None:
+            return self._inv.get(sku)
+        row = self._find(sku)
+        if row is None:
+            raise ProductNotFoundError(f"Produit {sku} introuvable")
+        return self._product(row)
+
+    def __contains__(self, sku: object) -> bool:
+        if self._inv is not None:
+            return sku in self._inv
+        return isinstance(sku, str) and self._find(sku) is not None
+
+    def __len__(self) -> int:
+        return self._count if self._inv is None else len(self._inv)
+
+    def changes_since(self, since: int) -> Tuple[int, Optional[List[Change]]]:
+        if self._inv is not None:
+            return self._inv.changes_since(since)
+        return 0, [] if since == 0 else None
+
+    def all(self) -> List[Product]:
+        if self._inv is not None:
+            return self._inv.all()
+        return [self._product(row) for row in range(self._count)]
+
+    def sorted_by(self, sort: str = "price") -> List[Product]:
+        return list(self.iter_sorted(sort))
+
+    def page(
+        self, sort: str = "price", limit: int = 100, after: Optional[SortKey] = None
+    ) -> Tuple[List[Product], Optional[SortKey]]:
+        """Bisection dans l'index du tri ; mêmes clés (curseurs) que l'Inventory."""
+        if self._inv is not None:
+            return self._inv.page(sort, limit, after)
+        index = self._sort_index(sort)
+        start = 0
+        if after is not None:
+            key = tuple(after)
+            start = bisect_right(index, key, key=lambda r: self._sort_key(sort, r))
+        rows = index[start : start + limit]
+        next_key = None
+        if start + limit < len(index):
+            next_key = self._sort_key(sort, rows[-1])
+        return [self._product(row) for row in rows], next_key
+
+    def expired(self) -> List[Product]:
+        if self._inv is not None:
+            return self._inv.expired()
+        return self._expiring_between(None, clock.today().toordinal() - 1)
+
+    def expiring_within(self, days: int) -> List[Product]:
+        if self._inv is not None:
+            return self._inv.expiring_within(days)
+        today = clock.today().toordinal()
+        return self._expiring_between(today, today + days)
+
+    def discounted(self) -> List[Product]:
+        return self.expiring_within(DISCOUNT_WINDOW_DAYS)
+
+    def search(
+        self,
+        name_prefix: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        product_type: Optional[str] = None,
+        expires_before: Optional[date] = None,
+    ) -> List[Product]:
+        """Index de nom et de prix : ceux de l'Inventory complet."""
+        return self._thaw().search(
+            name_prefix, min_price, max_price, product_type, expires_before
+        )
+
+    # --- itérateurs : lecture directe du fichier tant qu'il n'est pas dégelé ---
+    def iter_all(self) -> Iterator[Product]:
+        if self._inv is not None:
+            return self._inv.iter_all()
+        return (self._product(row) for row in range(self._count))
+
+    def iter_sorted(self, sort: str = "price") -> Iterator[Product]:
+        if self._inv is not None:
+            return self._inv.iter_sorted(sort)
+        index = self._sort_index(sort)
+        return (self._product(row) for row in index)
+
+    def iter_expired(self) -> Iterator[Product]:
+        if self._inv is not None:
+            return self._inv.iter_expired()
+        return self._iter_expiring_between(None, clock.today().toordinal() - 1)
+
+    def iter_expiring_within(self, days: int) -> Iterator[Product]:
+        if self._inv is not None:
+            return self._inv.iter_expiring_within(days)
+        today = clock.today().toordinal()
+        return self._iter_expiring_between(today, today + days)
+
+    def total_value(self) -> float:
+        """Depuis les agrégats par date : O(nombre de dates distinctes)."""
+        if self._inv is not None:
+            return self._inv.total_value()
+        today = clock.today().toordinal()
+        cents = self._regular_cents
+        for i in range(self._n_dates):
+            ordinal, price, half = DATE_TOTAL.unpack_from(
+                self._mm, self._off_dates + i * DATE_TOTAL.size
+            )
+            if ordinal < today:  # exact tant que EXPIRED_FACTOR = 0
+                cents += round(price * EXPIRED_FACTOR)
+                continue
+            cents += half if ordinal <= today + DISCOUNT_WINDOW_DAYS else price
+        return cents / 100
@@ -0,0 +1,203 @@
+"""
+Balayeur d'expiration : périssables rangés d'avance en trois paquets.
+
+`ExpirySweeper(inventory)` range chaque PerishableProduct dans un paquet
+"fresh" (plein tarif), "discounted" (fenêtre de remise, -50%) ou "expired",
+pour la date du jour (clock.today()) :
+- chaque paquet est trié par (ordinal d'expiration, sku), ce qui en fait
+  aussi l'échéancier des frontières : la prochaine entrée dans la fenêtre
+  de remise est en tête de "fresh", la prochaine expiration en tête de
+  "discounted". Au changement de date, `sweep()` détache ces préfixes par
+  bisection et les ajoute en queue du paquet suivant (qui reste trié) :
+  le coût suit le nombre de produits qui changent d'état ;
+- les ajouts/retraits/changements de prix sont lus dans le journal de
+  l'inventaire (changes_since), sans reparcourir le catalogue ; seul un
+  "resync" (journal évincé) ou un retour en arrière de l'horloge
+  reconstruit tout ;
+- les paquets sont servis dans les ordres de Inventory.expired() /
+  discounted().
+
+Les lectures (expired(), discounted()...) appellent sweep() : en O(1) si
+rien n'a changé. `run(interval)` est la tâche asyncio de fond (lifespan de
+l'API, voir create_app) qui balaie toutes les `interval` secondes, pour que
+les requêtes n'aient plus rien à rattraper ; un balayage en échec est
+journalisé ("freshcart.domain") et retenté au tour suivant.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import threading
+from bisect import bisect_left, insort
+from datetime import date
+from typing import Dict, List, Optional, Set, Tuple
+
+from freshcart.domain import clock
+from freshcart.domain.instrumentation import instrumented
+from freshcart.domain.inventory import ProductNotFoundError
+from freshcart.domain.products import DISCOUNT_WINDOW_DAYS, PerishableProduct, Product
+from freshcart.domain.repository import ProductRepository
+
+FRESH, DISCOUNTED, EXPIRED = "fresh", "discounted", "expired"
+BUCKETS = (FRESH, DISCOUNTED, EXPIRED)
+
+
+def bucket_of(expiry: int, today: int) -> str:
+    """Paquet d'un périssable (mêmes seuils que PerishableProduct.price_factor)."""
+    if expiry < today:
+        return EXPIRED
+    if expiry - today <= DISCOUNT_WINDOW_DAYS:
+        return DISCOUNTED
+    return FRESH
+
+
+class ExpirySweeper:
+    def __init__(self, inventory: ProductRepository) -> None:
+        self._inventory = inventory
+        self._lock = threading.Lock()
+        self._day = 0  # ordinal du dernier balayage (0 = jamais)
+        self._version = -1  # version de l'inventaire déjà intégrée
+        # paquets triés par (ordinal, sku), et placement courant de chaque sku
+        self._buckets: Dict[str, List[Tuple[int, str]]] = {b: [] for b in BUCKETS}
+        self._where: Dict[str, Tuple[int, str]] = {}
+        self._products: Dict[str, Product] = {}
+
+    @property
+    def day(self) -> Optional[date]:
+        """Date du dernier balayage."""
+        return date.fromordinal(self._day) if self._day else None
+
+    @instrumented("sweep")
+    def sweep(self) -> int:
+        """
+        Met les paquets à jour pour clock.today() ; retourne le nombre de
+        produits déplacés ou (re)placés.
+        """
+        today = clock.today().toordinal()
+        with self._lock:
+            if today == self._day and self._inventory.version == self._version:
+                return 0
+            # premier balayage, ou horloge remontée : tout est à refaire
+            if self._version < 0 or today < self._day:
+                return self._rebuild(today)
+            version, changes = self._inventory.changes_since(self._version)
+            if changes is None:
+                return self._rebuild(today, version)
+            # d'abord les transitions (paquets cohérents avec self._day),
+            # puis les modifications, placées directement pour `today`
+            moved = self._advance(today)
+            touched: Set[str] = {c.sku for c in changes}
+            for sku in touched:
+                self._unplace(sku)
+                try:
+                    product = self._inventory.get(sku)
+                except ProductNotFoundError:  # retiré
+                    continue
+                if isinstance(product, PerishableProduct):
+                    self._place(product, today)
+            self._version = version
+            return moved + len(touched)
+
+    def expired(self) -> List[Product]:
+        return self.bucket(EXPIRED)
+
+    def discounted(self) -> List[Product]:
+        return self.bucket(DISCOUNTED)
+
+    def fresh(self) -> List[Product]:
+        return self.bucket(FRESH)
+
+    def bucket(self, name: str) -> List[Product]:
+        """Produits du paquet `name`, triés par date d'expiration puis SKU."""
+        if name not in self._buckets:
+            raise ValueError(f"unknown bucket: {name}")
+        self.sweep()
+        with self._lock:
+            return [self._products[sku] for _, sku in self._buckets[name]]
+
+    def counts(self) -> Dict[str, int]:
+        self.sweep()
+        with self._lock:
+            return {name: len(keys) for name, keys in self._buckets.items()}
+
+    async def run(self, interval: float) -> None:
+        """
+        Balaie toutes les `interval` secondes, dans un thread : le premier
+        balayage parcourt tout l'inventaire sans bloquer la boucle. Une
+        erreur est journalisée sans arrêter la tâche.
+        """
+        if interval <= 0:
+            raise ValueError("interval must be > 0")
+        while True:
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception:
+                import logging  # seulement en cas d'échec (import coûteux)
+
+                logging.getLogger("freshcart.domain").exception("expiry sweep failed")
+            await asyncio.sleep(interval)
+
+    # --- méthodes privées : supposent self._lock détenu ---
+    def _rebuild(self, today: int, version: Optional[int] = None) -> int:
+        if version is None:
+            version = self._inventory.version
+        # instantané (all(), sous le verrou de lecture) : un ajout concurrent
+        # ne casse pas le parcours, il sera rejoué depuis `version` ;
+        # un tri par paquet plutôt qu'un insort par produit (O(n log n))
+        buckets: Dict[str, List[Tuple[int, str]]] = {b: [] for b in BUCKETS}
+        self._where.clear()
+        self._products.clear()
+        for product in self._inventory.all():
+            if isinstance(product, PerishableProduct):
+                sku, expiry = product.sku, product.expiry_date.toordinal()
+                bucket = bucket_of(expiry, today)
+                buckets[bucket].append((expiry, sku))
+                self._where[sku] = (expiry, bucket)
+                self._products[sku] = product
+        for keys in buckets.values():
+            keys.sort()
+        self._buckets = buckets
+        self._day, self._version = today, version
+        return len(self._where)
+
+    def _advance(self, today: int) -> int:
+        """
+        Transitions de self._day à `today` (plus tard) : les préfixes échus
+        de "fresh" et "discounted" passent en queue des paquets suivants.
+        Les ordinaux qui arrivent sont au-delà de ceux déjà présents (la
+        frontière avance avec la date), donc chaque paquet reste trié.
+        """
+        if today == self._day:
+            return 0
+        fresh, discounted, expired = (self._buckets[b] for b in BUCKETS)
+        n = bisect_left(fresh, (today + DISCOUNT_WINDOW_DAYS + 1,))
+        leaving = fresh[:n]
+        del fresh[:n]
+        m = bisect_left(discounted, (today,))
+        newly_expired = discounted[:m]
+        del discounted[:m]
+        k = bisect_left(leaving, (today,))  # fresh -> expired directement
+        newly_expired = list(heapq.merge(newly_expired, leaving[:k]))
+        expired.extend(newly_expired)
+        discounted.extend(leaving[k:])
+        for expiry, sku in newly_expired:
+            self._where[sku] = (expiry, EXPIRED)
+        for expiry, sku in leaving[k:]:
+            self._where[sku] = (expiry, DISCOUNTED)
+        self._day = today
+        return len(newly_expired) + len(leaving) - k
+
+    def _place(self, product: PerishableProduct, today: int) -> None:
+        expiry = product.expiry_date.toordinal()
+        bucket = bucket_of(expiry, today)
+        insort(self._buckets[bucket], (expiry, product.sku))
+        self._where[product.sku] = (expiry, bucket)
+        self._products[product.sku] = product
+
+    def _unplace(self, sku: str) -> None:
+        where = self._where.pop(sku, None)
+        self._products.pop(sku, None)
+        if where is not None:
+            keys = self._buckets[where[1]]
+            del keys[bisect_left(keys, (where[0], sku))]
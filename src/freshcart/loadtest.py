@@ -0,0 +1,318 @@
+"""
+Tests de charge de l'API : mélanges de requêtes générés ou rejoués.
+
+Usage :
+    python -m freshcart.loadtest --requests 5000 --concurrency 32 \\
+        --mix create=0.2,list=0.4,expired=0.2,value=0.2 --preload 10000
+    python -m freshcart.loadtest --record mix.jsonl --requests 5000  # enregistre
+    python -m freshcart.loadtest --replay mix.jsonl --url http://127.0.0.1:8000
+
+- Cible : create_app() en processus, via le transport ASGI de httpx (défaut,
+  settings de create_app en JSON avec --settings) ; --url vise un serveur
+  déjà lancé (ex: uvicorn) ; --serve lance uvicorn dans la même boucle.
+- Requêtes : un journal JSONL rejouable, une requête par ligne
+  {"method": ..., "path": ..., "json": ...} ; generate() en produit un
+  mélange reproductible (graine --seed) de créations, listes, périmés et
+  valeur d'inventaire.
+- Exécution : `concurrency` clients asyncio qui se partagent le journal.
+- Rapport JSON : par route ("GET /products"...) et au total, nombre de
+  requêtes, d'erreurs (statut >= 400), latences p50/p95/p99 (ms) et débit
+  (requêtes/s sur la durée du test).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import httpx
+
+from freshcart.domain import clock
+
+# part de chaque type de requête dans un mélange généré
+DEFAULT_MIX: Dict[str, float] = {
+    "create": 0.2,
+    "list": 0.4,
+    "expired": 0.2,
+    "value": 0.2,
+}
+PERCENTILES = (50, 95, 99)
+# hôte fictif du transport ASGI (aucune connexion réseau)
+ASGI_BASE_URL = "http://freshcart.test"
+
+
+@dataclass(frozen=True, slots=True)
+class RequestSpec:
+    """Une requête du journal."""
+
+    method: str
+    path: str
+    json: Optional[Dict[str, Any]] = None
+
+    @property
+    def route(self) -> str:
+        """Clé du rapport : méthode et chemin, sans la query string."""
+        return f"{self.method} {self.path.split('?', 1)[0]}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"method": self.method, "path": self.path}
+        if self.json is not None:
+            out["json"] = self.json
+        return out
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RequestSpec":
+        return cls(str(data["method"]).upper(), str(data["path"]), data.get("json"))
+
+
+def _product_payload(sku: str, rng: random.Random) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {
+        "sku": sku,
+        "name": f"Produit {sku}",
+        "initial_price": round(rng.uniform(0.5, 50.0), 2),
+    }
+    if rng.random() < 0.5:  # moitié de périssables, de J-5 à J+24
+        payload["type"] = "perishable"
+        expiry = clock.today() + timedelta(days=rng.randrange(-5, 25))
+        payload["expiry_date"] = expiry.isoformat()
+    return payload
+
+
+def generate(
+    n: int, mix: Optional[Dict[str, float]] = None, seed: int = 0
+) -> List[RequestSpec]:
+    """`n` requêtes tirées selon `mix` ; SKU créés uniques ("LT0000001"...)."""
+    mix = DEFAULT_MIX if mix is None else mix
+    unknown = set(mix) - set(DEFAULT_MIX)
+    if unknown:
+        raise ValueError(f"unknown request kinds: {sorted(unknown)}")
+    if not mix or min(mix.values()) < 0 or sum(mix.values()) <= 0:
+        raise ValueError("mix weights must be >= 0, with a positive sum")
+    rng = random.Random(seed)
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=n)
+    specs: List[RequestSpec] = []
+    created = 0
+    for kind in kinds:
+        if kind == "create":
+            created += 1
+            payload = _product_payload(f"LT{created:07d}", rng)
+            specs.append(RequestSpec("POST", "/products", payload))
+        elif kind == "list":
+            specs.append(RequestSpec("GET", "/products?limit=100"))
+        elif kind == "expired":
+            specs.append(RequestSpec("GET", "/products/expired"))
+        else:
+            specs.append(RequestSpec("GET", "/inventory/value"))
+    return specs
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Option --mix : "create=0.2,list=0.8" -> {"create": 0.2, "list": 0.8}."""
+    mix: Dict[str, float] = {}
+    for item in text.split(","):
+        kind, _, weight = item.partition("=")
+        mix[kind.strip()] = float(weight)
+    return mix
+
+
+def save_log(specs: Iterable[RequestSpec], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for spec in specs:
+            f.write(json.dumps(spec.to_dict(), separators=(",", ":")) + "\n")
+
+
+def load_log(path: str) -> List[RequestSpec]:
+    """Journal JSONL ; lignes vides ignorées."""
+    with open(path, encoding="utf-8") as f:
+        return [RequestSpec.from_dict(json.loads(line)) for line in f if line.strip()]
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Percentile `q` (0-100) par rang le plus proche ; 0.0 si vide."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(
+    samples: Iterable[Tuple[str, float, int]], elapsed: float
+) -> Dict[str, Any]:
+    """
+    Rapport JSON d'une série de mesures (route, latence en s, statut HTTP) :
+    {"elapsed_s", "total": {...}, "routes": {route: {...}}}.
+    """
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    for route, latency, status in samples:
+        latencies.setdefault(route, []).append(latency)
+        errors[route] = errors.get(route, 0) + (status >= 400)
+
+    def stats(values: List[float], failed: int) -> Dict[str, Any]:
+        values.sort()
+        out: Dict[str, Any] = {"requests": len(values), "errors": failed}
+        for q in PERCENTILES:
+            out[f"p{q}_ms"] = round(percentile(values, q) * 1000, 3)
+        out["throughput_rps"] = round(len(values) / elapsed, 1) if elapsed else 0.0
+        return out
+
+    routes = {
+        route: stats(values, errors[route])
+        for route, values in sorted(latencies.items())
+    }
+    every = [latency for values in latencies.values() for latency in values]
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "total": stats(every, sum(errors.values())),
+        "routes": routes,
+    }
+
+
+async def run(
+    client: httpx.AsyncClient, specs: Iterable[RequestSpec], concurrency: int = 16
+) -> Dict[str, Any]:
+    """Envoie `specs` avec `concurrency` clients simultanés ; rapport JSON."""
+    if concurrency < 1:
+        raise ValueError("concurrency must be >= 1")
+    queue: Iterator[RequestSpec] = iter(specs)  # partagé : une seule boucle
+    samples: List[Tuple[str, float, int]] = []
+
+    async def worker() -> None:
+        for spec in queue:
+            start = time.perf_counter()
+            response = await client.request(spec.method, spec.path, json=spec.json)
+            await response.aread()
+            samples.append(
+                (spec.route, time.perf_counter() - start, response.status_code)
+            )
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(samples, time.perf_counter() - start)
+
+
+async def preload(client: httpx.AsyncClient, n: int, seed: int = 0) -> None:
+    """Catalogue initial de `n` produits, en un appel à /products:bulk."""
+    if n <= 0:
+        return
+    rng = random.Random(~seed)
+    body = "\n".join(json.dumps(_product_payload(f"PL{i:07d}", rng)) for i in range(n))
+    response = await client.post(
+        "/products:bulk",
+        content=body.encode(),
+        headers={"content-type": "application/x-ndjson"},
+    )
+    response.raise_for_status()
+
+
+def asgi_client(settings: Optional[Dict[str, Any]] = None) -> httpx.AsyncClient:
+    """Client branché sur un create_app(settings) en processus."""
+    from freshcart.api.main import create_app
+
+    transport = httpx.ASGITransport(app=create_app(settings))
+    return httpx.AsyncClient(transport=transport, base_url=ASGI_BASE_URL)
+
+
+async def load_test(
+    specs: List[RequestSpec],
+    concurrency: int = 16,
+    url: Optional[str] = None,
+    settings: Optional[Dict[str, Any]] = None,
+    preload_products: int = 0,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Précharge puis exécute `specs`, en processus ou contre `url`."""
+    if url is None:
+        client = asgi_client(settings)
+    else:
+        client = httpx.AsyncClient(base_url=url)
+    async with client:
+        await preload(client, preload_products, seed)
+        report = await run(client, specs, concurrency)
+    report["target"] = url or "asgi"
+    report["concurrency"] = concurrency
+    return report
+
+
+async def _serve_and_test(
+    args: argparse.Namespace, specs: List[RequestSpec]
+) -> Dict[str, Any]:  # pragma: no cover - nécessite uvicorn
+    import uvicorn
+
+    from freshcart.api.main import create_app
+
+    config = uvicorn.Config(
+        create_app(args.settings), host="127.0.0.1", port=args.port, log_level="warning"
+    )
+    server = uvicorn.Server(config)
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    try:
+        url = f"http://127.0.0.1:{args.port}"
+        return await load_test(
+            specs, args.concurrency, url, None, args.preload, args.seed
+        )
+    finally:
+        server.should_exit = True
+        await serving
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m freshcart.loadtest",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--preload", type=int, default=0, help="produits initiaux")
+    parser.add_argument("--replay", help="journal JSONL à rejouer")
+    parser.add_argument("--record", help="écrit le journal généré (JSONL)")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="serveur déjà lancé (défaut : ASGI)")
+    target.add_argument("--serve", action="store_true", help="lance uvicorn")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--settings", type=json.loads, default=None)
+    parser.add_argument("--output", default="-", help="fichier JSON (- : stdout)")
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        specs = load_log(args.replay)
+    else:
+        specs = generate(args.requests, args.mix, args.seed)
+    if args.record:
+        save_log(specs, args.record)
+    if args.serve:  # pragma: no cover - nécessite uvicorn
+        report = asyncio.run(_serve_and_test(args, specs))
+    else:
+        report = asyncio.run(
+            load_test(
+                specs,
+                args.concurrency,
+                args.url,
+                args.settings,
+                args.preload,
+                args.seed,
+            )
+        )
+    text = json.dumps(report, indent=2)
+    if args.output == "-":
+        sys.stdout.write(text + "\n")
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
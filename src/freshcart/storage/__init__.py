@@ -0,0 +1,5 @@
+"""
+Backends de stockage persistants de l'inventaire.
+
+Chaque backend implémente freshcart.domain.repository.ProductRepository.
+"""
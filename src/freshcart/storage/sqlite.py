@@ -0,0 +1,571 @@
+"""
+Backend SQLite de l'inventaire (implémente ProductRepository).
+
+- Mode WAL : lectures concurrentes pendant une écriture, partage du fichier
+  entre plusieurs workers uvicorn.
+- Colonnes `sku` (unique) et `expiry` (ordinal de date) indexées.
+- Pool de connexions partagé par le threadpool de FastAPI ; requêtes SQL
+  constantes, donc préparées une fois par connexion (cache de sqlite3).
+- Insertions en lot (executemany dans une seule transaction).
+- expired()/total_value() calculés par SQLite (filtre indexé / agrégat SUM)
+  sans charger toutes les lignes en Python.
+- Journal des modifications (table `changes`) écrit dans la même transaction
+  que la mutation, donc partagé par tous les workers.
+
+Les prix sont stockés en cents, avec le prix remisé (-50%) précalculé à
+l'écriture pour que l'agrégat donne exactement le même total qu'Inventory.
+Les produits renvoyés sont reconstruits depuis la base ; modifier leur prix
+(setter) met à jour la ligne correspondante.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager, nullcontext
+from datetime import date
+from typing import (
+    Any,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from freshcart.domain import clock
+from freshcart.domain.instrumentation import instrumented
+from freshcart.domain.inventory import (
+    CHANGE_LOG_SIZE,
+    ITER_CHUNK,
+    Change,
+    DuplicateSkuError,
+    ProductNotFoundError,
+    SortKey,
+    _prefix_end,
+)
+from freshcart.domain.products import (
+    DISCOUNT_WINDOW_DAYS,
+    EXPIRED_FACTOR,
+    PerishableProduct,
+    Product,
+    discounted_price,
+    is_valid_price,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,  -- ordre d'insertion (all())
+    sku TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    price_cents INTEGER NOT NULL,
+    half_cents INTEGER NOT NULL,            -- prix remisé (DISCOUNT_FACTOR), en cents
+    expiry INTEGER                          -- date.toordinal(), NULL = régulier
+);
+CREATE INDEX IF NOT EXISTS idx_products_expiry ON products (expiry, sku);
+CREATE INDEX IF NOT EXISTS idx_products_price ON products (price_cents, sku);
+CREATE INDEX IF NOT EXISTS idx_products_name ON products (name, sku);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+-- journal borné des modifications ; versions <= changes_floor évincées
+CREATE TABLE IF NOT EXISTS changes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    version INTEGER NOT NULL,
+    op TEXT NOT NULL,
+    sku TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_changes_version ON changes (version);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('changes_floor', 0);
+"""
+
+_COLUMNS = "sku, name, price_cents, expiry"
+_INSERT = (
+    "INSERT INTO products (sku, name, price_cents, half_cents, expiry) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+_BUMP_VERSION = "UPDATE meta SET value = value + 1 WHERE key = 'version'"
+# entrée du journal, à la version de la transaction en cours
+_LOG_CHANGE = (
+    "INSERT INTO changes (version, op, sku) "
+    "SELECT value, ?, ? FROM meta WHERE key = 'version'"
+)
+# éviction des entrées au-delà de la taille du journal (plancher mis à jour)
+_EVICTED = "FROM changes WHERE id <= (SELECT MAX(id) FROM changes) - :size"
+_TRIM_CHANGES = (
+    f"UPDATE meta SET value = (SELECT MAX(version) {_EVICTED}) "
+    f"WHERE key = 'changes_floor' AND EXISTS (SELECT 1 {_EVICTED})",
+    f"DELETE {_EVICTED}",
+)
+# règles intégrées (voir freshcart.domain.products) ; le prix périmé est
+# recalculé en cents (exact tant que EXPIRED_FACTOR = 0)
+_TOTAL = f"""
+SELECT COALESCE(SUM(CASE
+    WHEN expiry IS NULL THEN price_cents
+    WHEN expiry < :today THEN CAST(ROUND(price_cents * {EXPIRED_FACTOR}) AS INTEGER)
+    WHEN expiry <= :today + {DISCOUNT_WINDOW_DAYS} THEN half_cents
+    ELSE price_cents
+END), 0) FROM products
+"""
+# clé d'expiration des produits réguliers : après tous les périssables
+# (identique à inventory._expiry_sort_key)
+_NO_EXPIRY = date.max.toordinal() + 1
+# ordre de tri -> (expression ORDER BY, condition de curseur keyset)
+_ORDERS = {
+    "price": ("price_cents, sku", "(price_cents, sku) > (?, ?)"),
+    "sku": ("sku", "sku > ?"),
+    "expiry": (
+        f"COALESCE(expiry, {_NO_EXPIRY}), sku",
+        f"(COALESCE(expiry, {_NO_EXPIRY}), sku) > (?, ?)",
+    ),
+}
+# paramètres max par requête "IN (...)" (limite SQLite historique : 999)
+_IN_CHUNK = 500
+
+Row = Tuple[str, str, int, Optional[int]]
+
+
+def _cents(value: float) -> int:
+    return round(value * 100)
+
+
+def _row_values(p: Product) -> Tuple[str, str, int, int, Optional[int]]:
+    expiry = p.expiry_date.toordinal() if isinstance(p, PerishableProduct) else None
+    half = _cents(discounted_price(p.price))
+    return (p.sku, p.name, _cents(p.price), half, expiry)
+
+
+class SqlitePool:
+    """Pool de connexions SQLite partagées entre threads."""
+
+    def __init__(self, path: str, size: int = 8) -> None:
+        self._path = path
+        self._size = size
+        self._created = 0
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None : autocommit, transactions explicites (BEGIN)
+        conn = sqlite3.connect(
+            self._path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=128,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self._size
+                if create:
+                    self._created += 1
+            if create:
+                try:
+                    conn = self._connect()
+                except BaseException:  # place rendue au pool
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            while True:
+                try:
+                    self._idle.get_nowait().close()
+                except queue.Empty:
+                    break
+                self._created -= 1
+
+
+class SqliteInventory:
+    def __init__(
+        self, path: str, pool_size: int = 8, change_log_size: int = CHANGE_LOG_SIZE
+    ) -> None:
+        self._pool = SqlitePool(path, pool_size)
+        self._change_log_size = change_log_size
+        with self._pool.connection() as conn:
+            conn.executescript(SCHEMA)
+            # tirée une fois à la création de la base : stable entre workers
+            # et redémarrages, nouvelle si le fichier est recréé
+            conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('epoch', ?)",
+                (int.from_bytes(os.urandom(7), "big"),),
+            )
+            epoch = conn.execute("SELECT value FROM meta WHERE key = 'epoch'")
+            self._epoch = f"sqlite-{epoch.fetchone()[0]:x}"
+
+    def close(self) -> None:
+        self._pool.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Transaction d'écriture (verrou pris dès le BEGIN). La version est
+        incrémentée d'entrée, pour que le journal (_LOG_CHANGE) la lise.
+        """
+        with self._pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(_BUMP_VERSION)
+                yield conn
+                for sql in _TRIM_CHANGES:
+                    conn.execute(sql, {"size": self._change_log_size})
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def _query(
+        self, sql: str, params: Sequence[Any] | Dict[str, Any] = ()
+    ) -> List[Any]:
+        with self._pool.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    # --- écritures ---
+    @instrumented("add")
+    def add(self, product: Product) -> None:
+        try:
+            with self._transaction() as conn:
+                conn.execute(_INSERT, _row_values(product))
+                conn.execute(_LOG_CHANGE, ("add", product.sku))
+        except sqlite3.IntegrityError:
+            raise DuplicateSkuError(f"Produit {product.sku} déjà présent") from None
+        product.add_owner(self)
+
+    @instrumented("add_many")
+    def add_many(
+        self, products: Iterable[Product], skip_duplicates: bool = False
+    ) -> List[Product]:
+        batch: Dict[str, Product] = {}
+        skipped: List[Product] = []
+        for product in products:
+            if product.sku in batch:
+                if not skip_duplicates:
+                    raise DuplicateSkuError(f"Produit {product.sku} déjà présent")
+                skipped.append(product)
+            else:
+                batch[product.sku] = product
+
+        with self._transaction() as conn:
+            skus = list(batch)
+            existing: set[str] = set()
+            for i in range(0, len(skus), _IN_CHUNK):
+                chunk = skus[i : i + _IN_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                sql = f"SELECT sku FROM products WHERE sku IN ({marks})"
+                existing.update(sku for (sku,) in conn.execute(sql, chunk))
+            if existing and not skip_duplicates:
+                sku = next(iter(existing))
+                raise DuplicateSkuError(f"Produit {sku} déjà présent")
+            skipped += [batch.pop(sku) for sku in existing]
+            conn.executemany(_INSERT, (_row_values(p) for p in batch.values()))
+            conn.executemany(_LOG_CHANGE, (("add", sku) for sku in batch))
+
+        for product in batch.values():
+            product.add_owner(self)
+        return skipped
+
+    def upsert(self, product: Product) -> Optional[Product]:
+        with self._transaction() as conn:
+            row = conn.execute(
+                f"SELECT {_COLUMNS} FROM products WHERE sku = ?", (product.sku,)
+            ).fetchone()
+            conn.execute(
+                _INSERT + " ON CONFLICT (sku) DO UPDATE SET name = excluded.name, "
+                "price_cents = excluded.price_cents, "
+                "half_cents = excluded.half_cents, expiry = excluded.expiry",
+                _row_values(product),
+            )
+            if row is not None:
+                conn.execute(_LOG_CHANGE, ("remove", product.sku))
+            conn.execute(_LOG_CHANGE, ("add", product.sku))
+        product.add_owner(self)
+        return None if row is None else self._product(row)
+
+    @instrumented("remove")
+    def remove(self, sku: str) -> None:
+        with self._transaction() as conn:
+            cur = conn.execute("DELETE FROM products WHERE sku = ?", (sku,))
+            if cur.rowcount == 0:
+                raise ProductNotFoundError(f"Produit {sku} introuvable")
+            conn.execute(_LOG_CHANGE, ("remove", sku))
+
+    @instrumented("bulk_update_prices")
+    def bulk_update_prices(self, prices: Mapping[str, float]) -> int:
+        """Même contrat qu'Inventory : une transaction, un executemany."""
+        rows: List[Tuple[int, int, str]] = []
+        for sku, value in prices.items():
+            if not is_valid_price(value):
+                raise ValueError(f"invalid price for {sku}: {value}")
+            price = round(float(value), 2)
+            rows.append((_cents(price), _cents(discounted_price(price)), sku))
+        if not rows:
+            return 0
+        with self._transaction() as conn:
+            skus = list(prices)
+            for i in range(0, len(skus), _IN_CHUNK):
+                chunk = skus[i : i + _IN_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                sql = f"SELECT sku FROM products WHERE sku IN ({marks})"
+                missing = set(chunk).difference(s for (s,) in conn.execute(sql, chunk))
+                if missing:  # annule la transaction : rien n'est modifié
+                    sku = next(s for s in chunk if s in missing)
+                    raise ProductNotFoundError(f"Produit {sku} introuvable")
+            conn.executemany(
+                "UPDATE products SET price_cents = ?, half_cents = ? WHERE sku = ?",
+                rows,
+            )
+            conn.executemany(_LOG_CHANGE, (("price", sku) for sku in skus))
+        return len(rows)
+
+    # --- PriceOwner : appelés par le setter Product.price ---
+    def price_lock(self) -> ContextManager[object]:
+        # la mise à jour est une transaction : pas de verrou en mémoire
+        return nullcontext()
+
+    def price_changed(self, product: Product, old_price: float) -> None:
+        _, _, price, half, _ = _row_values(product)
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE products SET price_cents = ?, half_cents = ? WHERE sku = ?",
+                (price, half, product.sku),
+            )
+            conn.execute(_LOG_CHANGE, ("price", product.sku))
+
+    # --- lectures ---
+    @property
+    def version(self) -> int:
+        return int(self._query("SELECT value FROM meta WHERE key = 'version'")[0][0])
+
+    @property
+    def epoch(self) -> str:
+        return self._epoch
+
+    def changes_since(self, since: int) -> Tuple[int, Optional[List[Change]]]:
+        with self._pool.connection() as conn:
+            conn.execute("BEGIN")  # lectures cohérentes entre elles (WAL)
+            try:
+                meta = dict(conn.execute("SELECT key, value FROM meta"))
+                version, floor = int(meta["version"]), int(meta["changes_floor"])
+                if since < floor or since > version:
+                    return version, None
+                rows = conn.execute(
+                    "SELECT version, op, sku FROM changes WHERE version > ? "
+                    "ORDER BY id",
+                    (since,),
+                ).fetchall()
+            finally:
+                conn.execute("COMMIT")
+        return version, [Change(*row) for row in rows]
+
+    def get(self, sku: str) -> Product:
+        rows = self._query(f"SELECT {_COLUMNS} FROM products WHERE sku = ?", (sku,))
+        if not rows:
+            raise ProductNotFoundError(f"Produit {sku} introuvable")
+        return self._product(rows[0])
+
+    def __contains__(self, sku: object) -> bool:
+        return bool(self._query("SELECT 1 FROM products WHERE sku = ?", (sku,)))
+
+    def __len__(self) -> int:
+        return int(self._query("SELECT COUNT(*) FROM products")[0][0])
+
+    def all(self) -> List[Product]:
+        return self._products(
+            self._query(f"SELECT {_COLUMNS} FROM products ORDER BY seq")
+        )
+
+    def sorted_by(self, sort: str = "price") -> List[Product]:
+        order, _ = self._order(sort)
+        return self._products(
+            self._query(f"SELECT {_COLUMNS} FROM products ORDER BY {order}")
+        )
+
+    def page(
+        self, sort: str = "price", limit: int = 100, after: Optional[SortKey] = None
+    ) -> Tuple[List[Product], Optional[SortKey]]:
+        order, condition = self._order(sort)
+        params: List[Any] = []
+        where = ""
+        if after is not None:
+            key = list(after)
+            # même refus que le backend mémoire (curseur -> 400 dans l'API)
+            # plutôt qu'un sqlite3.ProgrammingError sur le nombre de paramètres
+            if len(key) != condition.count("?"):
+                raise TypeError(f"cursor key does not match sort {sort!r}")
+            if sort == "price":
+                key[0] = _cents(key[0])
+            where, params = f"WHERE {condition}", key
+        rows = self._query(
+            f"SELECT {_COLUMNS} FROM products {where} ORDER BY {order} LIMIT ?",
+            [*params, limit + 1],
+        )
+        items = self._products(rows[:limit])
+        next_key = self._sort_key(sort, rows[limit - 1]) if len(rows) > limit else None
+        return items, next_key
+
+    @instrumented("expired")
+    def expired(self) -> List[Product]:
+        today = clock.today().toordinal()
+        return self._products(
+            self._query(
+                f"SELECT {_COLUMNS} FROM products WHERE expiry < ? "
+                "ORDER BY expiry, sku",
+                (today,),
+            )
+        )
+
+    def expiring_within(self, days: int) -> List[Product]:
+        today = clock.today().toordinal()
+        return self._products(
+            self._query(
+                f"SELECT {_COLUMNS} FROM products WHERE expiry BETWEEN ? AND ? "
+                "ORDER BY expiry, sku",
+                (today, today + days),
+            )
+        )
+
+    def discounted(self) -> List[Product]:
+        return self.expiring_within(DISCOUNT_WINDOW_DAYS)
+
+    @instrumented("search")
+    def search(
+        self,
+        name_prefix: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        product_type: Optional[str] = None,
+        expires_before: Optional[date] = None,
+    ) -> List[Product]:
+        """Voir Inventory.search ; SQLite choisit l'index (nom, prix, expiry)."""
+        if product_type not in (None, "regular", "perishable"):
+            raise ValueError(f"unknown product type: {product_type}")
+        conditions: List[str] = []
+        params: List[Any] = []
+        if name_prefix:
+            conditions.append("name >= ?")
+            params.append(name_prefix)
+            end = _prefix_end(name_prefix)
+            if end is not None:
+                conditions.append("name < ?")
+                params.append(end)
+        if min_price is not None:
+            conditions.append("price_cents >= ?")
+            params.append(math.ceil(round(min_price * 100, 6)))
+        if max_price is not None:
+            conditions.append("price_cents <= ?")
+            params.append(math.floor(round(max_price * 100, 6)))
+        if product_type is not None:
+            null = "IS NULL" if product_type == "regular" else "IS NOT NULL"
+            conditions.append(f"expiry {null}")
+        if expires_before is not None:
+            conditions.append("expiry < ?")
+            params.append(expires_before.toordinal())
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self._products(
+            self._query(
+                f"SELECT {_COLUMNS} FROM products {where} ORDER BY price_cents, sku",
+                params,
+            )
+        )
+
+    # --- itérateurs : une requête keyset par paquet de ITER_CHUNK lignes ---
+    def iter_all(self) -> Iterator[Product]:
+        seq = 0
+        while True:
+            rows = self._query(
+                f"SELECT seq, {_COLUMNS} FROM products WHERE seq > ? "
+                "ORDER BY seq LIMIT ?",
+                (seq, ITER_CHUNK),
+            )
+            for row in rows:
+                yield self._product(row[1:])
+            if len(rows) < ITER_CHUNK:
+                return
+            seq = rows[-1][0]
+
+    def iter_sorted(self, sort: str = "price") -> Iterator[Product]:
+        after: Optional[SortKey] = None
+        while True:
+            items, after = self.page(sort, ITER_CHUNK, after)
+            yield from items
+            if after is None:
+                return
+
+    def iter_expired(self) -> Iterator[Product]:
+        today = clock.today().toordinal()
+        return self._iter_expiring_between(0, today - 1)
+
+    def iter_expiring_within(self, days: int) -> Iterator[Product]:
+        today = clock.today().toordinal()
+        return self._iter_expiring_between(today, today + days)
+
+    def _iter_expiring_between(self, first: int, last: int) -> Iterator[Product]:
+        after: Tuple[int, str] = (first, "")
+        while True:
+            rows = self._query(
+                f"SELECT {_COLUMNS} FROM products "
+                "WHERE expiry BETWEEN ? AND ? AND (expiry, sku) > (?, ?) "
+                "ORDER BY expiry, sku LIMIT ?",
+                (first, last, *after, ITER_CHUNK),
+            )
+            for row in rows:
+                yield self._product(row)
+            if len(rows) < ITER_CHUNK:
+                return
+            after = (rows[-1][3], rows[-1][0])
+
+    @instrumented("total_value")
+    def total_value(self) -> float:
+        today = clock.today().toordinal()
+        return int(self._query(_TOTAL, {"today": today})[0][0]) / 100
+
+    # --- interne ---
+    @staticmethod
+    def _order(sort: str) -> Tuple[str, str]:
+        if sort not in _ORDERS:
+            raise ValueError(f"unknown sort order: {sort}")
+        return _ORDERS[sort]
+
+    @staticmethod
+    def _sort_key(sort: str, row: Row) -> SortKey:
+        sku, _, price_cents, expiry = row
+        if sort == "price":
+            return (price_cents / 100, sku)
+        if sort == "expiry":
+            return (_NO_EXPIRY if expiry is None else expiry, sku)
+        return (sku,)
+
+    def _product(self, row: Row) -> Product:
+        sku, name, price_cents, expiry = row
+        p: Product
+        if expiry is None:
+            p = Product(sku, name, price_cents / 100)
+        else:
+            expiry_date = date.fromordinal(expiry)
+            p = PerishableProduct(sku, name, price_cents / 100, expiry_date=expiry_date)
+        p.add_owner(self)
+        return p
+
+    def _products(self, rows: Iterable[Row]) -> List[Product]:
+        return [self._product(row) for row in rows]
@@ -0,0 +1,93 @@
+# Fixtures partagées : horloge pilotée par le test, catalogues de référence
+# et clé de comparaison des produits entre implémentations.
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Callable, Iterator, List, Tuple
+
+import pytest
+
+from freshcart.domain import clock
+from freshcart.domain.products import PerishableProduct, Product
+
+TODAY = date(2030, 1, 15)
+
+# Clé de comparaison d'un produit (objets distincts, même contenu)
+ProductKey = Callable[[Product], Tuple[object, ...]]
+Catalogue = Callable[[int], List[Product]]
+SmallCatalogue = Callable[[], List[Product]]
+
+
+class FakeClock:
+    """Horloge pilotée par le test (set_clock) : avancer `day` à la main."""
+
+    def __init__(self, day: date) -> None:
+        self.day = day
+
+    def __call__(self) -> date:
+        return self.day
+
+
+@pytest.fixture
+def fake_clock() -> Iterator[FakeClock]:
+    """Horloge du domaine figée à TODAY pour la durée du test."""
+    fake = FakeClock(TODAY)
+    clock.set_clock(fake)
+    yield fake
+    clock.set_clock(None)
+
+
+@pytest.fixture
+def product_key() -> ProductKey:
+    def key(p: Product) -> Tuple[object, ...]:
+        expiry = getattr(p, "expiry_date", None)
+        return (type(p).__name__, p.sku, p.name, p.price, expiry)
+
+    return key
+
+
+@pytest.fixture
+def mixed_catalogue(fake_clock: FakeClock) -> Catalogue:
+    """
+    Fabrique de `n` produits alternés : réguliers R<i> (2.5 + i) et
+    périssables P<i> (1.15 + i) qui expirent de J-4 à J+4.
+    """
+
+    def build(n: int) -> List[Product]:
+        today = fake_clock.day
+        return [
+            (
+                PerishableProduct(
+                    f"P{i}", "lait", 1.15 + i, expiry_date=today + timedelta(i % 9 - 4)
+                )
+                if i % 2
+                else Product(f"R{i}", "riz", 2.5 + i)
+            )
+            for i in range(n)
+        ]
+
+    return build
+
+
+@pytest.fixture
+def small_catalogue() -> SmallCatalogue:
+    """
+    Fabrique du catalogue des tests de parité entre stockages : 6 réguliers
+    et 12 périssables, de J-4 à J+7 (nouveaux objets à chaque appel).
+    """
+
+    def build() -> List[Product]:
+        today = clock.today()
+        items: List[Product] = [
+            Product(f"R{i}", f"Régulier {i}", 1.25 * i) for i in range(6)
+        ]
+        items += [
+            PerishableProduct(
+                f"P{i}", f"Périssable {i}", 5.35 + i, expiry_date=today + timedelta(i)
+            )
+            for i in range(-4, 8)
+        ]
+        return items
+
+    return build
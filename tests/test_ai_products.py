@@ -64,3 +64,101 @@ def test_duplicate_sku_rejected() -> None:
     r = client.post("/products", json=p)
     assert r.status_code == 400
     assert r.json()["detail"] == "SKU already exists"
+
+
+def test_get_and_delete_product_by_sku() -> None:
+    app = create_app()
+    client = TestClient(app)
+
+    client.post("/products", json={"sku": "G1", "name": "Riz", "initial_price": 3.0})
+
+    r = client.get("/products/G1")
+    assert r.status_code == 200
+    assert r.json()["name"] == "Riz"
+
+    assert client.delete("/products/G1").status_code == 204
+    assert client.get("/products/G1").status_code == 404
+    assert client.delete("/products/G1").status_code == 404
+
+
+def test_list_products_pagination_with_cursor() -> None:
+    client = TestClient(create_app())
+    for i, price in enumerate([5.0, 1.0, 3.0, 2.0, 4.0]):
+        client.post(
+            "/products", json={"sku": f"K{i}", "name": "x", "initial_price": price}
+        )
+
+    seen = []
+    params: dict[str, str | int] = {"limit": 2, "sort": "price"}
+    while True:
+        r = client.get("/products", params=params)
+        assert r.status_code == 200
+        seen += [it["price"] for it in r.json()]
+        cursor = r.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params["cursor"] = cursor
+    assert seen == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+    r = client.get("/products", params={"sort": "sku", "limit": 10})
+    assert [it["sku"] for it in r.json()] == ["K0", "K1", "K2", "K3", "K4"]
+    assert "X-Next-Cursor" not in r.headers
+
+
+def test_list_products_rejects_bad_cursor() -> None:
+    client = TestClient(create_app())
+    client.post("/products", json={"sku": "Z", "name": "x", "initial_price": 1.0})
+
+    assert client.get("/products", params={"cursor": "%%%"}).status_code == 400
+    page = client.get("/products", params={"limit": 1, "sort": "sku"})
+    assert page.status_code == 200
+    # curseur émis pour un autre ordre de tri
+    from freshcart.api.routers.products import encode_cursor
+
+    other = encode_cursor("price", ("not-a-price", "Z"))
+    assert client.get("/products", params={"cursor": other}).status_code == 400
+    assert (
+        client.get("/products", params={"cursor": other, "sort": "sku"}).status_code
+        == 400
+    )
+
+
+def test_patch_prices_in_bulk() -> None:
+    client = TestClient(create_app())
+    for sku in ("A", "B", "C"):
+        client.post("/products", json={"sku": sku, "name": "Riz", "initial_price": 3.0})
+    version = client.get("/products/changes").json()["version"]
+
+    r = client.patch("/products/prices", json={"prices": {"A": 1.255, "C": 0.5}})
+    assert r.status_code == 200
+    assert r.json() == {"updated": 2, "version": version + 2}
+    prices = {p["sku"]: p["price"] for p in client.get("/products").json()}
+    assert prices == {"A": 1.25, "B": 3.0, "C": 0.5}
+
+    # tout ou rien : un SKU inconnu -> 404, aucun prix modifié
+    r = client.patch("/products/prices", json={"prices": {"B": 1.0, "X": 1.0}})
+    assert r.status_code == 404
+    assert r.json()["detail"] == {"message": "Product not found", "skus": ["X"]}
+    assert client.get("/products/B").json()["price"] == 3.0
+    assert (
+        client.patch("/products/prices", json={"prices": {"B": -1}}).status_code == 422
+    )
+    assert client.patch("/products/prices", json={"prices": {}}).status_code == 422
+    # prix non finis : refusés avant toute écriture
+    version = client.get("/products/changes").json()["version"]
+    r = client.patch(
+        "/products/prices",
+        content=b'{"prices": {"A": 2.0, "B": Infinity, "C": 3.0}}',
+        headers={"content-type": "application/json"},
+    )
+    assert r.status_code == 422
+    prices = {p["sku"]: p["price"] for p in client.get("/products").json()}
+    assert prices == {"A": 1.25, "B": 3.0, "C": 0.5}
+    assert client.get("/products/changes").json()["version"] == version
+    r = client.post(
+        "/products",
+        content=b'{"sku": "D", "name": "Riz", "initial_price": Infinity}',
+        headers={"content-type": "application/json"},
+    )
+    assert r.status_code == 422
+    assert client.get("/products/D").status_code == 404
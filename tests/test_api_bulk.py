@@ -0,0 +1,107 @@
+"""
+Tests d’intégration pour POST /products:bulk (NDJSON et CSV).
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+from freshcart.api.main import create_app
+
+NDJSON = {"Content-Type": "application/x-ndjson"}
+
+
+def test_bulk_ndjson_creates_valid_rows_and_reports_errors() -> None:
+    client = TestClient(create_app())
+    client.post("/products", json={"sku": "OLD", "name": "Café", "initial_price": 8.0})
+
+    soon = (date.today() + timedelta(days=2)).isoformat()
+    lines = [
+        json.dumps({"sku": "B1", "name": "Sucre", "initial_price": 2.0}),
+        json.dumps(
+            {
+                "sku": "B2",
+                "name": "Lait",
+                "initial_price": 4.0,
+                "type": "perishable",
+                "expiry_date": soon,
+            }
+        ),
+        json.dumps({"sku": "B3", "name": "Lait", "type": "perishable"}),  # invalide
+        "{pas du json",
+        json.dumps({"sku": "OLD", "name": "Café", "initial_price": 8.0}),  # doublon
+        json.dumps({"sku": "B1", "name": "Sucre", "initial_price": 2.0}),  # doublon
+        "",
+        json.dumps({"sku": "B4", "name": "Thé", "initial_price": -1}),  # invalide
+    ]
+    body = "\n".join(lines).encode()
+
+    r = client.post("/products:bulk?batch_size=2", content=body, headers=NDJSON)
+    assert r.status_code == 200
+    report = r.json()
+    assert report["received"] == 7
+    assert report["created"] == 2
+    assert report["failed"] == 5
+    errors = sorted(report["errors"], key=lambda e: e["row"])
+    assert [e["row"] for e in errors] == [3, 4, 5, 6, 7]
+    assert errors[2] == {
+        "row": 5,
+        "sku": "OLD",
+        "errors": ["SKU already exists"],
+    }
+    assert errors[4]["errors"][0].startswith("initial_price:")
+
+    assert client.get("/products/B2").json()["final_price"] == 2.0
+    assert client.get("/inventory/value").json() == {"total_value": 12.0}
+
+
+def test_bulk_csv() -> None:
+    client = TestClient(create_app())
+    body = (
+        "sku,name,initial_price,type,expiry_date\r\n"
+        "C1,Riz,3.5,,\r\n"
+        "C2,Yaourt,3.0,perishable,2000-01-01\r\n"
+        "C3,Trop,1.0\r\n"
+    )
+
+    r = client.post(
+        "/products:bulk", content=body, headers={"Content-Type": "text/csv"}
+    )
+    report = r.json()
+    assert report["created"] == 2
+    assert report["errors"][0]["row"] == 3
+    assert [p["sku"] for p in client.get("/products/expired").json()] == ["C2"]
+
+
+def test_bulk_rejects_unknown_content_type() -> None:
+    client = TestClient(create_app())
+    r = client.post("/products:bulk", json=[{"sku": "X"}])
+    assert r.status_code == 415
+
+
+def test_bulk_reports_invalid_utf8_rows() -> None:
+    client = TestClient(create_app())
+    good = json.dumps({"sku": "U1", "name": "Riz", "initial_price": 1.0}).encode()
+    body = b"\n".join(
+        [good, b'{"sku": "U2", "name": "\xff"}', good.replace(b"U1", b"U3")]
+    )
+
+    report = client.post("/products:bulk?batch_size=1", content=body, headers=NDJSON)
+    assert report.status_code == 200
+    assert report.json()["created"] == 2
+    assert report.json()["errors"] == [
+        {"row": 2, "sku": None, "errors": ["invalid UTF-8"]}
+    ]
+
+    csv_headers = {"Content-Type": "text/csv"}
+    body = b"sku,name,initial_price\nC1,Caf\xe9,2.0\nC2,Th\xc3\xa9,1.0"
+    report = client.post("/products:bulk", content=body, headers=csv_headers).json()
+    assert (report["created"], report["errors"][0]["row"]) == (1, 1)
+    body = b"sku,n\xffame\nC3,x\n"
+    report = client.post("/products:bulk", content=body, headers=csv_headers).json()
+    assert report["errors"] == [
+        {"row": 1, "sku": None, "errors": ["header: invalid UTF-8"]}
+    ]
@@ -0,0 +1,163 @@
+# But : les lectures sont servies depuis le cache HTTP tant que la version
+# de l'inventaire et la date ne changent pas, avec ETag et 304.
+
+from __future__ import annotations
+
+from datetime import date
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from freshcart.api.cache import CachedResponse, ResponseCache, etag_for
+from freshcart.api.main import create_app
+from freshcart.domain.clock import set_clock
+from freshcart.domain.inventory import Inventory
+from freshcart.domain.pricing import compile_rules
+from freshcart.domain.products import Product
+
+
+def _client(**settings: object) -> TestClient:
+    client = TestClient(create_app(dict(settings)))
+    for sku, price in (("A", 2.0), ("B", 1.0)):
+        client.post("/products", json={"sku": sku, "name": sku, "initial_price": price})
+    return client
+
+
+def test_reads_are_cached_until_the_inventory_changes() -> None:
+    client = _client()
+    cache = client.app.state.response_cache  # type: ignore[attr-defined]
+
+    first = client.get("/products")
+    again = client.get("/products")
+    assert first.content == again.content
+    assert first.headers["etag"] == again.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+    assert (cache.misses, cache.hits) == (1, 1)
+
+    # même requête, paramètres dans un autre ordre : même entrée
+    client.get("/products", params={"sort": "sku", "limit": 1})
+    page = client.get("/products?limit=1&sort=sku")
+    assert page.headers["x-next-cursor"]  # en-têtes d'origine conservés
+    assert (cache.misses, cache.hits) == (2, 2)
+
+    client.post("/products", json={"sku": "C", "name": "C", "initial_price": 3.0})
+    changed = client.get("/products")
+    assert changed.headers["etag"] != first.headers["etag"]
+    assert [p["sku"] for p in changed.json()] == ["B", "A", "C"]
+    assert client.get("/inventory/value").json() == {"total_value": 6.0}
+
+
+def test_if_none_match_gets_304_without_rendering() -> None:
+    client = _client(metrics=True)
+    cache = client.app.state.response_cache  # type: ignore[attr-defined]
+    etag = client.get("/products/expired").headers["etag"]
+
+    r = client.get("/products/expired", headers={"If-None-Match": f'"x", W/{etag}'})
+    assert r.status_code == 304 and r.content == b"" and r.headers["etag"] == etag
+    assert (
+        client.get("/products/expired", headers={"If-None-Match": "*"}).status_code
+        == 304
+    )
+    assert cache.not_modified == 2
+
+    client.delete("/products/A")
+    r = client.get("/products/expired", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+
+    metrics = client.get("/metrics").text
+    assert 'freshcart_response_cache_total{result="not_modified"} 2' in metrics
+
+
+def test_pricing_date_is_part_of_the_key() -> None:
+    client = _client()
+    etag = client.get("/inventory/value").headers["etag"]
+    set_clock(lambda: date(2040, 1, 1))
+    try:
+        assert client.get("/inventory/value").headers["etag"] != etag
+    finally:
+        set_clock(None)
+
+
+def test_errors_and_other_routes_bypass_the_cache() -> None:
+    client = _client()
+    cache = client.app.state.response_cache  # type: ignore[attr-defined]
+    assert client.get("/products", params={"cursor": "???"}).status_code == 400
+    assert client.get("/products", params={"cursor": "???"}).status_code == 400
+    client.get("/products/A")
+    assert len(cache) == 0 and cache.hits == 0
+
+    uncached = _client(response_cache=0)
+    assert uncached.app.state.response_cache is None  # type: ignore[attr-defined]
+    assert "etag" not in uncached.get("/products").headers
+
+
+def test_etags_do_not_survive_a_restart_of_the_memory_store() -> None:
+    # même contenu, même version : un Inventory neuf reste une autre époque
+    etag = _client().get("/products").headers["etag"]
+    restarted = _client().get("/products", headers={"If-None-Match": etag})
+    assert restarted.status_code == 200
+    assert restarted.headers["etag"] != etag
+
+
+def test_etags_are_shared_by_workers_of_the_same_snapshot(tmp_path: Path) -> None:
+    path = str(tmp_path / "shop.snap")
+    source = Inventory()
+    source.add_many([Product("A", "A", 2.0), Product("B", "B", 1.0)])
+    source.save_snapshot(path)
+    rules = [{"name": "soldes", "type": "regular", "factor": 0.5}]
+    settings = {"storage": "snapshot", "snapshot_path": path, "pricing_rules": rules}
+    first = TestClient(create_app(dict(settings)))
+    second = TestClient(create_app(dict(settings)))  # autre worker, autre plan
+    etag = first.get("/inventory/value").headers["etag"]
+    r = second.get("/inventory/value", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+
+    # modifié par un seul worker : ses versions lui sont propres
+    second.post("/products", json={"sku": "C", "name": "C", "initial_price": 1.0})
+    second.delete("/products/C")
+    r = second.get("/inventory/value", headers={"If-None-Match": etag})
+    assert r.status_code == 200 and r.json() == {"total_value": 1.5}
+    assert first.get("/inventory/value").headers["etag"] == etag
+
+
+def test_etags_follow_the_sqlite_file(tmp_path: Path) -> None:
+    path = tmp_path / "shop.db"
+    settings = {"storage": "sqlite", "sqlite_path": str(path)}
+    first = TestClient(create_app(dict(settings)))
+    first.post("/products", json={"sku": "A", "name": "A", "initial_price": 2.0})
+    etag = first.get("/products").headers["etag"]
+    second = TestClient(create_app(dict(settings)))  # même base : même ETag
+    assert second.get("/products", headers={"If-None-Match": etag}).status_code == 304
+
+    first.app.state.inventory.close()  # type: ignore[attr-defined]
+    second.app.state.inventory.close()  # type: ignore[attr-defined]
+    for leftover in tmp_path.glob("shop.db*"):
+        leftover.unlink()
+    recreated = TestClient(create_app(dict(settings)))
+    recreated.post("/products", json={"sku": "A", "name": "A", "initial_price": 2.0})
+    r = recreated.get("/products", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+
+
+def test_plan_fingerprint_is_stable_and_follows_the_rules() -> None:
+    rules = [{"name": "frais", "type": "perishable", "max_days": 2, "factor": 0.7}]
+    plan = compile_rules(rules)
+    assert plan.fingerprint == compile_rules(rules).fingerprint
+    assert plan.fingerprint != compile_rules([{**rules[0], "factor": 0.6}]).fingerprint
+
+
+def test_lru_is_bounded_by_entries_and_bytes() -> None:
+    cache = ResponseCache(max_entries=2, max_bytes=10)
+
+    def entry(body: bytes) -> CachedResponse:
+        return CachedResponse(etag_for((body,)), 200, [], body)
+
+    cache.put(("a",), entry(b"1234"))
+    cache.put(("b",), entry(b"1234"))
+    assert cache.get(("a",)) is not None  # "a" devient la plus récente
+    cache.put(("c",), entry(b"12"))
+    assert cache.get(("b",)) is None and len(cache) == 2
+    cache.put(("a",), entry(b"123456789"))  # remplace "a", dépasse 10 octets
+    assert cache.get(("c",)) is None and cache.stats()["bytes"] == 9
+    cache.put(("big",), entry(b"x" * 11))  # trop gros : jamais mis en cache
+    assert cache.get(("big",)) is None
@@ -0,0 +1,124 @@
+# But : GET /products/changes ne renvoie que les modifications depuis une
+# version (ou demande une resynchronisation), aussi en Server-Sent Events.
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi.testclient import TestClient
+
+from freshcart.api.main import create_app
+from freshcart.domain.inventory import Change, Inventory
+
+
+def _post(client: TestClient, sku: str, price: float) -> None:
+    r = client.post("/products", json={"sku": sku, "name": sku, "initial_price": price})
+    assert r.status_code == 201
+
+
+def test_changes_are_collapsed_per_sku() -> None:
+    client = TestClient(create_app())
+    assert client.get("/products/changes").json() == {
+        "version": 0,
+        "resync": False,
+        "changes": [],
+    }
+    _post(client, "A", 1.0)
+    _post(client, "B", 2.0)
+    first = client.get("/products/changes").json()
+    assert first["version"] == 2
+    assert [(c["sku"], c["op"]) for c in first["changes"]] == [
+        ("A", "upsert"),
+        ("B", "upsert"),
+    ]
+    assert first["changes"][0]["product"]["price"] == 1.0
+
+    client.app.state.inventory.get("A").price = 5.0  # type: ignore[attr-defined]
+    client.delete("/products/B")
+    _post(client, "C", 3.0)
+    delta = client.get("/products/changes", params={"since": 2}).json()
+    assert delta["version"] == 5 and not delta["resync"]
+    assert [(c["sku"], c["op"]) for c in delta["changes"]] == [
+        ("A", "upsert"),
+        ("B", "remove"),
+        ("C", "upsert"),
+    ]
+    assert delta["changes"][0]["product"]["final_price"] == 5.0
+    assert delta["changes"][1]["product"] is None
+
+    assert client.get("/products/changes", params={"since": 5}).json()["changes"] == []
+    assert client.get("/products/changes", params={"since": 9}).json()["resync"]
+    assert client.get("/products/changes", params={"since": -1}).status_code == 422
+
+
+def test_truncated_log_asks_for_resync() -> None:
+    app = create_app()
+    app.state.inventory = Inventory(change_log_size=2)
+    client = TestClient(app)
+    for i in range(3):
+        _post(client, f"S{i}", 1.0)
+    assert client.get("/products/changes", params={"since": 0}).json() == {
+        "version": 3,
+        "resync": True,
+        "changes": [],
+    }
+    assert (
+        len(client.get("/products/changes", params={"since": 1}).json()["changes"]) == 2
+    )
+
+
+def _events(body: str) -> List[Dict[str, Any]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append({"event": fields["event"], **json.loads(fields["data"])})
+    return events
+
+
+def test_stream_pushes_changes_as_server_sent_events() -> None:
+    client = TestClient(create_app())
+    _post(client, "A", 1.0)
+    r = client.get("/products/changes/stream", params={"max_events": 1, "poll": 0.01})
+    assert r.headers["content-type"].startswith("text/event-stream")
+    [event] = _events(r.text)
+    assert event["event"] == "changes" and event["version"] == 1
+    assert [c["sku"] for c in event["changes"]] == ["A"]
+
+    r = client.get(
+        "/products/changes/stream", params={"since": 7, "max_events": 1, "poll": 0.01}
+    )
+    assert _events(r.text)[0]["event"] == "resync"
+
+
+class _OffLoopInventory(Inventory):
+    """Inventaire qui refuse d'être lu depuis la boucle d'événements."""
+
+    @staticmethod
+    def _off_loop() -> None:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:  # thread du threadpool : pas de boucle
+            return
+        raise AssertionError("inventory read on the event loop")
+
+    @property
+    def version(self) -> int:
+        self._off_loop()
+        return super().version
+
+    def changes_since(self, since: int) -> Tuple[int, Optional[List[Change]]]:
+        self._off_loop()
+        return super().changes_since(since)
+
+
+def test_stream_reads_the_inventory_off_the_event_loop() -> None:
+    app = create_app()
+    inv = app.state.inventory = _OffLoopInventory()
+    client = TestClient(app)
+    _post(client, "A", 1.0)
+    r = client.get("/products/changes/stream", params={"max_events": 1, "poll": 0.01})
+    assert r.status_code == 200
+    [event] = _events(r.text)
+    assert event["version"] == inv.version == 1
@@ -19,3 +19,28 @@ def test_health_returns_ok() -> None:
     resp = client.get("/health")
     assert resp.status_code == 200
     assert resp.json() == {"status": "ok"}
+
+
+def test_metrics_endpoint_exposes_domain_calls() -> None:
+    client = TestClient(create_app({"metrics": True}))
+    client.post("/products", json={"sku": "M1", "name": "Café", "initial_price": 8.0})
+    client.get("/inventory/value")
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'freshcart_domain_call_seconds_count{method="add"} 1' in resp.text
+    assert 'freshcart_domain_call_seconds_count{method="total_value"} 1' in resp.text
+
+
+def test_metrics_are_opt_in_and_scoped_per_app() -> None:
+    assert TestClient(create_app()).get("/metrics").status_code == 404
+    measured = TestClient(create_app({"metrics": True}))
+    # une autre app, créée après, sans métriques : ni coupure ni comptage
+    other = TestClient(create_app({"metrics": False}))
+    assert other.get("/metrics").status_code == 404
+    other.post("/products", json={"sku": "O1", "name": "Thé", "initial_price": 1.0})
+    measured.post("/products", json={"sku": "M1", "name": "Thé", "initial_price": 1.0})
+
+    text = measured.get("/metrics").text
+    assert 'freshcart_domain_call_seconds_count{method="add"} 1' in text
@@ -5,6 +5,7 @@ from datetime import date, timedelta
 from fastapi.testclient import TestClient
 
 from freshcart.api.main import create_app
+from freshcart.domain.clock import set_clock
 
 
 def test_inventory_value_and_expired() -> None:
@@ -51,3 +52,38 @@ def test_inventory_value_and_expired() -> None:
     assert r_exp.status_code == 200
     skus = [item["sku"] for item in r_exp.json()]
     assert "P0" in skus
+
+    # expiring → P2 (2 jours), pas P0 (déjà périmé)
+    r_soon = client.get("/products/expiring", params={"days": 3})
+    assert r_soon.status_code == 200
+    assert [item["sku"] for item in r_soon.json()] == ["P2"]
+
+
+def test_requests_are_priced_with_one_clock_read() -> None:
+    day = date(2030, 1, 10)
+    reads: list[date] = []
+
+    def clock() -> date:
+        reads.append(day)
+        return day
+
+    client = TestClient(create_app())
+    for i in range(5):
+        client.post(
+            "/products",
+            json={
+                "sku": f"P{i}",
+                "name": "Lait",
+                "initial_price": 4.0,
+                "type": "perishable",
+                "expiry_date": (day + timedelta(days=i)).isoformat(),
+            },
+        )
+    set_clock(clock)
+    try:
+        r = client.get("/products")
+        assert len(reads) == 1  # une lecture pour toute la liste
+        assert [p["final_price"] for p in r.json()] == [2.0, 2.0, 2.0, 2.0, 4.0]
+        assert client.get("/inventory/value").json() == {"total_value": 12.0}
+    finally:
+        set_clock(None)
@@ -0,0 +1,58 @@
+# But : GET /products/search filtre côté serveur (nom, prix, type, expiration).
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+from freshcart.api.main import create_app
+
+
+def _client() -> TestClient:
+    client = TestClient(create_app())
+    today = date.today()
+    for sku, name, price, days in (
+        ("A", "Lait entier", 1.2, 1),
+        ("B", "Lait écrémé", 0.9, 5),
+        ("C", "Laitue", 1.5, 2),
+        ("D", "Pain", 2.0, None),
+        ("E", "Lardons", 3.5, -1),
+    ):
+        payload = {"sku": sku, "name": name, "initial_price": price}
+        if days is not None:
+            payload |= {
+                "type": "perishable",
+                "expiry_date": str(today + timedelta(days=days)),
+            }
+        assert client.post("/products", json=payload).status_code == 201
+    return client
+
+
+def _skus(client: TestClient, **params: object) -> list[str]:
+    r = client.get("/products/search", params=params)
+    assert r.status_code == 200
+    return [p["sku"] for p in r.json()]
+
+
+def test_search_filters_combine() -> None:
+    client = _client()
+    today = date.today()
+    assert _skus(client) == ["B", "A", "C", "D", "E"]
+    assert _skus(client, name_prefix="Lait") == ["B", "A", "C"]
+    assert _skus(client, name_prefix="Lait ") == ["B", "A"]
+    assert _skus(client, min_price=1.2, max_price=2.0) == ["A", "C", "D"]
+    assert _skus(client, type="regular") == ["D"]
+    assert _skus(client, expires_before=str(today + timedelta(days=2))) == ["A", "E"]
+    assert _skus(client, name_prefix="La", type="perishable", max_price=1.5) == [
+        "B",
+        "A",
+        "C",
+    ]
+    # le prix modifié par le setter est vu par la recherche
+    client.app.state.inventory.get("D").price = 0.5  # type: ignore[attr-defined]
+    assert _skus(client, max_price=1.0) == ["D", "B"]
+
+    # "search" n'est pas pris pour un SKU (route déclarée avant /{sku})
+    assert client.get("/products/search", params={"type": "frozen"}).status_code == 422
+    assert client.get("/products/search", params={"min_price": -1}).status_code == 422
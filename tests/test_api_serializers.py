@@ -0,0 +1,97 @@
+"""
+Tests de la sérialisation rapide des listes (serializers.encode_products).
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from freshcart.api import serializers
+from freshcart.api.main import create_app
+from freshcart.api.schemas import ProductOut
+from freshcart.domain.products import PerishableProduct, Product
+
+
+@dataclass(order=True, slots=True)
+class _Promo(PerishableProduct):
+    """Sous-classe inconnue des encodeurs : hérite de celui du parent."""
+
+
+def _catalogue() -> list[Product]:
+    today = date.today()
+    return [
+        Product("R1", "Café", 8.0),
+        PerishableProduct("P1", "Lait", 4.0, expiry_date=today + timedelta(days=2)),
+        PerishableProduct("P2", "Yaourt", 3.0, expiry_date=today - timedelta(days=1)),
+        _Promo("P3", "Crème", 5.0, expiry_date=today + timedelta(days=9)),
+        Product("R2", "Thé", 5.5),
+    ]
+
+
+def test_encode_products_matches_product_out(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(serializers, "BATCH_SIZE", 2)  # plusieurs lots
+    items = _catalogue()
+
+    expected = [
+        ProductOut(
+            sku=p.sku,
+            name=p.name,
+            type="perishable" if isinstance(p, PerishableProduct) else "regular",
+            price=p.price,
+            final_price=p.final_price(),
+            expiry_date=getattr(p, "expiry_date", None),
+        ).model_dump(mode="json")
+        for p in items
+    ]
+    assert json.loads(serializers.encode_products(items)) == expected
+    assert serializers.encode_products([]) == b"[]"
+
+
+def test_list_endpoints_keep_product_out_schema() -> None:
+    client = TestClient(create_app())
+    schema = client.get("/openapi.json").json()
+    ok = schema["paths"]["/products"]["get"]["responses"]["200"]
+    items = ok["content"]["application/json"]["schema"]["items"]
+    assert items == {"$ref": "#/components/schemas/ProductOut"}
+
+    client.post("/products", json={"sku": "A", "name": "Café", "initial_price": 8.0})
+    r = client.get("/products")
+    assert r.headers["content-type"] == "application/json"
+    assert r.json() == [
+        {
+            "sku": "A",
+            "name": "Café",
+            "type": "regular",
+            "price": 8.0,
+            "final_price": 8.0,
+            "expiry_date": None,
+        }
+    ]
+
+
+def test_ndjson_streaming_mode(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(serializers, "BATCH_SIZE", 2)  # plusieurs lots
+    app = create_app()
+    app.state.inventory.add_many(_catalogue())
+    client = TestClient(app)
+    ndjson = {"accept": "application/x-ndjson"}
+
+    for path in ("/products", "/products/expired", "/products/expiring?days=5"):
+        r = client.get(path, headers=ndjson)
+        assert r.headers["content-type"] == "application/x-ndjson"
+        assert "etag" not in r.headers  # flux : hors du cache HTTP
+        lines = r.text.splitlines()
+        assert [json.loads(line) for line in lines] == client.get(path).json()
+
+    page = client.get("/products", params={"limit": 2}, headers=ndjson)
+    assert len(page.text.splitlines()) == 2
+    assert page.headers["x-next-cursor"]
+
+    assert serializers.wants_ndjson("text/html, application/jsonl;q=0.9")
+    assert not serializers.wants_ndjson("application/json, */*")
+    assert list(serializers.iter_ndjson([], date.today())) == []
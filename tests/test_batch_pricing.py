@@ -0,0 +1,85 @@
+# But : price_many / Inventory.price_all donnent les mêmes prix que
+# final_price(), par paquets, en séquentiel comme dans un pool de processus.
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+
+import pytest
+from conftest import TODAY, Catalogue
+
+from freshcart.domain.batch import price_many
+from freshcart.domain.inventory import Inventory
+from freshcart.domain.pricing import DEFAULT_RULES, PricingPlan, compile_rules
+from freshcart.domain.products import PerishableProduct
+
+pytestmark = pytest.mark.usefixtures("fake_clock")
+
+
+def test_matches_final_price_and_inventory_total(mixed_catalogue: Catalogue) -> None:
+    products = mixed_catalogue(50)
+    inv = Inventory()
+    inv.add_many(products)
+
+    batch = inv.price_all()
+    assert batch.skus == [p.sku for p in products]
+    assert list(batch.prices) == [p.final_price() for p in products]
+    assert batch.total_value == inv.total_value()
+    assert batch.expired == sum(
+        isinstance(p, PerishableProduct) and p.is_expired for p in products
+    )
+    assert batch.discounted == sum(
+        isinstance(p, PerishableProduct)
+        and not p.is_expired
+        and p.final_price() != p.price
+        for p in products
+    )
+    assert batch.as_dict()["R0"] == 2.5
+
+
+def test_chunks_and_executors_give_the_same_batch(mixed_catalogue: Catalogue) -> None:
+    products = mixed_catalogue(41)
+    expected = price_many(products)
+    assert price_many(products, chunk_size=1) == expected
+    assert price_many(products, chunk_size=7) == expected
+    with ThreadPoolExecutor(2) as pool:
+        assert price_many(products, pool, chunk_size=5) == expected
+    with ProcessPoolExecutor(2) as pool:  # colonnes et tâche picklables
+        assert price_many(products, pool, chunk_size=5) == expected
+
+
+def test_day_and_edge_cases(mixed_catalogue: Catalogue) -> None:
+    products = mixed_catalogue(20)
+    later = TODAY + timedelta(days=10)
+    batch = price_many(products, day=later)
+    assert list(batch.prices) == [p.price_at(later) for p in products]
+    assert batch.discounted == 0
+
+    empty = price_many([])
+    assert (len(empty.prices), empty.total_value) == (0, 0.0)
+    with pytest.raises(ValueError):
+        price_many(products, chunk_size=0)
+
+
+def test_pricing_plan_is_honoured(mixed_catalogue: Catalogue) -> None:
+    products = mixed_catalogue(30)
+    inv = Inventory()
+    inv.add_many(products)
+    # plan des règles intégrées : même chemin par paquets, mêmes résultats
+    assert PricingPlan(DEFAULT_RULES).is_default
+    assert inv.price_all(plan=PricingPlan(DEFAULT_RULES)) == inv.price_all()
+
+    plan = compile_rules(
+        [
+            {"type": "perishable", "max_days": -1, "factor": 0},
+            {"sku_prefix": "R", "factor": 0.8},
+        ]
+    )
+    assert not plan.is_default
+    batch = inv.price_all(plan=plan, day=TODAY)
+    expected = plan.price_all(products, TODAY)
+    assert list(batch.prices) == expected
+    assert batch.total_value == plan.total_value(products, TODAY)
+    assert batch.expired == price_many(products).expired
+    assert batch.discounted == 0  # périssables non périmés au plein tarif
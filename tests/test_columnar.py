@@ -0,0 +1,107 @@
+# But : parité entre ColumnarInventory (NumPy) et le modèle objet Inventory.
+
+import random
+from datetime import date, timedelta
+from typing import List, Tuple
+
+import pytest
+from conftest import ProductKey
+
+np = pytest.importorskip("numpy")
+
+from freshcart.domain.columnar import ColumnarInventory  # noqa: E402
+from freshcart.domain.inventory import (  # noqa: E402
+    DuplicateSkuError,
+    Inventory,
+    ProductNotFoundError,
+)
+from freshcart.domain.products import PerishableProduct, Product  # noqa: E402
+
+
+def _catalogue(n: int, seed: int = 42) -> List[Product]:
+    rng = random.Random(seed)
+    today = date.today()
+    items: List[Product] = []
+    for i in range(n):
+        price = round(rng.uniform(0, 50), 2)
+        if rng.random() < 0.6:
+            expiry = today + timedelta(days=rng.randint(-10, 10))
+            items.append(
+                PerishableProduct(f"P{i}", f"Item {i}", price, expiry_date=expiry)
+            )
+        else:
+            items.append(Product(f"R{i}", f"Item {i}", price))
+    return items
+
+
+def _both(items: List[Product]) -> Tuple[Inventory, ColumnarInventory]:
+    inv, col = Inventory(), ColumnarInventory(capacity=4)
+    for p in items:
+        inv.upsert(p)
+        col.add(p)
+    return inv, col
+
+
+def test_parity_with_object_model(product_key: ProductKey) -> None:
+    inv, col = _both(_catalogue(500))
+
+    assert len(col) == len(inv)
+    assert [product_key(p) for p in col.all()] == [product_key(p) for p in inv.all()]
+    assert [product_key(p) for p in col.expired()] == [
+        product_key(p) for p in inv.expired()
+    ]
+    assert col.total_value() == inv.total_value()
+    assert col.total_value() == round(sum(p.final_price() for p in inv.all()), 2)
+
+
+def test_parity_after_removals_and_compaction(product_key: ProductKey) -> None:
+    items = _catalogue(200, seed=7)
+    inv, col = _both(items)
+
+    for p in items[::3] + items[1::3]:  # retire 2/3 -> déclenche le compactage
+        inv.remove(p.sku)
+        col.remove(p.sku)
+
+    assert [product_key(p) for p in col.all()] == [product_key(p) for p in inv.all()]
+    assert [product_key(p) for p in col.expired()] == [
+        product_key(p) for p in inv.expired()
+    ]
+    assert col.total_value() == inv.total_value()
+
+    # les lignes restent adressables après compactage
+    last = items[2::3][-1]
+    assert last.sku in col
+    assert product_key(col.get(last.sku)) == product_key(last)
+
+
+def test_from_columns_matches_add(product_key: ProductKey) -> None:
+    items = _catalogue(300, seed=3)
+    _, col = _both(items)
+    bulk = ColumnarInventory.from_columns(
+        [p.sku for p in items],
+        [p.name for p in items],
+        [p.price for p in items],
+        [getattr(p, "expiry_date", None) for p in items],
+    )
+
+    assert [product_key(p) for p in bulk.all()] == [product_key(p) for p in col.all()]
+    assert bulk.total_value() == col.total_value()
+    np.testing.assert_array_equal(bulk.final_prices(), col.final_prices())
+
+
+def test_errors_match_object_model() -> None:
+    col = ColumnarInventory()
+    col.add(Product("A", "Café", 8.0))
+
+    with pytest.raises(DuplicateSkuError):
+        col.add(Product("A", "Café", 8.0))
+    with pytest.raises(ProductNotFoundError):
+        col.remove("B")
+    with pytest.raises(ProductNotFoundError):
+        col.get("B")
+    with pytest.raises(DuplicateSkuError):
+        ColumnarInventory.from_columns(["A", "A"], ["x", "y"], [1.0, 2.0])
+    with pytest.raises(ValueError):
+        ColumnarInventory.from_columns(["A"], ["x"], [-1.0])
+    with pytest.raises(ValueError):
+        ColumnarInventory.from_columns(["A"], ["x", "y"], [1.0])
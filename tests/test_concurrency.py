@@ -0,0 +1,121 @@
+"""
+Tests de concurrence : Inventory partagé entre threads, et requêtes
+simultanées sur l'API (endpoints synchrones, exécutés dans le threadpool).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import httpx
+from fastapi.testclient import TestClient
+
+from freshcart.api.main import create_app
+from freshcart.domain.inventory import DuplicateSkuError, Inventory
+from freshcart.domain.locks import RWLock
+from freshcart.domain.products import PerishableProduct, Product
+
+
+def test_rwlock_is_reentrant_for_writer_and_excludes_readers() -> None:
+    lock = RWLock()
+    with lock.write():
+        with lock.write():
+            with lock.read():  # le rédacteur peut relire sans se bloquer
+                pass
+
+    writer_done = threading.Event()
+    reader_done = threading.Event()
+
+    def writer() -> None:
+        with lock.write():
+            writer_done.set()
+
+    def reader() -> None:
+        with lock.read():
+            reader_done.set()
+
+    with lock.read():
+        threading.Thread(target=writer).start()
+        assert not writer_done.wait(0.05)  # attend la fin des lectures
+        # un rédacteur en attente bloque les nouveaux lecteurs (pas de famine)
+        threading.Thread(target=reader).start()
+        assert not reader_done.wait(0.05)
+    assert writer_done.wait(1)
+    assert reader_done.wait(1)
+
+
+def test_threads_never_insert_duplicate_skus() -> None:
+    inv = Inventory(check_totals=True)
+    today = date.today()
+    rejected = Counter[str]()
+    lock = threading.Lock()
+
+    def worker(seed: int) -> None:
+        for i in range(200):
+            sku = f"S{(seed * 7 + i) % 150}"
+            p: Product
+            if i % 2:
+                p = PerishableProduct(
+                    sku, "x", 2.0, expiry_date=today + timedelta(i % 6)
+                )
+            else:
+                p = Product(sku, "x", 1.0)
+            try:
+                inv.add(p)
+            except DuplicateSkuError:
+                with lock:
+                    rejected[sku] += 1
+            inv.expired()
+            inv.total_value()  # vérifie aussi le total incrémental
+            if i % 10 == 0:
+                inv.page("price", limit=5)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(worker, range(8)))
+
+    skus = [p.sku for p in inv.all()]
+    assert len(skus) == len(set(skus)) == 150
+    assert sum(rejected.values()) == 8 * 200 - 150
+    assert inv.total_value() == round(sum(p.final_price() for p in inv.all()), 2)
+
+
+def test_concurrent_creates_over_http() -> None:
+    app = create_app({"metrics": False})
+
+    async def run() -> Counter[int]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            calls = [
+                c.post(
+                    "/products",
+                    json={"sku": f"C{i % 10}", "name": "x", "initial_price": 1.0},
+                )
+                for i in range(200)
+            ]
+            responses = await asyncio.gather(*calls)
+        return Counter(r.status_code for r in responses)
+
+    statuses = asyncio.run(run())
+    assert statuses == {201: 10, 400: 190}
+    assert len(app.state.inventory) == 10
+
+
+def test_sync_endpoints_run_off_the_event_loop() -> None:
+    app = create_app()
+    inv = app.state.inventory
+    threads: list[int] = []
+    total_value = inv.total_value
+
+    def recording_total() -> float:
+        threads.append(threading.get_ident())
+        return total_value()
+
+    inv.total_value = recording_total
+    with TestClient(app) as client:
+        loop_thread = client.portal.call(threading.get_ident)  # type: ignore[union-attr]
+        assert client.get("/inventory/value").json() == {"total_value": 0.0}
+    assert threads and threads[-1] != loop_thread
@@ -0,0 +1,111 @@
+# But : garder un démarrage court. Les imports du domaine ne chargent ni
+# FastAPI ni Pydantic, et restent sous un budget mesuré par -X importtime ;
+# create_app() n'importe que les routers utiles et reste sous un budget.
+# (budgets larges : on vise les régressions grossières, pas le bruit de CI)
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+import freshcart
+import freshcart.api
+
+SRC = str(Path(freshcart.__file__).resolve().parents[1])
+
+# cumul des imports freshcart.* d'un job "domaine seul", en secondes
+DOMAIN_IMPORT_BUDGET = 0.15
+# import de l'API + construction de l'application, en secondes
+CREATE_APP_BUDGET = 3.0
+# modules qu'un job "domaine seul" ne doit jamais charger
+HEAVY_MODULES = ("fastapi", "starlette", "pydantic", "numpy", "sqlite3", "logging")
+
+
+def _python(*args: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        [sys.executable, *args],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={"PYTHONPATH": SRC},
+    )
+
+
+def _importtime(statement: str) -> Dict[str, float]:
+    """Temps cumulé (s) des imports de premier niveau, via -X importtime."""
+    stderr = _python("-X", "importtime", "-c", statement).stderr
+    cumulative: Dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = line.split("|")
+        if total.strip().isdigit() and not name.startswith("  "):
+            cumulative[name.strip()] = int(total) / 1e6
+    return cumulative
+
+
+def _modules(statement: str) -> List[str]:
+    code = f"{statement}; import sys, json; print(json.dumps(sorted(sys.modules)))"
+    return json.loads(_python("-c", code).stdout)
+
+
+def test_domain_import_stays_light() -> None:
+    statement = "import freshcart.domain.inventory, freshcart.domain.pricing"
+    times = _importtime(statement)
+    own = sum(t for name, t in times.items() if name.startswith("freshcart"))
+    assert 0 < own < DOMAIN_IMPORT_BUDGET, times
+
+    loaded = _modules(statement)
+    for heavy in HEAVY_MODULES:
+        assert heavy not in loaded, heavy
+
+
+def test_package_roots_are_lazy() -> None:
+    loaded = _modules("import freshcart, freshcart.api")
+    assert not [
+        m for m in loaded if m.startswith("freshcart.") and m != "freshcart.api"
+    ]
+    assert "fastapi" not in loaded
+    # produits seuls : l'inventaire n'est pas importé
+    loaded = _modules("from freshcart import Product")
+    assert "freshcart.domain.products" in loaded
+    assert "freshcart.domain.inventory" not in loaded
+
+
+def test_create_app_budget_and_deferred_routers() -> None:
+    code = (
+        "import time, sys, json\n"
+        "start = time.perf_counter()\n"
+        "from freshcart.api import create_app\n"
+        "create_app({'metrics': False})\n"
+        "elapsed = time.perf_counter() - start\n"
+        "print(json.dumps([elapsed, sorted(sys.modules)]))\n"
+    )
+    elapsed, loaded = json.loads(_python("-c", code).stdout)
+    assert elapsed < CREATE_APP_BUDGET
+    for unused in (
+        "freshcart.api.routers.stores",
+        "freshcart.api.routers.metrics",
+        "freshcart.domain.sharding",
+        "freshcart.storage.sqlite",
+    ):
+        assert unused not in loaded, unused
+
+
+def test_lazy_attributes() -> None:
+    from freshcart.api.main import create_app
+    from freshcart.domain.inventory import Inventory
+
+    assert freshcart.Inventory is Inventory
+    assert freshcart.api.create_app is create_app
+    assert "Inventory" in dir(freshcart)
+    for package in (freshcart, freshcart.api):
+        try:
+            getattr(package, "Nope")
+        except AttributeError:
+            pass
+        else:  # pragma: no cover
+            raise AssertionError("AttributeError attendue")
@@ -0,0 +1,77 @@
+# But : vérifier l'instrumentation du domaine (collecteurs, export Prometheus).
+
+import logging
+from typing import Iterator
+
+import pytest
+
+from freshcart.domain.instrumentation import (
+    LoggingSink,
+    MetricsRegistry,
+    get_sink,
+    set_sink,
+    sink_scope,
+)
+from freshcart.domain.inventory import Inventory
+from freshcart.domain.products import Product
+
+
+@pytest.fixture(autouse=True)
+def _restore_sink() -> Iterator[None]:
+    previous = get_sink()
+    yield
+    set_sink(previous)
+
+
+def test_disabled_by_default_and_keeps_metadata() -> None:
+    set_sink(None)
+    inv = Inventory()
+    inv.add(Product("A", "Café", 8.0))  # aucun collecteur : simple appel
+
+    assert Inventory.add.__name__ == "add"
+    assert Inventory.add.__wrapped__.__name__ == "add"  # type: ignore[attr-defined]
+
+
+def test_registry_counts_and_renders_prometheus() -> None:
+    registry = MetricsRegistry(buckets=(0.5, 1.0))
+    set_sink(registry)
+
+    inv = Inventory()
+    inv.add(Product("A", "Café", 8.0))
+    inv.add(Product("B", "Thé", 5.0))
+    inv.total_value()
+    inv.remove("A")
+
+    assert registry.count("add") == 2
+    assert registry.count("total_value") == 1
+    assert registry.count("expired") == 0
+
+    registry.record("slow", 2.0)
+    text = registry.render_prometheus()
+    assert "# TYPE freshcart_domain_call_seconds histogram" in text
+    assert 'freshcart_domain_call_seconds_count{method="add"} 2' in text
+    assert 'freshcart_domain_call_seconds_bucket{method="add",le="+Inf"} 2' in text
+    assert 'freshcart_domain_call_seconds_bucket{method="slow",le="1.0"} 0' in text
+    assert 'freshcart_domain_call_seconds_sum{method="slow"} 2.0' in text
+
+
+def test_logging_sink(caplog: pytest.LogCaptureFixture) -> None:
+    set_sink(LoggingSink())
+    with caplog.at_level(logging.DEBUG, logger="freshcart.domain"):
+        Inventory().expired()
+
+    assert "expired took" in caplog.text
+
+
+def test_scoped_sink_overrides_the_global_one() -> None:
+    global_registry, scoped = MetricsRegistry(), MetricsRegistry()
+    set_sink(global_registry)
+    inv = Inventory()
+    with sink_scope(scoped):
+        inv.total_value()
+        with sink_scope(None):  # contexte sans mesure
+            inv.total_value()
+    inv.total_value()
+
+    assert scoped.count("total_value") == 1
+    assert global_registry.count("total_value") == 1
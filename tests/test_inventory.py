@@ -1,10 +1,19 @@
 # But : vérifier Inventory (ajout, retrait, listing, périmés, total).
 
+import threading
 from datetime import date, timedelta
 
 import pytest
+from conftest import FakeClock
 
-from freshcart.domain.inventory import Inventory, ProductNotFoundError
+from freshcart.domain import inventory as inventory_module
+from freshcart.domain.clock import pricing_date
+from freshcart.domain.inventory import (
+    Change,
+    DuplicateSkuError,
+    Inventory,
+    ProductNotFoundError,
+)
 from freshcart.domain.products import PerishableProduct, Product
 
 
@@ -62,3 +71,388 @@ def test_expired_and_total_value() -> None:
     assert normal not in expired_list
 
     assert inv.total_value() == 6.0
+
+
+def test_get_contains_and_duplicates() -> None:
+    inv = Inventory()
+    p = Product("S3", "Riz", 3.0)
+    inv.add(p)
+
+    assert "S3" in inv
+    assert "NOPE" not in inv
+    assert inv.get("S3") is p
+    assert len(inv) == 1
+
+    with pytest.raises(DuplicateSkuError):
+        inv.add(Product("S3", "Autre riz", 4.0))
+
+    with pytest.raises(ProductNotFoundError):
+        inv.get("NOPE")
+
+
+def test_upsert_replaces_and_keeps_order() -> None:
+    inv = Inventory()
+    inv.add(Product("A", "Café", 8.0))
+    inv.add(Product("B", "Thé", 5.0))
+
+    assert inv.upsert(Product("C", "Sucre", 2.0)) is None
+
+    new_a = Product("A", "Café bio", 9.0)
+    old_a = inv.upsert(new_a)
+    assert old_a is not None and old_a.name == "Café"
+    assert inv.get("A") is new_a
+    assert [p.sku for p in inv.all()] == ["A", "B", "C"]
+
+
+def test_expiry_index_range_queries() -> None:
+    inv = Inventory()
+    today = date.today()
+
+    def perishable(sku: str, days: int) -> PerishableProduct:
+        return PerishableProduct(
+            sku, sku, 4.0, expiry_date=today + timedelta(days=days)
+        )
+
+    for sku, days in [("D-2", -2), ("D0", 0), ("D3", 3), ("D4", 4), ("D-1", -1)]:
+        inv.add(perishable(sku, days))
+    inv.add(Product("N1", "Sucre", 2.0))
+
+    # triés par date d'expiration
+    assert [p.sku for p in inv.expired()] == ["D-2", "D-1"]
+    assert [p.sku for p in inv.discounted()] == ["D0", "D3"]
+    assert [p.sku for p in inv.expiring_within(10)] == ["D0", "D3", "D4"]
+
+    inv.remove("D-2")
+    inv.upsert(perishable("D-1", 5))  # remplace : sort de la liste des périmés
+    assert inv.expired() == []
+    assert [p.sku for p in inv.expiring_within(10)] == ["D0", "D3", "D4", "D-1"]
+
+
+def test_total_value_is_incremental_and_rolls_over_dates(fake_clock: FakeClock) -> None:
+    start = fake_clock.day
+
+    inv = Inventory(check_totals=True)
+    inv.add(Product("N1", "Sucre", 2.0))
+    for sku, days in [("P5", 5), ("P1", 1), ("PM1", -1), ("P30", 30)]:
+        inv.add(
+            PerishableProduct(sku, sku, 4.0, expiry_date=start + timedelta(days=days))
+        )
+    # 2 + 4 (P5) + 2 (P1 -50%) + 0 (PM1) + 4 (P30)
+    assert inv.total_value() == 12.0
+
+    # changement de prix via le setter -> total corrigé sans recalcul
+    inv.get("P1").price = 10.0
+    assert inv.total_value() == 15.0
+
+    # +2 jours : P5 entre dans la fenêtre de remise, P1 expire
+    fake_clock.day = start + timedelta(days=2)
+    assert inv.total_value() == 2.0 + 2.0 + 0.0 + 0.0 + 4.0
+
+    # retour en arrière (horloge corrigée) : on retrouve la valeur initiale
+    fake_clock.day = start
+    assert inv.total_value() == 15.0
+
+    inv.remove("P30")
+    removed = PerishableProduct("X", "X", 1.0, expiry_date=start)
+    inv.add(removed)
+    inv.remove("X")
+    removed.price = 100.0  # plus suivi par l'inventaire
+    assert inv.total_value() == 11.0
+
+
+def test_pricing_date_pins_the_day_for_a_whole_block(fake_clock: FakeClock) -> None:
+    start = fake_clock.day
+    inv = Inventory()
+    inv.add(PerishableProduct("P", "Lait", 4.0, expiry_date=start))
+
+    with pricing_date() as day:
+        fake_clock.day = start + timedelta(days=1)  # minuit passe pendant le bloc
+        assert day == start
+        assert inv.expired() == [] and inv.total_value() == 2.0
+    assert [p.sku for p in inv.expired()] == ["P"] and inv.total_value() == 0.0
+
+
+def test_check_totals_detects_drift() -> None:
+    inv = Inventory(check_totals=True)
+    inv.add(Product("N1", "Sucre", 2.0))
+    inv._value_cents += 1  # corruption volontaire
+
+    with pytest.raises(AssertionError):
+        inv.total_value()
+
+
+def test_add_many_is_atomic_and_keeps_indexes() -> None:
+    inv = Inventory(check_totals=True)
+    today = date.today()
+    inv.add(PerishableProduct("E0", "Lait", 4.0, expiry_date=today - timedelta(1)))
+
+    inv.add_many(
+        [
+            Product("N1", "Sucre", 2.0),
+            PerishableProduct("E2", "Yaourt", 3.0, expiry_date=today - timedelta(2)),
+            PerishableProduct("F1", "Fromage", 6.0, expiry_date=today + timedelta(9)),
+        ]
+    )
+    assert [p.sku for p in inv.all()] == ["E0", "N1", "E2", "F1"]
+    assert [p.sku for p in inv.expired()] == ["E2", "E0"]
+    assert inv.total_value() == 8.0
+
+    # doublon (avec l'existant ou dans le lot) : rien n'est ajouté
+    with pytest.raises(DuplicateSkuError):
+        inv.add_many([Product("X1", "Riz", 1.0), Product("N1", "Sucre", 2.0)])
+    with pytest.raises(DuplicateSkuError):
+        inv.add_many([Product("X1", "Riz", 1.0), Product("X1", "Riz", 1.0)])
+    assert "X1" not in inv
+    assert inv.total_value() == 8.0
+
+
+def test_sorted_pages_are_cached_until_mutation() -> None:
+    inv = Inventory()
+    today = date.today()
+    inv.add(Product("C", "Café", 8.0))
+    inv.add(Product("A", "Sucre", 2.0))
+    inv.add(PerishableProduct("B", "Lait", 4.0, expiry_date=today))
+    inv.add(Product("D", "Thé", 2.0))
+
+    assert [p.sku for p in inv.sorted_by("price")] == ["A", "D", "B", "C"]
+    assert [p.sku for p in inv.sorted_by("expiry")] == ["B", "A", "C", "D"]
+
+    items, key = inv.page("sku", limit=3)
+    assert [p.sku for p in items] == ["A", "B", "C"]
+    assert key == ("C",)
+    items, key = inv.page("sku", limit=3, after=key)
+    assert [p.sku for p in items] == ["D"]
+    assert key is None
+
+    # même version -> même liste (pas de nouveau tri)
+    version = inv.version
+    cached = inv._sort_cache["price"]
+    inv.sorted_by("price")
+    assert inv._sort_cache["price"] is cached
+
+    # un changement de prix invalide le cache
+    inv.get("C").price = 1.0
+    assert inv.version > version
+    assert [p.sku for p in inv.sorted_by("price")] == ["C", "A", "D", "B"]
+
+    with pytest.raises(ValueError):
+        inv.sorted_by("name")
+
+
+def test_changes_since_returns_deltas_then_asks_for_resync() -> None:
+    inv = Inventory(change_log_size=4)
+    inv.add_many([Product("A", "Riz", 1.0), Product("B", "Thé", 2.0)])  # v1
+    inv.get("A").price = 3.0  # v2
+    inv.remove("B")  # v3
+
+    assert inv.changes_since(0) == (
+        3,
+        [
+            Change(1, "add", "A"),
+            Change(1, "add", "B"),
+            Change(2, "price", "A"),
+            Change(3, "remove", "B"),
+        ],
+    )
+    assert inv.changes_since(2) == (3, [Change(3, "remove", "B")])
+    assert inv.changes_since(3) == (3, [])
+    assert inv.changes_since(99) == (3, None)  # version inconnue
+
+    inv.add(Product("C", "Sel", 1.0))  # v4 : évince une entrée de v1
+    assert inv.changes_since(0) == (4, None)
+    assert inv.changes_since(1) == (4, inv.changes_since(1)[1])
+    assert [c.sku for c in inv.changes_since(1)[1] or []] == ["A", "B", "C"]
+
+    with pytest.raises(ValueError):
+        Inventory(change_log_size=0)
+
+
+def test_iterators_match_lists_and_tolerate_writers(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(inventory_module, "ITER_CHUNK", 3)  # plusieurs paquets
+    today = date.today()
+    inv = Inventory()
+    inv.add_many(
+        [
+            PerishableProduct(
+                f"P{i}", "Lait", 7.0 + i, expiry_date=today + timedelta(i)
+            )
+            for i in range(-6, 6)
+        ]
+        + [Product(f"R{i}", "Riz", 2.0) for i in range(4)]
+    )
+    assert list(inv.iter_all()) == inv.all()
+    assert list(inv.iter_sorted("expiry")) == inv.sorted_by("expiry")
+    assert list(inv.iter_expired()) == inv.expired()
+    assert list(inv.iter_expiring_within(2)) == inv.expiring_within(2)
+
+    # tri : instantané pris au début, insensible aux écritures suivantes
+    before = inv.sorted_by("price")
+    by_price = inv.iter_sorted("price")
+    first = next(by_price)
+    inv.remove("R0")
+    assert [first, *by_price] == before
+    assert "R0" not in [p.sku for p in inv.iter_sorted("price")]
+    # index d'expiration : reprise après la dernière clé servie
+    expired = inv.iter_expired()
+    seen = [next(expired) for _ in range(3)]  # un paquet complet
+    inv.remove("P-6")  # déjà servi
+    inv.remove("P-1")  # pas encore servi
+    rest = list(expired)
+    assert [p.sku for p in seen + rest] == ["P-6", "P-5", "P-4", "P-3", "P-2"]
+
+    # ordre d'ajout : SKU du début du parcours, les retirés sont sautés
+    before = [p.sku for p in inv.all()]
+    everything = inv.iter_all()
+    first = next(everything)
+    inv.add(Product("NEW", "Nouveau", 1.0))
+    inv.remove("R3")
+    assert [first.sku] + [p.sku for p in everything] == [
+        sku for sku in before if sku != "R3"
+    ]
+
+
+def test_search_uses_indexes_consistent_with_price_changes() -> None:
+    today = date.today()
+    names = ["Lait", "Lait demi", "Laitue", "Lard", "Pain", "Pâte", "Riz"]
+    products = [
+        (
+            PerishableProduct(
+                f"P{i}", names[i % 7], 1.0 + i % 9, expiry_date=today + timedelta(i % 5)
+            )
+            if i % 3
+            else Product(f"R{i}", names[i % 7], 1.0 + i % 9)
+        )
+        for i in range(60)
+    ]
+    inv = Inventory()
+    inv.add_many(products[:20])
+    assert inv._by_name is None  # index construits à la première recherche
+    assert len(inv.search()) == 20
+    inv.add_many(products[20:40])  # puis tenus à jour par les écritures
+    for p in products[40:]:
+        inv.add(p)
+
+    def brute(**criteria: object) -> list[str]:
+        out = []
+        for p in products:
+            if p.sku not in inv:
+                continue
+            perishable = isinstance(p, PerishableProduct)
+            if criteria.get("name_prefix") and not p.name.startswith(
+                str(criteria["name_prefix"])
+            ):
+                continue
+            if "min_price" in criteria and p.price < criteria["min_price"]:  # type: ignore
+                continue
+            if "max_price" in criteria and p.price > criteria["max_price"]:  # type: ignore
+                continue
+            kind = criteria.get("product_type")
+            if kind and perishable != (kind == "perishable"):
+                continue
+            before = criteria.get("expires_before")
+            if before and not (perishable and p.expiry_date < before):  # type: ignore
+                continue
+            out.append(p)
+        return [p.sku for p in sorted(out, key=lambda p: (p.price, p.sku))]
+
+    queries: list[dict[str, object]] = [
+        {},
+        {"name_prefix": "Lai"},
+        {"name_prefix": "Lait", "max_price": 4.0},
+        {"min_price": 3.0, "max_price": 5.0},
+        {"min_price": 3.0, "max_price": 3.0},
+        {"product_type": "regular", "min_price": 8.0},
+        {"product_type": "perishable", "name_prefix": "P"},
+        {"expires_before": today + timedelta(2)},
+        {"expires_before": today + timedelta(2), "product_type": "regular"},
+        {"name_prefix": "Zz"},
+    ]
+
+    def check() -> None:
+        for criteria in queries:
+            got = inv.search(**criteria)  # type: ignore[arg-type]
+            assert [p.sku for p in got] == brute(**criteria), criteria
+
+    check()
+    # l'index des prix suit le setter Product.price
+    for p in products[::4]:
+        p.price = p.price + 2.5
+    inv.remove("P1")
+    products[0] = Product("R0", "Riz basmati", 3.0)
+    inv.upsert(products[0])
+    check()
+    assert inv.sorted_by("price") == inv.search()
+    with pytest.raises(ValueError):
+        inv.search(product_type="frozen")
+
+
+def test_bulk_update_prices_is_atomic_and_reindexes_once() -> None:
+    today = date.today()
+    products = [
+        (
+            PerishableProduct(f"P{i}", "Lait", 2.0 + i, expiry_date=today)
+            if i % 2
+            else Product(f"R{i}", "Riz", 2.0 + i)
+        )
+        for i in range(10)
+    ]
+    inv = Inventory(check_totals=True)
+    inv.add_many(products)
+    inv.search()  # index des prix construit
+    version, total = inv.version, inv.total_value()
+
+    # validation du lot entier avant toute modification
+    with pytest.raises(ProductNotFoundError):
+        inv.bulk_update_prices({"R0": 1.0, "NOPE": 2.0})
+    with pytest.raises(ValueError):
+        inv.bulk_update_prices({"R0": 1.0, "R2": -1.0})
+    with pytest.raises(ValueError):
+        inv.bulk_update_prices({"R0": float("nan")})
+    with pytest.raises(ValueError):
+        inv.bulk_update_prices({"R0": 1.0, "R2": float("inf"), "R4": 3.0})
+    assert (inv.version, inv.total_value(), products[0].price) == (version, total, 2.0)
+
+    assert inv.bulk_update_prices({"R0": 9.999, "P1": 0.5, "R4": 1.0}) == 3
+    assert [products[i].price for i in (0, 1, 4)] == [10.0, 0.5, 1.0]
+    assert inv.total_value() == round(sum(p.final_price() for p in products), 2)
+    assert inv._by_price == sorted((p.price, p.sku) for p in products)
+    assert inv.search(max_price=1.0) == [products[1], products[4]]
+    assert [c.op for c in inv.changes_since(version)[1] or []] == ["price"] * 3
+    assert inv.sorted_by("price") == sorted(products, key=lambda p: (p.price, p.sku))
+    assert inv.bulk_update_prices({}) == 0
+
+
+def test_products_point_to_their_inventory_and_price_writes_take_its_lock() -> None:
+    inv = Inventory(check_totals=True)
+    products = [Product(f"R{i}", "Riz", 1.0) for i in range(3)]
+    inv.add_many(products[:2])
+    inv.add(products[2])
+    # une référence partagée, pas un callback (méthode liée + tuple) par produit
+    assert all(p._owner is inv for p in products)
+
+    p = products[0]
+    with inv._lock.write():
+        writer = threading.Thread(target=setattr, args=(p, "price", 5.0))
+        writer.start()
+        writer.join(0.05)
+        assert p.price == 1.0  # le setter attend le verrou de l'inventaire
+        inv.remove("R0")  # ni l'index ni le total ne voient le nouveau prix
+    writer.join()
+    assert (p.price, p._owner) == (5.0, None)
+    assert inv.total_value() == 2.0
+    assert [c.op for c in inv.changes_since(0)[1] or []] == ["add"] * 3 + ["remove"]
+
+
+def test_product_shared_by_two_inventories() -> None:
+    first, second = Inventory(check_totals=True), Inventory(check_totals=True)
+    p = Product("R0", "Riz", 1.0)
+    first.add(p)
+    second.add(p)
+    p.price = 3.0
+    assert first.total_value() == second.total_value() == 3.0
+    first.remove("R0")
+    assert p._owner is second
+    p.price = 4.0
+    assert (first.total_value(), second.total_value()) == (0.0, 4.0)
@@ -0,0 +1,95 @@
+# But : freshcart.loadtest génère/rejoue des mélanges de requêtes contre
+# create_app() (transport ASGI) et rapporte latences et débit par route.
+
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from freshcart import loadtest
+from freshcart.loadtest import RequestSpec, generate, percentile, summarize
+
+
+def test_generate_is_reproducible_and_follows_the_mix() -> None:
+    specs = generate(400, seed=7)
+    assert specs == generate(400, seed=7)
+    assert specs != generate(400, seed=8)
+    routes = {spec.route for spec in specs}
+    assert routes == {
+        "POST /products",
+        "GET /products",
+        "GET /products/expired",
+        "GET /inventory/value",
+    }
+    creates = [spec.json["sku"] for spec in specs if spec.json]
+    assert len(set(creates)) == len(creates)  # SKU uniques
+
+    only_value = generate(10, {"value": 1.0, "create": 0.0})
+    assert {spec.route for spec in only_value} == {"GET /inventory/value"}
+    with pytest.raises(ValueError):
+        generate(10, {"delete": 1.0})
+    with pytest.raises(ValueError):
+        generate(10, {"list": 0.0})
+    assert loadtest.parse_mix("create=0.5, list=1") == {"create": 0.5, "list": 1.0}
+
+
+def test_log_round_trip(tmp_path: Path) -> None:
+    path = str(tmp_path / "mix.jsonl")
+    specs = generate(50, seed=1)
+    loadtest.save_log(specs, path)
+    with open(path, "a") as f:
+        f.write('\n{"method": "get", "path": "/health"}\n')
+    replayed = loadtest.load_log(path)
+    assert replayed[:-1] == specs
+    assert replayed[-1] == RequestSpec("GET", "/health")
+
+
+def test_percentiles_and_summary() -> None:
+    values = [i / 1000 for i in range(1, 101)]  # 1..100 ms
+    assert percentile(values, 50) == 0.05
+    assert percentile(values, 99) == 0.099
+    assert percentile([], 50) == 0.0
+
+    report = summarize([("GET /a", 0.001, 200), ("GET /a", 0.003, 404)], 2.0)
+    assert report["routes"]["GET /a"] == {
+        "requests": 2,
+        "errors": 1,
+        "p50_ms": 1.0,
+        "p95_ms": 3.0,
+        "p99_ms": 3.0,
+        "throughput_rps": 1.0,
+    }
+    assert report["total"]["requests"] == 2
+
+
+def test_in_process_run_reports_every_route() -> None:
+    specs = generate(120, seed=3)
+    # rejouer deux fois la même création : la seconde échoue (SKU existant)
+    specs.append(next(spec for spec in specs if spec.json))
+    report = asyncio.run(loadtest.load_test(specs, concurrency=4, preload_products=50))
+
+    assert report["target"] == "asgi" and report["concurrency"] == 4
+    assert report["total"]["requests"] == 121
+    assert report["total"]["errors"] == 1
+    assert report["routes"]["POST /products"]["errors"] == 1
+    for stats in report["routes"].values():
+        assert 0 < stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+        assert stats["throughput_rps"] > 0
+    with pytest.raises(ValueError):
+        asyncio.run(loadtest.load_test(specs, concurrency=0))
+
+
+def test_cli_records_then_replays(tmp_path: Path) -> None:
+    log, out = str(tmp_path / "mix.jsonl"), str(tmp_path / "report.json")
+    loadtest.main(["--requests", "30", "--record", log, "--output", out])
+    first = json.loads(Path(out).read_text())
+    loadtest.main(
+        ["--replay", log, "--concurrency", "2", "--settings", '{"metrics": false}']
+        + ["--output", out]
+    )
+    second = json.loads(Path(out).read_text())
+    assert first["total"]["requests"] == second["total"]["requests"] == 30
+    assert second["concurrency"] == 2
@@ -0,0 +1,115 @@
+# But : le moteur de remises compilé reproduit les règles intégrées et
+# applique les règles par catégorie, par palier et par tranche horaire.
+
+from datetime import date, timedelta
+from typing import List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from freshcart.api.main import create_app
+from freshcart.domain.inventory import Inventory
+from freshcart.domain.pricing import (
+    DEFAULT_RULES,
+    DiscountRule,
+    PricingPlan,
+    compile_rules,
+)
+from freshcart.domain.products import PerishableProduct, Product
+
+DAY = date(2030, 1, 10)
+
+
+def _catalogue() -> List[Product]:
+    items: List[Product] = [Product(f"R{i}", "Riz", 1.25 * i) for i in range(4)]
+    items += [
+        PerishableProduct(f"P{i}", "Lait", 3.35 + i, expiry_date=DAY + timedelta(i))
+        for i in range(-3, 9)
+    ]
+    return items
+
+
+def test_default_rules_match_builtin_price_factor() -> None:
+    items = _catalogue()
+    plan = PricingPlan(DEFAULT_RULES)
+    assert plan.price_all(items, DAY, hour=12) == [p.price_at(DAY) for p in items]
+
+    inv = Inventory()
+    inv.add_many(items)
+    prices = plan.price_inventory(inv, DAY, hour=12)
+    assert prices["P-1"] == 0.0 and prices["P2"] == 2.67 and prices["R3"] == 3.75
+    assert plan.total_value(items, DAY, hour=12) == pytest.approx(
+        sum(p.price_at(DAY) for p in items)
+    )
+
+
+def test_category_tiers_and_time_of_day() -> None:
+    plan = compile_rules(
+        [
+            {"name": "périmé", "type": "perishable", "max_days": -1, "factor": 0},
+            {
+                "name": "lait J",
+                "sku_prefix": "DAIRY-MILK",
+                "max_days": 0,
+                "factor": 0.2,
+            },
+            {"name": "laitier", "sku_prefix": "DAIRY-", "max_days": 5, "factor": 0.7},
+            {
+                "name": "palier",
+                "type": "perishable",
+                "min_days": 6,
+                "max_days": 9,
+                "factor": 0.9,
+            },
+            {"name": "soirée", "hours": [20, 2], "factor": 0.8},
+        ]
+    )
+    milk = PerishableProduct("DAIRY-MILK-1", "Lait", 10.0, expiry_date=DAY)
+    cheese = PerishableProduct("DAIRY-C1", "Brie", 10.0, expiry_date=DAY)
+    apple = PerishableProduct("FRUIT-1", "Pomme", 10.0, expiry_date=DAY)
+    later = PerishableProduct("FRUIT-2", "Pomme", 10.0, expiry_date=DAY + timedelta(7))
+    far = PerishableProduct("FRUIT-3", "Pomme", 10.0, expiry_date=DAY + timedelta(30))
+    rice = Product("RICE-1", "Riz", 10.0)
+    items = [milk, cheese, apple, later, far, rice]
+
+    assert plan.price_all(items, DAY, hour=12) == [2.0, 7.0, 10.0, 9.0, 10.0, 10.0]
+    # règle horaire : 20h -> 2h (passe minuit)
+    assert plan.price_all(items, DAY, hour=23) == [2.0, 7.0, 8.0, 9.0, 8.0, 8.0]
+    assert plan.price_all([rice], DAY, hour=1) == [8.0]
+    assert plan.price_all([rice], DAY, hour=2) == [10.0]
+    assert plan.price_all([milk], DAY + timedelta(1), hour=12) == [0.0]
+    assert plan.price_all([rice])[0] in (8.0, 10.0)  # heure courante
+
+
+def test_rules_are_validated() -> None:
+    with pytest.raises(ValueError):
+        compile_rules([{"factor": 0.5, "colour": "red"}])
+    with pytest.raises(ValueError):
+        DiscountRule("x", -1.0)
+    with pytest.raises(ValueError):
+        DiscountRule("x", 0.5, product_type="frozen")
+    with pytest.raises(ValueError):
+        DiscountRule("x", 0.5, sku_prefix="")
+    with pytest.raises(ValueError):
+        DiscountRule("x", 0.5, hours=(20, 25))
+    assert not DiscountRule("x", 0.5, hours=(8, 12)).active_at(None)
+
+
+def test_api_applies_configured_rules() -> None:
+    rules = [{"name": "laitier", "sku_prefix": "DAIRY-", "factor": 0.5}]
+    client = TestClient(create_app({"pricing_rules": rules}))
+    # une autre application du processus garde ses propres règles
+    plain = TestClient(create_app())
+    for app_client in (client, plain):
+        for sku in ("DAIRY-1", "RICE-1"):
+            app_client.post(
+                "/products", json={"sku": sku, "name": "x", "initial_price": 4}
+            )
+    assert client.get("/products/DAIRY-1").json()["final_price"] == 2.0
+    assert [p["final_price"] for p in client.get("/products").json()] == [2.0, 4.0]
+    assert client.get("/inventory/value").json() == {"total_value": 6.0}
+    assert plain.get("/products/DAIRY-1").json()["final_price"] == 4.0
+    assert [p["final_price"] for p in plain.get("/products").json()] == [4.0, 4.0]
+    assert plain.get("/inventory/value").json() == {"total_value": 8.0}
+    # clé du cache de réponses : le plan de l'application, pas un global
+    assert client.get("/inventory/value").json() == {"total_value": 6.0}
@@ -4,6 +4,7 @@ from datetime import date, timedelta
 
 import pytest
 
+from freshcart.domain.clock import pricing_date, set_clock
 from freshcart.domain.products import PerishableProduct, Product
 
 
@@ -16,6 +17,12 @@ def test_price_property_validation() -> None:
 
     with pytest.raises(ValueError):
         p.price = -1
+    for value in (float("inf"), float("nan")):
+        with pytest.raises(ValueError):
+            p.price = value
+        with pytest.raises(ValueError):
+            Product("SKU-2", "Café", value)
+    assert p.price == 10.25
 
 
 def test_str_and_ordering() -> None:
@@ -57,3 +64,57 @@ def test_perishable_is_expired_and_discount() -> None:
 def test_regular_product_final_price() -> None:
     p = Product("SKU-REG2", "Thé", 5.5)
     assert p.final_price() == 5.5
+
+
+def test_products_are_slotted_and_share_expiry_dates() -> None:
+    expiry = date.today() + timedelta(days=5)
+    p1 = PerishableProduct("P1", "Lait", 4.0, expiry_date=expiry)
+    p2 = PerishableProduct(
+        "P2", "Lait", 4.0, expiry_date=date.fromordinal(expiry.toordinal())
+    )
+
+    assert not hasattr(Product("R", "Riz", 1.0), "__dict__")
+    assert not hasattr(p1, "__dict__")
+    assert p1.expiry_date is p2.expiry_date
+    with pytest.raises(AttributeError):
+        p1.color = "blue"  # type: ignore[attr-defined]
+
+
+def test_ordering_and_equality_follow_price_then_sku() -> None:
+    cheap = Product("B", "Thé", 2.0)
+    same_price = Product("A", "Café", 2.0)
+    dear = Product("C", "Sucre", 9.0)
+
+    assert sorted([dear, cheap, same_price]) == [same_price, cheap, dear]
+    assert Product("A", "Café", 2.0) == same_price
+    assert Product("A", "Café", 3.0) != same_price
+
+    dear.price = 1.0  # le tri suit le setter
+    assert sorted([dear, cheap, same_price])[0] is dear
+
+
+def test_perishable_reads_the_injected_clock() -> None:
+    expiry = date(2030, 1, 10)
+    p = PerishableProduct("P", "Lait", 4.0, expiry_date=expiry)
+    set_clock(lambda: expiry - timedelta(days=10))
+    try:
+        assert (p.days_left(), p.is_expired, p.final_price()) == (10, False, 4.0)
+        with pricing_date(expiry + timedelta(days=1)) as day:
+            assert day == expiry + timedelta(days=1)
+            assert (p.days_left(), p.is_expired, p.final_price()) == (-1, True, 0.0)
+        assert p.days_left() == 10  # date figée seulement dans le bloc
+    finally:
+        set_clock(None)
+    assert p.days_left() == (expiry - date.today()).days
+
+
+def test_final_price_is_memoized_per_day_and_reset_on_price_change() -> None:
+    day = date(2030, 1, 10)
+    p = PerishableProduct("P", "Lait", 4.0, expiry_date=day + timedelta(days=2))
+
+    assert p.price_at(day) == 2.0
+    assert p._memo == (day, 2.0)
+    assert p.price_at(day + timedelta(days=5)) == 0.0  # autre jour : recalcul
+    p.price = 6.0
+    assert p._memo is None
+    assert p.price_at(day) == 3.0
@@ -0,0 +1,131 @@
+# But : ShardedInventory route les opérations vers le bon magasin et
+# agrège la chaîne en série depuis les index des shards ; /stores.
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+from conftest import TODAY, Catalogue
+from fastapi.testclient import TestClient
+
+from freshcart.api.main import create_app
+from freshcart.domain.inventory import ProductNotFoundError
+from freshcart.domain.products import PerishableProduct, Product
+from freshcart.domain.sharding import ShardedInventory, UnknownStoreError, shard_index
+
+pytestmark = pytest.mark.usefixtures("fake_clock")
+
+
+def test_routing_by_store() -> None:
+    chain = ShardedInventory(["paris", "lyon"])
+    chain.add(Product("S1", "Café", 8.0), store_id="paris")
+    chain.add(Product("S1", "Café", 7.5), store_id="lyon")
+
+    assert chain.get("S1", store_id="lyon").price == 7.5
+    assert chain.locate("S1") == ["paris", "lyon"]
+    assert len(chain) == 2
+    chain.remove("S1", store_id="paris")
+    assert chain.locate("S1") == ["lyon"]
+
+    with pytest.raises(UnknownStoreError):
+        chain.get("S1", store_id="lille")
+    with pytest.raises(UnknownStoreError):  # pas de hachage : magasin requis
+        chain.get("S1")
+    with pytest.raises(ProductNotFoundError):
+        chain.locate("S2")
+
+
+def test_routing_by_sku_hash(mixed_catalogue: Catalogue) -> None:
+    chain = ShardedInventory.by_sku_hash(4)
+    products = mixed_catalogue(40)
+    for p in products:
+        chain.add(p)
+
+    assert chain.store_ids == ["shard-0", "shard-1", "shard-2", "shard-3"]
+    for p in products:
+        shard = f"shard-{shard_index(p.sku, 4)}"
+        assert p.sku in chain.store(shard)
+        assert chain.get(p.sku) is p
+    assert sum(len(chain.store(s)) for s in chain.store_ids) == 40
+    with pytest.raises(ValueError):
+        chain.add_store("extra")
+
+
+def test_aggregates_match_single_inventory(mixed_catalogue: Catalogue) -> None:
+    chain = ShardedInventory.by_sku_hash(3)
+    products = mixed_catalogue(60)
+    for p in products:
+        chain.add(p)
+
+    expected_total = round(sum(p.final_price() for p in products), 2)
+    expected_expired = sorted(
+        (p for p in products if isinstance(p, PerishableProduct) and p.is_expired),
+        key=lambda p: (p.expiry_date, p.sku),  # type: ignore[attr-defined]
+    )
+    assert chain.total_value() == expected_total
+    assert sum(chain.store_totals().values()) == pytest.approx(expected_total)
+    assert [p for _, p in chain.expired()] == expected_expired
+    assert all(p.sku in chain.store(sid) for sid, p in chain.expired())
+
+    p = products[0]
+    p.price = 0.5
+    chain.remove("P1")  # incrémental : suit les mutations des shards
+    expected_total = round(sum(q.final_price() for q in products[2:]) + 0.5, 2)
+    assert chain.total_value() == expected_total
+
+
+def test_stores_api() -> None:
+    client = TestClient(create_app({"stores": ["paris", "lyon"]}))
+    for store, price in (("paris", 2.0), ("lyon", 3.0)):
+        r = client.post(
+            f"/stores/{store}/products",
+            json={"sku": "S1", "name": "Pain", "initial_price": price},
+        )
+        assert r.status_code == 201
+    client.post(
+        "/stores/lyon/products",
+        json={
+            "sku": "M1",
+            "name": "Lait",
+            "initial_price": 1.0,
+            "type": "perishable",
+            "expiry_date": str(TODAY - timedelta(days=1)),
+        },
+    )
+
+    dup = client.post(
+        "/stores/lyon/products", json={"sku": "S1", "name": "x", "initial_price": 1}
+    )
+    assert dup.status_code == 400
+    assert client.get("/stores/paris/products/S1").json()["price"] == 2.0
+    assert [p["sku"] for p in client.get("/stores/lyon/products").json()] == [
+        "M1",
+        "S1",
+    ]
+    assert [p["sku"] for p in client.get("/stores/lyon/products/expired").json()] == [
+        "M1"
+    ]
+    assert client.get("/stores/lyon/inventory/value").json() == {"total_value": 3.0}
+    assert client.get("/stores/value").json() == {
+        "total_value": 5.0,
+        "stores": {"paris": 2.0, "lyon": 3.0},
+    }
+    assert client.get("/stores").json() == [
+        {"store_id": "paris", "products": 1, "total_value": 2.0},
+        {"store_id": "lyon", "products": 2, "total_value": 3.0},
+    ]
+    expired = client.get("/stores/expired").json()
+    assert [(p["store_id"], p["sku"]) for p in expired] == [("lyon", "M1")]
+
+    assert client.delete("/stores/paris/products/S1").status_code == 204
+    assert client.get("/stores/paris/products/S1").status_code == 404
+    assert client.delete("/stores/paris/products/S1").status_code == 404
+    assert client.get("/stores/lille/products").status_code == 404
+    # l'inventaire global est indépendant des magasins
+    assert client.get("/products").json() == []
+
+
+def test_stores_routes_absent_without_stores() -> None:
+    client = TestClient(create_app())
+    assert client.get("/stores").status_code == 404
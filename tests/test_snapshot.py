@@ -0,0 +1,186 @@
+# But : un snapshot relu par mmap se comporte comme l'Inventory d'origine.
+
+from pathlib import Path
+
+import pytest
+from conftest import ProductKey, SmallCatalogue
+from fastapi.testclient import TestClient
+
+from freshcart.api.main import create_app
+from freshcart.domain.inventory import (
+    Change,
+    DuplicateSkuError,
+    Inventory,
+    ProductNotFoundError,
+)
+from freshcart.domain.products import Product
+from freshcart.domain.snapshot import SnapshotFormatError, SnapshotInventory
+
+
+@pytest.fixture
+def inv(small_catalogue: SmallCatalogue) -> Inventory:
+    inventory = Inventory()
+    inventory.add_many(small_catalogue())
+    return inventory
+
+
+@pytest.fixture
+def snap(inv: Inventory, tmp_path: Path) -> SnapshotInventory:
+    path = str(tmp_path / "catalogue.snap")
+    inv.save_snapshot(path)
+    return Inventory.load_snapshot(path)
+
+
+def test_reads_match_the_original_without_materializing(
+    inv: Inventory, snap: SnapshotInventory, product_key: ProductKey
+) -> None:
+    assert len(snap) == len(inv)
+    assert "P3" in snap and "R0" in snap and "X" not in snap and 3 not in snap
+    assert product_key(snap.get("P3")) == product_key(inv.get("P3"))
+    assert [product_key(p) for p in snap.expired()] == [
+        product_key(p) for p in inv.expired()
+    ]
+    assert [product_key(p) for p in snap.discounted()] == [
+        product_key(p) for p in inv.discounted()
+    ]
+    assert snap.total_value() == inv.total_value()
+    with pytest.raises(ProductNotFoundError):
+        snap.get("X")
+    assert snap.changes_since(0) == (0, []) and snap.changes_since(1) == (0, None)
+    # seuls les produits effectivement lus ont été construits
+    assert snap._inv is None
+    assert len(snap._cache) < len(inv)
+    assert snap.get("P3") is snap.get("P3")
+
+
+def test_full_scans_and_pages_are_read_from_the_file(
+    inv: Inventory, snap: SnapshotInventory, product_key: ProductKey
+) -> None:
+    assert [product_key(p) for p in snap.all()] == [product_key(p) for p in inv.all()]
+    for sort in ("price", "sku", "expiry"):
+        assert [p.sku for p in snap.sorted_by(sort)] == [
+            p.sku for p in inv.sorted_by(sort)
+        ]
+        # mêmes pages et mêmes curseurs que l'Inventory d'origine
+        after = None
+        while True:
+            items, next_key = snap.page(sort, 5, after)
+            expected, expected_key = inv.page(sort, 5, after)
+            assert [p.sku for p in items] == [p.sku for p in expected]
+            assert next_key == expected_key
+            if next_key is None:
+                break
+            after = next_key
+    assert snap.page("sku", 3)[0] == snap.sorted_by("sku")[:3]
+    with pytest.raises(ValueError):
+        snap.sorted_by("name")
+    with pytest.raises(TypeError):
+        snap.page("price", 5, ("P1",))  # curseur d'un autre ordre
+    assert snap._inv is None and snap.version == 0
+
+
+def test_iterators_read_the_file_until_thawed(
+    inv: Inventory, snap: SnapshotInventory, product_key: ProductKey
+) -> None:
+    assert [product_key(p) for p in snap.iter_expired()] == [
+        product_key(p) for p in inv.expired()
+    ]
+    assert [product_key(p) for p in snap.iter_expiring_within(3)] == [
+        product_key(p) for p in inv.expiring_within(3)
+    ]
+    assert [product_key(p) for p in snap.iter_all()] == [
+        product_key(p) for p in inv.all()
+    ]
+    assert snap._inv is None
+
+    assert [p.sku for p in snap.iter_sorted("sku")] == [
+        p.sku for p in inv.sorted_by("sku")
+    ]
+    assert snap._inv is None  # tri : index du fichier
+    assert [p.sku for p in snap.search(name_prefix="Pér", max_price=8.0)] == [
+        p.sku for p in inv.search(name_prefix="Pér", max_price=8.0)
+    ]
+    assert snap._inv is not None  # recherche : bascule vers un Inventory complet
+    # la bascule ne change ni la version ni le journal
+    assert snap.version == 0 and snap.changes_since(0) == (0, [])
+    assert [p.sku for p in snap.iter_all()] == [p.sku for p in inv.all()]
+    assert [p.sku for p in snap.iter_expired()] == [p.sku for p in inv.expired()]
+    assert len(list(snap.iter_expiring_within(3))) == len(inv.expiring_within(3))
+
+
+def test_mutations_switch_to_a_full_inventory(snap: SnapshotInventory) -> None:
+    product = snap.get("R5")
+    before = snap.total_value()
+    product.price = 10.0  # produit déjà construit depuis le snapshot
+    assert snap.total_value() == pytest.approx(before - 6.25 + 10.0)
+    assert snap.get("R5") is product
+    version = snap.version
+    # le changement qui a déclenché la bascule est journalisé
+    assert snap.changes_since(version - 1)[1] == [Change(version, "price", "R5")]
+    product.price = 11.0  # désormais suivi par l'Inventory
+    assert snap.changes_since(version)[1] == [Change(version + 1, "price", "R5")]
+    assert snap.total_value() == pytest.approx(before - 6.25 + 11.0)
+    version = snap.version
+
+    snap.add(Product("NEW", "Nouveau", 1.0))
+    with pytest.raises(DuplicateSkuError):
+        snap.add(Product("NEW", "Nouveau", 1.0))
+    assert snap.upsert(Product("NEW", "Nouveau", 2.0)) is not None
+    assert snap.add_many([Product("NEW", "x", 1.0)], skip_duplicates=True)
+    snap.remove("P0")
+    assert snap.bulk_update_prices({"NEW": 3.0}) == 1
+    assert "P0" not in snap and "NEW" in snap
+    assert len(snap) == 18
+    assert snap.version > version
+    assert snap.changes_since(version)[1]
+    assert snap.expired() and snap.discounted()
+
+
+def test_empty_inventory_round_trip(tmp_path: Path) -> None:
+    path = str(tmp_path / "vide.snap")
+    Inventory().save_snapshot(path)
+    snap = Inventory.load_snapshot(path)
+    assert len(snap) == 0 and snap.total_value() == 0 and snap.expired() == []
+    assert "X" not in snap
+    snap.close()
+
+
+def test_rejects_foreign_files(tmp_path: Path) -> None:
+    path = tmp_path / "autre.bin"
+    path.write_bytes(b"pas un snapshot" * 10)
+    with pytest.raises(SnapshotFormatError):
+        SnapshotInventory(str(path))
+
+
+def test_concurrent_thaw_builds_one_inventory(snap: SnapshotInventory) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(8) as pool:
+        inventories = set(map(id, pool.map(lambda _: snap._thaw(), range(32))))
+    assert len(inventories) == 1
+
+
+def test_api_on_snapshot_storage(inv: Inventory, tmp_path: Path) -> None:
+    path = str(tmp_path / "api.snap")
+    inv.save_snapshot(path)
+    client = TestClient(create_app({"storage": "snapshot", "snapshot_path": path}))
+    assert isinstance(client.app.state.inventory, SnapshotInventory)  # type: ignore[attr-defined]
+    value = client.get("/inventory/value").json()
+    assert value == {"total_value": inv.total_value()}
+    # lectures : aucune bascule, aucune modification visible, ETag stable
+    listing = client.get("/products")
+    assert [p["sku"] for p in listing.json()] == [p.sku for p in inv.sorted_by()]
+    assert (
+        client.get("/products", params={"sort": "sku", "limit": 5}).status_code == 200
+    )
+    assert client.get("/products/changes").json() == {
+        "version": 0,
+        "resync": False,
+        "changes": [],
+    }
+    etag = listing.headers["etag"]
+    assert client.get("/products", headers={"if-none-match": etag}).status_code == 304
+    assert client.app.state.inventory._inv is None  # type: ignore[attr-defined]
+    r = client.post("/products", json={"sku": "S1", "name": "x", "initial_price": 1.0})
+    assert r.status_code == 201
+    assert len(client.get("/products", params={"limit": 100}).json()) == len(inv) + 1
@@ -0,0 +1,264 @@
+# But : SqliteInventory se comporte comme Inventory, et persiste les données.
+
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+from conftest import ProductKey, SmallCatalogue
+from fastapi.testclient import TestClient
+
+from freshcart.api.main import create_app
+from freshcart.domain.inventory import (
+    DuplicateSkuError,
+    Inventory,
+    ProductNotFoundError,
+)
+from freshcart.domain.products import Product
+from freshcart.storage import sqlite as sqlite_module
+from freshcart.storage.sqlite import SqliteInventory
+
+
+@pytest.fixture
+def db(tmp_path: Path) -> SqliteInventory:
+    return SqliteInventory(str(tmp_path / "freshcart.db"))
+
+
+def test_parity_with_in_memory_inventory(
+    db: SqliteInventory, small_catalogue: SmallCatalogue, product_key: ProductKey
+) -> None:
+    inv = Inventory()
+    for p in small_catalogue():
+        inv.add(p)
+    db.add_many(small_catalogue())
+
+    assert len(db) == len(inv)
+    assert [product_key(p) for p in db.all()] == [product_key(p) for p in inv.all()]
+    assert [product_key(p) for p in db.expired()] == [
+        product_key(p) for p in inv.expired()
+    ]
+    assert [product_key(p) for p in db.discounted()] == [
+        product_key(p) for p in inv.discounted()
+    ]
+    assert db.total_value() == inv.total_value()
+    for sort in ("price", "sku", "expiry"):
+        assert [p.sku for p in db.sorted_by(sort)] == [
+            p.sku for p in inv.sorted_by(sort)
+        ]
+        after = None
+        for _ in range(4):
+            got, got_key = db.page(sort, 5, after)
+            want, want_key = inv.page(sort, 5, after)
+            assert [p.sku for p in got] == [p.sku for p in want]
+            assert got_key == want_key
+            after = got_key
+    with pytest.raises(ValueError):
+        db.sorted_by("name")
+
+
+def test_writes_errors_and_version(db: SqliteInventory) -> None:
+    v0 = db.version
+    p = Product("A", "Café", 8.0)
+    db.add(p)
+    assert "A" in db and "B" not in db
+    assert db.version == v0 + 1
+
+    with pytest.raises(DuplicateSkuError):
+        db.add(Product("A", "Café", 8.0))
+    with pytest.raises(DuplicateSkuError):
+        db.add_many([Product("B", "Thé", 1.0), Product("A", "Café", 8.0)])
+    with pytest.raises(DuplicateSkuError):
+        db.add_many([Product("B", "Thé", 1.0), Product("B", "Thé", 1.0)])
+    assert "B" not in db
+    assert db.version == v0 + 1  # transactions annulées
+
+    skipped = db.add_many(
+        [Product("B", "Thé", 1.0), Product("A", "x", 1.0), Product("B", "y", 1.0)],
+        skip_duplicates=True,
+    )
+    assert sorted(s.name for s in skipped) == ["x", "y"]
+
+    # le setter de prix met à jour la ligne (objet ajouté ou relu)
+    p.price = 9.0
+    db.get("B").price = 2.0
+    assert db.total_value() == 11.0
+
+    assert db.upsert(Product("C", "Sucre", 2.0)) is None
+    previous = db.upsert(Product("A", "Café bio", 10.0))
+    assert previous is not None and previous.price == 9.0
+    assert [x.sku for x in db.all()] == ["A", "B", "C"]
+
+    db.remove("C")
+    with pytest.raises(ProductNotFoundError):
+        db.remove("C")
+    with pytest.raises(ProductNotFoundError):
+        db.get("C")
+
+
+def test_data_survives_restart_and_uses_indexes(
+    tmp_path: Path, small_catalogue: SmallCatalogue
+) -> None:
+    path = str(tmp_path / "shop.db")
+    first = SqliteInventory(path)
+    first.add_many(small_catalogue())
+    first.close()
+
+    second = SqliteInventory(path)
+    assert len(second) == len(small_catalogue())
+    with second._pool.connection() as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT sku FROM products WHERE expiry < 0"
+        ).fetchall()
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    assert "idx_products_expiry" in str(plan)
+    assert mode == "wal"
+
+
+def test_concurrent_adds_from_thread_pool(db: SqliteInventory) -> None:
+    def worker(seed: int) -> int:
+        created = 0
+        for i in range(30):
+            try:
+                db.add(Product(f"S{(seed + i) % 20}", "x", 1.0))
+                created += 1
+            except DuplicateSkuError:
+                pass
+        return created
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        assert sum(pool.map(worker, range(6))) == 20
+    assert len(db) == 20
+
+
+def test_api_on_sqlite_storage(tmp_path: Path) -> None:
+    settings = {"storage": "sqlite", "sqlite_path": str(tmp_path / "api.db")}
+    client = TestClient(create_app(settings))
+    client.post("/products", json={"sku": "A1", "name": "Café", "initial_price": 8.0})
+    r = client.post(
+        "/products", json={"sku": "A1", "name": "Café", "initial_price": 8.0}
+    )
+    assert r.status_code == 400
+
+    # nouvelle app sur le même fichier : l'état est conservé
+    client = TestClient(create_app(settings))
+    assert client.get("/inventory/value").json() == {"total_value": 8.0}
+    assert [p["sku"] for p in client.get("/products").json()] == ["A1"]
+
+    with pytest.raises(ValueError):
+        create_app({"storage": "redis"})
+
+    # curseur dont la clé n'a pas l'arité du tri : 400, comme en mémoire
+    from freshcart.api.routers.products import encode_cursor
+
+    for sort, key in (("price", (8.0,)), ("sku", ("A", 1))):
+        params = {"sort": sort, "cursor": encode_cursor(sort, key)}
+        assert client.get("/products", params=params).status_code == 400
+
+
+def test_pool_releases_slot_when_connect_fails(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    pool = sqlite_module.SqlitePool(str(tmp_path / "pool.db"), size=1)
+    connect = pool._connect
+
+    def failing() -> sqlite3.Connection:
+        raise sqlite3.OperationalError("unable to open database file")
+
+    monkeypatch.setattr(pool, "_connect", failing)
+    for _ in range(2):
+        with pytest.raises(sqlite3.OperationalError):
+            with pool.connection():
+                pass
+    monkeypatch.setattr(pool, "_connect", connect)
+    with pool.connection() as conn:  # la place n'a pas fuité : pas d'attente
+        assert conn.execute("SELECT 1").fetchone() == (1,)
+    pool.close()
+
+
+def test_change_log_matches_in_memory_inventory(tmp_path: Path) -> None:
+    db = SqliteInventory(str(tmp_path / "log.db"), change_log_size=4)
+    inv = Inventory(change_log_size=4)
+    for repo in (db, inv):
+        repo.add_many([Product("A", "Riz", 1.0), Product("B", "Thé", 2.0)])
+        repo.get("A").price = 3.0
+        repo.upsert(Product("A", "Riz", 4.0))
+        repo.remove("B")
+    # upsert = une transaction (une version) en SQLite, deux en mémoire
+    assert db.changes_since(0) == (4, None) and inv.changes_since(0) == (5, None)
+    ops = [(c.op, c.sku) for c in db.changes_since(2)[1] or []]
+    assert ops == [(c.op, c.sku) for c in inv.changes_since(2)[1] or []]
+    assert ops == [("remove", "A"), ("add", "A"), ("remove", "B")]
+    assert db.changes_since(4) == (4, [])
+    assert db.changes_since(6) == (4, None)
+
+
+def test_iterators_match_in_memory_inventory(
+    db: SqliteInventory,
+    monkeypatch: pytest.MonkeyPatch,
+    small_catalogue: SmallCatalogue,
+    product_key: ProductKey,
+) -> None:
+    monkeypatch.setattr(sqlite_module, "ITER_CHUNK", 4)  # plusieurs paquets
+    inv = Inventory()
+    inv.add_many(small_catalogue())
+    db.add_many(small_catalogue())
+
+    assert [product_key(p) for p in db.iter_all()] == [
+        product_key(p) for p in inv.all()
+    ]
+    for sort in ("price", "sku", "expiry"):
+        assert [p.sku for p in db.iter_sorted(sort)] == [
+            p.sku for p in inv.sorted_by(sort)
+        ]
+    assert [product_key(p) for p in db.iter_expired()] == [
+        product_key(p) for p in inv.expired()
+    ]
+    assert [product_key(p) for p in db.iter_expiring_within(5)] == [
+        product_key(p) for p in inv.expiring_within(5)
+    ]
+
+
+def test_search_matches_in_memory_inventory(
+    db: SqliteInventory, small_catalogue: SmallCatalogue, product_key: ProductKey
+) -> None:
+    inv = Inventory()
+    inv.add_many(small_catalogue())
+    db.add_many(small_catalogue())
+    today = date.today()
+    for criteria in (
+        {},
+        {"name_prefix": "Pér"},
+        {"name_prefix": "Rég", "min_price": 2.5, "max_price": 5.0},
+        {"product_type": "perishable", "max_price": 9.35},
+        {"product_type": "regular"},
+        {"expires_before": today + timedelta(2)},
+    ):
+        expected = inv.search(**criteria)  # type: ignore[arg-type]
+        got = db.search(**criteria)  # type: ignore[arg-type]
+        assert [product_key(p) for p in got] == [product_key(p) for p in expected]
+    with pytest.raises(ValueError):
+        db.search(product_type="frozen")
+
+
+def test_bulk_update_prices_matches_in_memory_inventory(
+    db: SqliteInventory, small_catalogue: SmallCatalogue, product_key: ProductKey
+) -> None:
+    inv = Inventory()
+    inv.add_many(small_catalogue())
+    db.add_many(small_catalogue())
+    version = db.version
+    for repo in (inv, db):
+        with pytest.raises(ProductNotFoundError):
+            repo.bulk_update_prices({"R0": 1.0, "NOPE": 2.0})
+        with pytest.raises(ValueError):
+            repo.bulk_update_prices({"R0": -1.0})
+    assert db.version == version and db.get("R0").price == inv.get("R0").price
+
+    prices = {p.sku: p.price / 3 for p in small_catalogue()[::2]}
+    assert db.bulk_update_prices(prices) == inv.bulk_update_prices(prices)
+    assert [product_key(p) for p in db.all()] == [product_key(p) for p in inv.all()]
+    assert db.total_value() == inv.total_value()
+    assert db.sorted_by("price") == inv.sorted_by("price")
+    assert len(db.changes_since(version)[1] or []) == len(prices)
+    assert db.bulk_update_prices({}) == 0
@@ -0,0 +1,181 @@
+# But : ExpirySweeper range les périssables en paquets fresh/discounted/
+# expired, identiques aux requêtes de l'inventaire, en ne traitant à chaque
+# balayage que les modifications et les frontières échues ; API + lifespan.
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import timedelta
+
+import pytest
+from conftest import TODAY, FakeClock
+from fastapi.testclient import TestClient
+
+from freshcart.api.main import create_app
+from freshcart.domain.inventory import Inventory
+from freshcart.domain.products import PerishableProduct, Product
+from freshcart.domain.sweeper import ExpirySweeper, bucket_of
+
+pytestmark = pytest.mark.usefixtures("fake_clock")
+
+
+def _inventory(n: int) -> Inventory:
+    inv = Inventory()
+    for i in range(n):
+        if i % 3:
+            expiry = TODAY + timedelta(i % 11 - 3)
+            inv.add(PerishableProduct(f"P{i}", "lait", 2.0, expiry_date=expiry))
+        else:
+            inv.add(Product(f"R{i}", "riz", 1.0))
+    return inv
+
+
+def _check(sweeper: ExpirySweeper, inv: Inventory) -> None:
+    assert sweeper.expired() == inv.expired()
+    assert sweeper.discounted() == inv.discounted()
+    perishables = sum(isinstance(p, PerishableProduct) for p in inv.all())
+    assert sum(sweeper.counts().values()) == perishables
+
+
+def test_buckets_follow_the_days(fake_clock: FakeClock) -> None:
+    inv = _inventory(60)
+    sweeper = ExpirySweeper(inv)
+    assert sweeper.day is None
+    assert sweeper.sweep() == 40  # premier balayage : tout est placé
+    assert sweeper.day == TODAY
+    assert sweeper.sweep() == 0  # rien n'a changé
+    _check(sweeper, inv)
+    today = TODAY.toordinal()
+    for p in sweeper.fresh():
+        assert isinstance(p, PerishableProduct)
+        assert bucket_of(p.expiry_date.toordinal(), today) == "fresh"
+
+    # un jour plus tard : seuls les produits qui changent d'état bougent
+    fake_clock.day = TODAY + timedelta(days=1)
+    moved = sweeper.sweep()
+    assert 0 < moved < 40
+    _check(sweeper, inv)
+    # saut de plusieurs jours : fresh -> expired directement
+    fake_clock.day = TODAY + timedelta(days=30)
+    sweeper.sweep()
+    _check(sweeper, inv)
+    assert sweeper.counts() == {"fresh": 0, "discounted": 0, "expired": 40}
+    # horloge remontée : reconstruction complète
+    fake_clock.day = TODAY
+    assert sweeper.sweep() == 40
+    _check(sweeper, inv)
+
+
+def test_mutations_are_read_from_the_change_log(fake_clock: FakeClock) -> None:
+    inv = _inventory(30)
+    sweeper = ExpirySweeper(inv)
+    sweeper.sweep()
+
+    inv.add(PerishableProduct("N1", "yaourt", 1.0, expiry_date=TODAY))
+    inv.remove("P1")
+    inv.add(Product("R100", "pâtes", 1.0))
+    assert sweeper.sweep() == 3  # trois SKU touchés, aucun parcours complet
+    _check(sweeper, inv)
+    assert "N1" in {p.sku for p in sweeper.discounted()}
+
+    # retiré puis rajouté avec une autre date : l'ancienne frontière est ignorée
+    inv.remove("N1")
+    inv.add(PerishableProduct("N1", "yaourt", 1.0, expiry_date=TODAY + timedelta(9)))
+    inv.get("P2").price = 5.0
+    fake_clock.day = TODAY + timedelta(days=1)
+    sweeper.sweep()
+    _check(sweeper, inv)
+    assert "N1" in {p.sku for p in sweeper.fresh()}
+
+
+def test_resync_after_evicted_change_log() -> None:
+    inv = Inventory(change_log_size=2)
+    sweeper = ExpirySweeper(inv)
+    sweeper.sweep()
+    for i in range(50):  # journal évincé : reconstruction complète
+        expiry = TODAY + timedelta(i % 10)
+        inv.add(PerishableProduct(f"P{i}", "lait", 1.0, expiry_date=expiry))
+    assert sweeper.sweep() == 50
+    _check(sweeper, inv)
+    with pytest.raises(ValueError):
+        sweeper.bucket("stale")
+
+
+def test_run_sweeps_in_background() -> None:
+    inv = _inventory(9)
+    sweeper = ExpirySweeper(inv)
+
+    async def scenario() -> None:
+        task = asyncio.create_task(sweeper.run(0.01))
+        await asyncio.sleep(0.05)
+        assert sweeper.day == TODAY
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        with pytest.raises(ValueError):
+            await sweeper.run(0)
+
+    asyncio.run(scenario())
+
+
+def test_run_logs_failures_and_keeps_sweeping(
+    caplog: pytest.LogCaptureFixture, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    inv = _inventory(9)
+    sweeper = ExpirySweeper(inv)
+    sweep, calls = sweeper.sweep, []
+
+    def flaky() -> int:
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("dictionary changed size during iteration")
+        return sweep()
+
+    monkeypatch.setattr(sweeper, "sweep", flaky)
+
+    async def scenario() -> None:
+        task = asyncio.create_task(sweeper.run(0.01))
+        while len(calls) < 2:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    with caplog.at_level(logging.ERROR, logger="freshcart.domain"):
+        asyncio.run(scenario())
+    assert "expiry sweep failed" in caplog.text
+    assert sweeper.day == TODAY
+
+
+def test_rebuild_reads_a_snapshot_of_the_inventory() -> None:
+    inv = _inventory(30)
+
+    def iter_all() -> None:
+        raise AssertionError("le balayeur ne parcourt pas le dict vivant")
+
+    inv.iter_all = iter_all  # type: ignore[method-assign,assignment]
+    sweeper = ExpirySweeper(inv)
+    assert sweeper.sweep() == 20
+    _check(sweeper, inv)
+
+
+@pytest.mark.parametrize("settings", [{}, {"expiry_sweeper": 0.01}])
+def test_expired_and_discounted_routes(settings: dict[str, float]) -> None:
+    with TestClient(create_app(settings)) as client:
+        for sku, days in (("M1", -2), ("M2", 1), ("M3", 20)):
+            client.post(
+                "/products",
+                json={
+                    "sku": sku,
+                    "name": "Lait",
+                    "initial_price": 2.0,
+                    "type": "perishable",
+                    "expiry_date": str(TODAY + timedelta(days=days)),
+                },
+            )
+        expired = client.get("/products/expired").json()
+        discounted = client.get("/products/discounted").json()
+        assert [p["sku"] for p in expired] == ["M1"]
+        assert [p["sku"] for p in discounted] == ["M2"]
+        assert (client.app.state.sweeper is None) == (not settings)